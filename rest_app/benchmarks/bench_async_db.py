@@ -0,0 +1,97 @@
+"""
+Пропускна здатність конкурентних запитів до бази даних: блокуюча сесія проти AsyncSession.
+
+"До" відтворює старий шлях репозиторію - синхронний ``db.query(...)`` всередині ``async def``,
+"після" - ``repository.contacts.get_contacts`` поверх AsyncSession. Окрім пропускної здатності
+вимірюється найбільша затримка циклу подій: саме вона показує, наскільки один запит
+блокує всі інші запити воркера.
+
+    python -m benchmarks.bench_async_db --requests 2000 --concurrency 50
+    python -m benchmarks.bench_async_db --sync-url postgresql://... --async-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from benchmarks.common import summarize, report, seed_contacts
+from src.database.models import Contact
+from src.repository import contacts as repository_contacts
+
+
+async def loop_lag_probe(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(handler, requests: int, concurrency: int) -> dict:
+    latencies, lags = [], []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            await handler()
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    result = summarize(latencies, elapsed)
+    result['max_loop_lag_ms'] = round(max(lags, default=0.0) * 1000, 3)
+    return result
+
+
+async def main(args):
+    user = seed_contacts(args.sync_url, args.contacts)
+
+    sync_engine = create_engine(args.sync_url, pool_size=args.concurrency)
+    SyncSessionLocal = sessionmaker(autoflush=False, bind=sync_engine)
+
+    async def blocking_handler():
+        db = SyncSessionLocal()
+        try:
+            db.query(Contact).filter(Contact.user_id == user.id).offset(args.skip).limit(args.limit).all()
+        finally:
+            db.close()
+
+    async_engine = create_async_engine(args.async_url, pool_size=args.concurrency)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def async_handler():
+        async with AsyncSessionLocal() as db:
+            await repository_contacts.get_contacts(args.skip, args.limit, user, db)
+
+    before = await run(blocking_handler, args.requests, args.concurrency)
+    after = await run(async_handler, args.requests, args.concurrency)
+    sync_engine.dispose()
+    await async_engine.dispose()
+    report({'requests': args.requests, 'concurrency': args.concurrency, 'before_sync': before, 'after_async': after})
+
+
+if __name__ == '__main__':
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'bench.db')
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sync-url', default=f'sqlite:///{db_path}')
+    parser.add_argument('--async-url', default=f'sqlite+aiosqlite:///{db_path}')
+    parser.add_argument('--contacts', type=int, default=10_000)
+    parser.add_argument('--requests', type=int, default=2_000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--skip', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+"""
+Віддача зображень юзерів з локального сховища: маршрут /api/avatars (копії в пам'яті процесу)
+проти FileResponse, що на кожен запит читає файл з диска. Запити йдуть через ASGI без мережі.
+
+    python -m benchmarks.bench_avatars --requests 5000
+"""
+import argparse
+import asyncio
+import io
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import FileResponse
+from PIL import Image
+
+from benchmarks.common import summarize, report
+from src.routes import avatars
+from src.services.avatars import LocalStorage, avatar_uploader, resize_avatar
+
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        begin = time.perf_counter()
+        response = await client.get(url)
+        latencies.append(time.perf_counter() - begin)
+    result = summarize(latencies, time.perf_counter() - start)
+    result['bytes'] = len(response.content)
+    return result
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(root, '/api/avatars', (32, 64, 128))
+        avatar_uploader.storage = storage
+        picture = io.BytesIO()
+        Image.effect_mandelbrot((600, 600), (-2, -1.5, 1, 1.5), 100).convert('RGB').save(picture, 'PNG')
+        url = await storage.save('bench', resize_avatar(picture.getvalue(), 250))
+        digest = url.rsplit('/', 1)[1]
+
+        app = FastAPI()
+        app.include_router(avatars.router, prefix='/api')
+
+        @app.get('/files/{digest}')
+        async def read_file(digest: str):
+            return FileResponse(storage.path(digest, 64), media_type='image/jpeg')
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+            await client.get(f'{url}?size=64')
+            before = await measure(client, f'/files/{digest}', args.requests)
+            after = await measure(client, f'{url}?size=64', args.requests)
+    report({
+        'requests': args.requests,
+        'file_response': before,
+        'avatar_route': after,
+        'speedup': round(before['mean_ms'] / after['mean_ms'], 2) if after['mean_ms'] else None,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
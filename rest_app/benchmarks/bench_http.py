@@ -0,0 +1,302 @@
+"""
+Наскрізний HTTP-бенчмарк REST API: реєстрація, логін, оновлення ключа, CRUD контактів,
+пошук і найближчі дні народження.
+
+Застосунок запускається в тому ж процесі через ASGI-транспорт httpx (разом з lifespan),
+або окремим сервером uvicorn (``--server``), або вже запущеним сервером (``--url``, база даних
+``--database-url`` має бути тією самою). Перед замірами база заповнюється ``--users`` юзерами
+по ``--contacts`` контактів. Кожен сценарій виконується ``--requests`` запитами з фіксованою
+кількістю одночасних клієнтів ``--concurrency``; кожен клієнт працює від імені окремого юзера.
+
+Результат друкується у форматі JSON (пропускна здатність, p50/p95/p99, помилки) і може бути
+збережений як еталон (``--save``). З ``--baseline`` результат порівнюється з еталоном: сценарій,
+у якого p99 зріс або пропускна здатність впала більше ніж на ``--tolerance``, вважається регресією,
+і процес завершується з кодом 1.
+
+    python -m benchmarks.bench_http --users 50 --contacts 200 --requests 300 --concurrency 10
+    python -m benchmarks.bench_http --save baseline.json
+    python -m benchmarks.bench_http --baseline baseline.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import create_engine
+
+from benchmarks.common import summarize, report
+from src.database.seed import FIRST_NAMES, DatasetGenerator, seed_database, sync_url, user_email
+
+SCENARIOS = ('signup', 'login', 'refresh_token', 'contacts_list', 'contact_create', 'contact_update', 'contact_delete',
+             'search', 'upcoming_birthdays')
+
+
+@dataclass
+class Client:
+    """
+    Юзер, від імені якого працює один з одночасних клієнтів.
+    """
+    email: str
+    access_token: str = ''
+    refresh_token: str = ''
+    created: list = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict:
+        return {'Authorization': f'Bearer {self.access_token}'}
+
+
+def seed(url: str, users: int, contacts: int, password_hash: str) -> list[str]:
+    """
+    Чиста схема, ``users`` підтверджених юзерів з однаковим паролем і по ``contacts`` контактів у кожного.
+
+    :param url: синхронний URL бази даних
+    :type url: str
+    :param users: кількість юзерів
+    :type users: int
+    :param contacts: кількість контактів у юзера
+    :type contacts: int
+    :param password_hash: хеш пароля юзерів
+    :type password_hash: str
+    :return: електронні пошти юзерів
+    :rtype: list[str]
+    """
+    engine = create_engine(url)
+    try:
+        result = seed_database(engine, DatasetGenerator(users, users * contacts, skew=0, password_hash=password_hash),
+                               reset=True)
+    finally:
+        engine.dispose()
+    return [user_email(user_id) for user_id in range(result['first_user_id'], result['first_user_id'] + users)]
+
+
+def contact_body(number: int) -> dict:
+    return {'first_name': f'Bench{number % 50}', 'last_name': 'Http', 'email': f'http{number}@example.com',
+            'birthday': str(date(1990, 1, 1) + timedelta(days=number % 365)), 'description': 'bench'}
+
+
+def scenarios(password: str) -> dict[str, Callable[[httpx.AsyncClient, Client, int], Awaitable[httpx.Response]]]:
+    """
+    Запит кожного сценарію: функція від HTTP-клієнта, юзера та номера запиту.
+
+    :param password: пароль засіяних юзерів
+    :type password: str
+    :rtype: dict
+    """
+    async def signup(http, client, number):
+        return await http.post('/api/auth/signup', json={'username': f'signup{number}',
+                                                         'email': f'signup{number}@example.com', 'password': password})
+
+    async def login(http, client, number):
+        response = await http.post('/api/auth/login', data={'username': client.email, 'password': password})
+        if response.is_success:
+            client.access_token, client.refresh_token = response.json()['access_token'], response.json()['refresh_token']
+        return response
+
+    async def refresh_token(http, client, number):
+        response = await http.get('/api/auth/refresh_token', headers={'Authorization': f'Bearer {client.refresh_token}'})
+        if response.is_success:
+            client.refresh_token = response.json()['refresh_token']
+        return response
+
+    async def contacts_list(http, client, number):
+        return await http.get('/api/contacts/', params={'limit': 20}, headers=client.headers)
+
+    async def contact_create(http, client, number):
+        response = await http.post('/api/contacts/', json=contact_body(number), headers=client.headers)
+        if response.is_success:
+            client.created.append(response.json()['id'])
+        return response
+
+    async def contact_update(http, client, number):
+        contact_id = client.created[number % len(client.created)]
+        return await http.put(f'/api/contacts/{contact_id}', json=contact_body(number + 1), headers=client.headers)
+
+    async def contact_delete(http, client, number):
+        return await http.delete(f'/api/contacts/{client.created.pop()}', headers=client.headers)
+
+    async def search(http, client, number):
+        return await http.get('/api/contacts/search', params={'q': FIRST_NAMES[number % len(FIRST_NAMES)]}, headers=client.headers)
+
+    async def upcoming_birthdays(http, client, number):
+        return await http.get('/api/contacts/upcoming_birthay', params={'days': 7}, headers=client.headers)
+
+    return {name: func for name, func in locals().items() if name in SCENARIOS}
+
+
+async def run(http: httpx.AsyncClient, request, clients: list[Client], requests: int, start: int = 0) -> dict:
+    """
+    ``requests`` запитів сценарію з ``len(clients)`` одночасними клієнтами. Запити діляться між
+    клієнтами порівну, тож видалення контактів припадає на тих самих юзерів, що їх створили.
+
+    :return: пропускна здатність, перцентилі та кількість неуспішних відповідей
+    :rtype: dict
+    """
+    latencies, errors = [], {}
+
+    async def worker(index: int, client: Client):
+        for number in range(start + index, start + requests, len(clients)):
+            begin = time.perf_counter()
+            response = await request(http, client, number)
+            latencies.append(time.perf_counter() - begin)
+            if not response.is_success:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(worker(index, client) for index, client in enumerate(clients)))
+    result = summarize(latencies, time.perf_counter() - begin)
+    result['errors'] = errors
+    return result
+
+
+async def benchmark(http: httpx.AsyncClient, emails: list[str], args) -> dict:
+    clients = [Client(email) for email in emails[:args.concurrency]]
+    requests = scenarios(args.password)
+    for client in clients:
+        (await requests['login'](http, client, 0)).raise_for_status()
+    results, offset = {}, 0
+    for name in args.scenarios:
+        if args.warmup and name not in ('signup', 'contact_create', 'contact_delete'):
+            await run(http, requests[name], clients, args.warmup, offset)
+            offset += args.warmup
+        results[name] = await run(http, requests[name], clients, args.requests, offset)
+        offset += args.requests
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30):
+    async with httpx.AsyncClient(base_url=url) as http:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f'uvicorn exited with code {process.returncode}')
+            try:
+                if (await http.get('/')).is_success:
+                    return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f'uvicorn did not start in {timeout} s')
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """
+    Сценарії, що погіршились відносно еталону більше ніж на ``tolerance``.
+
+    :param results: поточні результати сценаріїв
+    :type results: dict
+    :param baseline: збережений звіт-еталон
+    :type baseline: dict
+    :param tolerance: допустиме відносне погіршення
+    :type tolerance: float
+    :rtype: list[dict]
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if previous['p99_ms'] and current['p99_ms'] > previous['p99_ms'] * (1 + tolerance):
+            regressions.append({'scenario': name, 'metric': 'p99_ms', 'baseline': previous['p99_ms'],
+                                'current': current['p99_ms']})
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append({'scenario': name, 'metric': 'throughput_rps', 'baseline': previous['throughput_rps'],
+                                'current': current['throughput_rps']})
+    return regressions
+
+
+async def main(args) -> int:
+    if args.users < args.concurrency:
+        raise SystemExit('--users must be at least --concurrency: every client logs in as its own user')
+    args.scenarios = [name for name in SCENARIOS if name in args.scenarios]
+    if {'contact_update', 'contact_delete'} & set(args.scenarios) and 'contact_create' not in args.scenarios:
+        raise SystemExit('contact_update and contact_delete work on contacts made by contact_create')
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or 'sqlite+aiosqlite:///' + os.path.join(tmp, 'http.db')
+        # the app reads these at import time, uvicorn inherits them
+        os.environ.update({
+            'SQLALCHEMY_DATABASE_URL': database_url, 'BCRYPT_ROUNDS': str(args.rounds), 'BCRYPT_CALIBRATE': 'false',
+            'RATE_LIMIT_ENABLED': str(args.rate_limit).lower(), 'MAIL_SUPPRESS_SEND': 'true', 'GRAVATAR_ENABLED': 'false',
+        })
+        from src.services.auth import auth_service
+
+        emails = seed(sync_url(database_url), args.users, args.contacts, auth_service.get_password_hash(args.password))
+        if args.url or args.server:
+            url, process = args.url, None
+            if args.server:
+                url = f'http://127.0.0.1:{free_port()}'
+                process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1',
+                                            '--port', url.rsplit(':', 1)[1], '--workers', str(args.workers),
+                                            '--log-level', 'warning'], env=os.environ)
+            try:
+                if process is not None:
+                    await wait_ready(url, process)
+                limits = httpx.Limits(max_connections=args.concurrency)
+                async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as http:
+                    results = await benchmark(http, emails, args)
+            finally:
+                if process is not None:
+                    process.terminate()
+                    process.wait()
+            mode = 'uvicorn'
+        else:
+            from main import app
+
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as http:
+                    results = await benchmark(http, emails, args)
+            mode = 'asgi'
+    data = {
+        'mode': mode,
+        'database': database_url.split(':', 1)[0],
+        'users': args.users,
+        'contacts_per_user': args.contacts,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'bcrypt_rounds': args.rounds,
+        'scenarios': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as file:
+            data['regressions'] = compare(results, json.load(file), args.tolerance)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(data, file, indent=2)
+    report(data)
+    return 1 if data.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--contacts', type=int, default=200, help='contacts per seeded user')
+    parser.add_argument('--requests', type=int, default=300, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests before read scenarios')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt rounds')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--rate-limit', action='store_true', help='keep the rate limiter on (needs Redis)')
+    parser.add_argument('--database-url', help='async database URL, a temporary SQLite file by default')
+    parser.add_argument('--server', action='store_true', help='run the app in a uvicorn subprocess')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn workers with --server')
+    parser.add_argument('--url', help='benchmark an already running server that uses --database-url')
+    parser.add_argument('--save', help='write the report to this file, e.g. as a new baseline')
+    parser.add_argument('--baseline', help='report to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative p99/throughput regression')
+    sys.exit(asyncio.run(main(parser.parse_args())))
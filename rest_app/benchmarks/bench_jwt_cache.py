@@ -0,0 +1,50 @@
+"""
+Накладні витрати автентифікації на запит з кешем перевірених токенів і без нього.
+
+Юзер береться з прогрітого кешу юзерів, тож вимірюється лише розбір і перевірка ключа доступу
+в ``Auth.get_current_user``.
+
+    python -m benchmarks.bench_jwt_cache --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from benchmarks.common import summarize, report
+from src.database.models import User
+from src.services.auth import auth_service
+from src.services.token_cache import token_cache
+from src.services.user_cache import user_cache
+
+
+async def measure(token: str, iterations: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        await auth_service.get_current_user(token, None)
+        latencies.append(time.perf_counter() - begin)
+    result = summarize(latencies, time.perf_counter() - start)
+    result['mean_us'] = round(result['mean_ms'] * 1000, 2)
+    return result
+
+
+async def main(args):
+    user = User(id=1, username='bench', email='bench@example.com', created_at=datetime.now(), confirmed=True)
+    await user_cache.set(user)
+    token = await auth_service.create_access_token(data={'sub': user.email})
+
+    maxsize = token_cache.maxsize
+    token_cache.maxsize = 0
+    without_cache = await measure(token, args.iterations)
+    token_cache.maxsize = maxsize
+    token_cache.clear()
+    with_cache = await measure(token, args.iterations)
+    report({'iterations': args.iterations, 'without_token_cache': without_cache, 'with_token_cache': with_cache})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    asyncio.run(main(parser.parse_args()))
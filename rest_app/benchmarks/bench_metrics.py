@@ -0,0 +1,76 @@
+"""
+Накладні витрати MetricsMiddleware на запит: той самий маршрут FastAPI з middleware метрик і без нього.
+
+Запити викликають ASGI застосунок напряму, без HTTP-клієнта, тож різниця між режимами -
+це вартість пошуку шаблону маршруту, лічильників і гістограм.
+
+    python -m benchmarks.bench_metrics --iterations 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from benchmarks.common import report, summarize
+from src.services.metrics import MetricsMiddleware, observe_query
+
+
+def build_app(metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get('/api/contacts/{contact_id}')
+    async def read_contact(contact_id: int):
+        # two statements per request, as engine events would record them
+        observe_query(0.0005)
+        observe_query(0.0005)
+        return {'id': contact_id}
+
+    if metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, iterations: int, paths: int) -> dict:
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+                'path': f'/api/contacts/{i % paths}', 'raw_path': f'/api/contacts/{i % paths}'.encode(),
+                'query_string': b'', 'headers': [], 'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 80)}
+
+    for i in range(min(iterations, 1000)):
+        await app(scope(i), receive, send)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        begin = time.perf_counter()
+        await app(scope(i), receive, send)
+        latencies.append(time.perf_counter() - begin)
+    result = summarize(latencies, time.perf_counter() - start)
+    result['mean_us'] = round(result['mean_ms'] * 1000, 2)
+    return result
+
+
+async def main(args):
+    without_metrics = await measure(build_app(False), args.iterations, args.paths)
+    with_metrics = await measure(build_app(True), args.iterations, args.paths)
+    report({
+        'iterations': args.iterations,
+        'paths': args.paths,
+        'without_metrics': without_metrics,
+        'with_metrics': with_metrics,
+        'overhead_p50_us': round((with_metrics['p50_ms'] - without_metrics['p50_ms']) * 1000, 2),
+        'overhead_p99_us': round((with_metrics['p99_ms'] - without_metrics['p99_ms']) * 1000, 2),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    parser.add_argument('--paths', type=int, default=1000, help='кількість різних шляхів (id контактів)')
+    asyncio.run(main(parser.parse_args()))
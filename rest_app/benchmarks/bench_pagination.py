@@ -0,0 +1,71 @@
+"""
+Затримка першої та тисячної сторінки списку контактів: skip/limit проти курсора.
+
+    python -m benchmarks.bench_pagination --contacts 50000 --page 1000
+    python -m benchmarks.bench_pagination --sync-url postgresql://... --async-url postgresql+asyncpg://...
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from benchmarks.common import summarize, report, seed_contacts
+from src.repository import contacts as repository_contacts
+
+
+async def measure(fetch, repeat: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        await fetch()
+        latencies.append(time.perf_counter() - begin)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main(args):
+    user = seed_contacts(args.sync_url, args.contacts)
+    engine = create_async_engine(args.async_url)
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    skip = (args.page - 1) * args.limit
+    results = {}
+
+    async with SessionLocal() as db:
+        # the last contact of the previous page is what a client would hold as its cursor
+        previous = await repository_contacts.get_contacts(skip - 1, 1, user, db, args.sort)
+        last = previous[0]
+        seek_value = getattr(last, args.sort)
+
+        for page, offset, after in ((1, 0, None), (args.page, skip, (seek_value, last.id))):
+            async def offset_page():
+                await repository_contacts.get_contacts(offset, args.limit, user, db, args.sort)
+
+            async def keyset_page():
+                if after is None:
+                    await repository_contacts.get_contacts(0, args.limit, user, db, args.sort)
+                else:
+                    await repository_contacts.get_contacts_after(args.sort, after[0], after[1], args.limit, user, db)
+
+            results[f'page_{page}'] = {
+                'offset': await measure(offset_page, args.repeat),
+                'keyset': await measure(keyset_page, args.repeat),
+            }
+    await engine.dispose()
+    report({'contacts': args.contacts, 'limit': args.limit, 'sort': args.sort, **results})
+
+
+if __name__ == '__main__':
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'bench.db')
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sync-url', default=f'sqlite:///{db_path}')
+    parser.add_argument('--async-url', default=f'sqlite+aiosqlite:///{db_path}')
+    parser.add_argument('--contacts', type=int, default=50_000)
+    parser.add_argument('--page', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--sort', default='last_name', choices=['id', 'first_name', 'last_name', 'email', 'birthday'])
+    parser.add_argument('--repeat', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
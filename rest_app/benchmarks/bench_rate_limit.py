@@ -0,0 +1,99 @@
+"""
+Накладні витрати RateLimitMiddleware на запит (p50/p99) порівняно з тим самим ASGI застосунком без нього.
+
+Без ``--redis-url`` використовується fakeredis: він виконує Lua в Python значно повільніше
+за Redis, тож час виконання скриптів віднімається від затримки запиту.
+
+    python -m benchmarks.bench_rate_limit --requests 5000 --clients 200
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+from benchmarks.common import percentile, report, summarize
+from src.services.rate_limit import RateLimiter, RateLimitMiddleware
+
+
+class TimedRedis:
+    """
+    FakeAsyncRedis, що рахує час виконання скриптів.
+    """
+
+    def __init__(self):
+        from fakeredis import FakeAsyncRedis
+
+        self.redis = FakeAsyncRedis()
+        self.elapsed = 0.0
+
+    def register_script(self, script: str):
+        run = self.redis.register_script(script)
+
+        async def timed(keys, args):
+            start = time.perf_counter()
+            try:
+                return await run(keys=keys, args=args)
+            finally:
+                self.elapsed += time.perf_counter() - start
+        return timed
+
+
+async def app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'{}'})
+
+
+app.router = MagicMock(routes=[])
+
+
+async def run_requests(handler, redis, clients: int, requests: int) -> list:
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(message):
+        pass
+
+    latencies = []
+    for number in range(requests):
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/contacts/', 'headers': [],
+                 'client': (f'10.0.0.{number % clients}', 1000), 'app': app}
+        redis_time = getattr(redis, 'elapsed', 0.0)
+        start = time.perf_counter()
+        await handler(scope, receive, send)
+        latencies.append(time.perf_counter() - start - (getattr(redis, 'elapsed', 0.0) - redis_time))
+    return latencies
+
+
+async def main(args):
+    if args.redis_url:
+        from redis import asyncio as aioredis
+
+        redis = aioredis.from_url(args.redis_url)
+    else:
+        redis = TimedRedis()
+    limiter = RateLimiter(lambda: redis, prefilter=args.prefilter, retry_after=1)
+    limited = RateLimitMiddleware(app, limiter, limit=args.limit, window=60, routes={}, identify=lambda token: None)
+
+    await run_requests(limited, redis, args.clients, min(args.requests, 500))
+    base = await run_requests(app, redis, args.clients, args.requests)
+    with_limit = await run_requests(limited, redis, args.clients, args.requests)
+    report({
+        'requests': args.requests,
+        'clients': args.clients,
+        'redis': args.redis_url or 'fakeredis (script time subtracted)',
+        'without_rate_limit': summarize(base, sum(base)),
+        'with_rate_limit': summarize(with_limit, sum(with_limit)),
+        'overhead_p50_ms': round((percentile(with_limit, 50) - percentile(base, 50)) * 1000, 3),
+        'overhead_p99_ms': round((percentile(with_limit, 99) - percentile(base, 99)) * 1000, 3),
+        'limiter': limiter.stats(),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--limit', type=int, default=100, help='ліміт запитів на клієнта за хвилину')
+    parser.add_argument('--prefilter', type=float, default=0.1)
+    parser.add_argument('--redis-url', help='Redis замість fakeredis, наприклад redis://localhost:6379/0')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,66 @@
+"""
+Серіалізація відповіді зі списком контактів: шлях FastAPI через response_model
+(перевірка кожного рядка ResponseModel, jsonable_encoder, json.dumps) проти contacts_response.
+
+    python -m benchmarks.bench_serialization --contacts 1000 --iterations 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from benchmarks.common import summarize, report
+from src.database.models import Contact
+from src.schemas import ResponseModel
+from src.services.responses import contacts_response
+
+
+async def response_model_path(field, contacts: list) -> bytes:
+    content = await serialize_response(field=field, response_content=contacts)
+    return JSONResponse(content).body
+
+
+async def fast_path(field, contacts: list) -> bytes:
+    return contacts_response(contacts).body
+
+
+async def measure(render, field, contacts: list, iterations: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        body = await render(field, contacts)
+        latencies.append(time.perf_counter() - begin)
+    result = summarize(latencies, time.perf_counter() - start)
+    result['bytes'] = len(body)
+    return result
+
+
+async def main(args):
+    contacts = [
+        Contact(id=i, first_name=f'Name{i % 997}', last_name=f'Last{i % 991}', email=f'contact{i}@example.com',
+                birthday=date(1990, 1 + i % 12, 1 + i % 28), description='bench ' * 10)
+        for i in range(args.contacts)
+    ]
+    field = create_response_field(name='Response_read_contacts', type_=List[ResponseModel])
+    before = await measure(response_model_path, field, contacts, args.iterations)
+    after = await measure(fast_path, field, contacts, args.iterations)
+    report({
+        'contacts': args.contacts,
+        'iterations': args.iterations,
+        'response_model': before,
+        'contacts_response': after,
+        'speedup': round(before['mean_ms'] / after['mean_ms'], 2) if after['mean_ms'] else None,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contacts', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""
+Затримка реєстрації юзера з пошуком зображення в Gravatar в обробнику запиту ("до")
+і фоновим кроком після збереження юзера ("після").
+
+Gravatar замінює локальний HTTP-сервер, що відповідає 404 із затримкою ``--gravatar-ms``
+(більшість адрес не має зображення в Gravatar). Реєстрація - це хешування пароля
+та ``repository.users.create_user`` на SQLite.
+
+    python -m benchmarks.bench_signup --requests 200 --concurrency 2 --gravatar-ms 150
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from benchmarks.common import summarize, report
+from src.database.models import Base
+from src.repository import users as repository_users
+from src.schemas import UserModel
+from src.services.auth import auth_service
+from src.services.gravatar import GravatarResolver
+
+
+def stub_server(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubResolver(GravatarResolver):
+
+    def __init__(self, port: int):
+        super().__init__(timeout=2, maxsize=10000, ttl=3600, error_ttl=60)
+        self.port = port
+
+    def _download(self, url: str) -> bytes | None:
+        parts = urlsplit(url)
+        return super()._download(f'http://127.0.0.1:{self.port}{parts.path}?{parts.query}')
+
+
+async def run(signup, requests: int, concurrency: int) -> dict:
+    latencies, numbers = [], iter(range(requests))
+
+    async def worker():
+        for number in numbers:
+            start = time.perf_counter()
+            await signup(number)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def main(args):
+    auth_service.hasher.set_rounds(args.rounds)
+    server = stub_server(args.gravatar_ms / 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(tmp, 'signup.db'))
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        background = set()
+
+        async def signup(prefix: str, number: int, inline: bool):
+            resolver = StubResolver(server.server_port)
+            body = UserModel(username=f'user{number}', email=f'{prefix}{number}@example.com', password='password123')
+            if inline:
+                await resolver.resolve(body.email)
+            body.password = await auth_service.hash_password(body.password)
+            async with SessionLocal() as db:
+                await repository_users.create_user(body, db)
+            if not inline:
+                task = asyncio.create_task(resolver.resolve(body.email))
+                background.add(task)
+                task.add_done_callback(background.discard)
+
+        before = await run(lambda n: signup('inline', n, True), args.requests, args.concurrency)
+        after = await run(lambda n: signup('deferred', n, False), args.requests, args.concurrency)
+        await asyncio.gather(*background)
+        await engine.dispose()
+    server.shutdown()
+    auth_service.hasher.shutdown()
+    report({
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'bcrypt_rounds': args.rounds,
+        'gravatar_ms': args.gravatar_ms,
+        'inline_gravatar': before,
+        'deferred_gravatar': after,
+        'p99_ratio': round(before['p99_ms'] / after['p99_ms'], 2) if after['p99_ms'] else None,
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--gravatar-ms', type=float, default=150)
+    parser.add_argument('--rounds', type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
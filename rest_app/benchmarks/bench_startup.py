@@ -0,0 +1,94 @@
+"""
+Час імпорту застосунку (``import main``) за ``python -X importtime``.
+
+Кожен запуск - окремий процес, тож кеш модулів не впливає на результат. Звіт містить
+загальний час імпорту, час імпорту самого застосунку після фреймворків (``--preload``),
+найдорожчі модулі та перелік інтеграцій, що мають завантажуватись лише при першому використанні.
+
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import report
+
+# integrations that must not be imported together with the app, only on first use
+DEFERRED = ('cloudinary', 'fastapi_mail', 'PIL', 'libgravatar', 'jinja2', 'aiosmtplib', 'asyncpg', 'redis',
+            'jose.jwt', 'passlib.context')
+# frameworks every request needs anyway
+PRELOAD = ('fastapi', 'fastapi.security', 'sqlalchemy.orm', 'sqlalchemy.ext.asyncio', 'pydantic', 'pydantic_settings',
+           'email_validator')
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """
+    Рядки ``-X importtime``: модуль, глибина вкладеності, власний та накопичений час, мкс.
+
+    :param stderr: вивід процесу з ``-X importtime``
+    :type stderr: str
+    :rtype: list[tuple[str, int, int, int]]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(own), int(cumulative)))
+    return rows
+
+
+def measure(preload: tuple = ()) -> tuple[list, list]:
+    """
+    Імпорт застосунку в окремому процесі.
+
+    :param preload: модулі, що імпортуються до застосунку і не входять у замір
+    :type preload: tuple
+    :return: рядки ``-X importtime`` та завантажені відкладені інтеграції
+    :rtype: tuple[list, list]
+    """
+    code = ''.join(f'import {name}\n' for name in preload) + (
+        'import sys\nsys.stderr.write("--app--\\n")\nimport main\n'
+        f'print(",".join(name for name in {DEFERRED!r} if name in sys.modules))\n')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                            env=os.environ, check=True)
+    stderr = result.stderr.split('--app--\n', 1)[1]
+    return parse_importtime(stderr), [name for name in result.stdout.strip().split(',') if name]
+
+
+def main_ms(rows: list) -> float:
+    return next(cumulative for name, depth, _, cumulative in rows if name == 'main' and depth == 0) / 1000
+
+
+def main(args):
+    cold, warm, loaded = [], [], set()
+    for _ in range(args.runs):
+        rows, deferred = measure()
+        cold.append(rows)
+        loaded.update(deferred)
+        warm.append(measure(PRELOAD)[0])
+    modules = {}
+    for rows in cold:
+        for name, depth, _, cumulative in rows:
+            if depth <= args.depth:
+                modules.setdefault(name, []).append(cumulative / 1000)
+    top = sorted(((name, round(statistics.median(values), 1)) for name, values in modules.items()),
+                 key=lambda item: item[1], reverse=True)
+    report({
+        'runs': args.runs,
+        'import_main_ms': round(statistics.median(main_ms(rows) for rows in cold), 1),
+        'import_main_after_frameworks_ms': round(statistics.median(main_ms(rows) for rows in warm), 1),
+        'deferred_modules_loaded': sorted(loaded),
+        'top_modules_ms': dict(top[:args.top]),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--depth', type=int, default=2, help='deepest import level listed in top_modules_ms')
+    main(parser.parse_args())
@@ -0,0 +1,125 @@
+"""
+Спільні утиліти для бенчмарків.
+
+Бенчмарки запускаються з каталогу ``rest_app``::
+
+    python -m benchmarks.bench_async_db
+"""
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterable, List
+
+# Settings() needs these values; they are only filled in when there is no .env to read them from
+if not os.path.exists('.env'):
+    for key, value in {
+        'SQLALCHEMY_DATABASE_URL': 'sqlite+aiosqlite:///./bench.db', 'SECRET_KEY': 'benchmark-secret', 'ALGORITHM': 'HS256',
+        'MAIL_USERNAME': 'bench', 'MAIL_PASSWORD': 'bench', 'MAIL_FROM': 'bench@example.com', 'MAIL_PORT': '465',
+        'MAIL_SERVER': 'localhost', 'POSTGRES_DB': 'bench', 'POSTGRES_USER': 'bench', 'POSTGRES_PASSWORD': 'bench',
+        'POSTGRES_PORT': '5432', 'REDIS_HOST': 'localhost', 'REDIS_PORT': '6379', 'CLOUDINARY_NAME': 'bench',
+        'CLOUDINARY_API_KEY': 'bench', 'CLOUDINARY_API_SECRET': 'bench',
+    }.items():
+        os.environ.setdefault(key, value)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from src.database.models import Base, Contact, User
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Повертає q-й перцентиль (0..100) методом найближчого рангу.
+
+    :param values: виміряні значення
+    :type values: List[float]
+    :param q: перцентиль
+    :type q: float
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: Iterable[float], elapsed: float) -> dict:
+    """
+    Зведена статистика для серії замірів у секундах.
+
+    :param latencies: тривалість кожної операції, с
+    :type latencies: Iterable[float]
+    :param elapsed: загальний час серії, с
+    :type elapsed: float
+    :return: кількість операцій, пропускна здатність та перцентилі в мілісекундах
+    :rtype: dict
+    """
+    values = list(latencies)
+    return {
+        'count': len(values),
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+    }
+
+
+@contextmanager
+def timer():
+    """
+    Контекстний менеджер, що повертає список з одним елементом - тривалістю блоку в секундах.
+    """
+    result = [0.0]
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result[0] = time.perf_counter() - start
+
+
+def report(data: dict):
+    """
+    Друкує результат бенчмарку у форматі JSON.
+
+    :param data: результати
+    :type data: dict
+    """
+    print(json.dumps(data, indent=2, ensure_ascii=False, default=str))
+
+
+def seed_contacts(sync_url: str, contacts: int, batch: int = 10_000) -> User:
+    """
+    Створює чисту схему та одного юзера з заданою кількістю контактів.
+
+    :param sync_url: синхронний URL бази даних
+    :type sync_url: str
+    :param contacts: кількість контактів
+    :type contacts: int
+    :param batch: розмір пакета вставки
+    :type batch: int
+    :return: від'єднаний об'єкт юзера
+    :rtype: User
+    """
+    engine = create_engine(sync_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine, expire_on_commit=False) as db:
+        user = User(username='bench', email='bench@example.com', password='x', confirmed=True)
+        db.add(user)
+        db.commit()
+        for offset in range(0, contacts, batch):
+            rows = [
+                {'first_name': f'Name{i % 997}', 'last_name': f'Last{i % 991}', 'email': f'contact{i}@example.com',
+                 'birthday': date(1990, 1 + i % 12, 1 + i % 28), 'description': 'bench', 'user_id': user.id}
+                for i in range(offset, min(offset + batch, contacts))
+            ]
+            db.execute(insert(Contact), rows)
+        db.commit()
+        db.expunge(user)
+    engine.dispose()
+    return user
@@ -1,15 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_redis_rate_limiter import RedisRateLimiterMiddleware, RedisClient
 
-from src.routes import contacts, auth, users
+from src.database.db import get_engine, dispose_engine
+from src.routes import contacts, auth, users, avatars, internal, metrics
+from src.services.auth import auth_service
+from src.services.email import mail_sender
+from src.services.redis_client import get_redis, close_redis
+from src.services.metrics import MetricsMiddleware
+from src.services.query_profiler import QueryProfilerMiddleware
+from src.services.rate_limit import RateLimitMiddleware, rate_limiter, token_subject
+from src.conf.config import settings
+from src.services.responses import FastJSONResponse
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # clients are created here and not at import time, so importing the app stays cheap
+    get_engine()
+    if settings.rate_limit_enabled or settings.user_cache_redis or settings.contacts_cache_redis:
+        get_redis()
+    if settings.bcrypt_calibrate:
+        # calibration may only raise the configured cost, a slow host must not weaken new hashes
+        await asyncio.to_thread(auth_service.hasher.calibrate, settings.bcrypt_target_ms,
+                                max(settings.bcrypt_min_rounds, settings.bcrypt_rounds), settings.bcrypt_max_rounds)
+    yield
+    await mail_sender.close(settings.mail_shutdown_timeout)
+    auth_service.hasher.shutdown()
+    await close_redis()
+    await dispose_engine()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
-# Initialize the Redis client
-redis_client = RedisClient(host='localhost', port='6379', db=0)
-# Apply the rate limiter middleware to the app
-app.add_middleware(RedisRateLimiterMiddleware, redis_client=redis_client, limit=30, window=60)
+# per route and per user (or client IP) rate limit, counters are shared by all workers through Redis
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, limit=settings.rate_limit,
+                       window=settings.rate_limit_window, routes=settings.rate_limit_routes, identify=token_subject)
 # add CORS origins
 origins = [
     "http://localhost:3000",
@@ -20,12 +47,24 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=['*'],
-    allow_headers=['*']
+    allow_headers=['*'],
+    expose_headers=['X-Next-Cursor', 'ETag']
 )
+# database queries per request: N+1 warnings in the log and, for debugging, X-DB-Queries and Server-Timing headers
+app.add_middleware(QueryProfilerMiddleware, n_plus_one=settings.n_plus_one_threshold,
+                   headers=settings.db_debug_headers)
+# outermost, so rate limited and CORS preflight responses are measured too
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix='/api')
 app.include_router(contacts.router, prefix='/api')
 app.include_router(users.router, prefix='/api')
+app.include_router(avatars.router, prefix='/api')
+# pool, cache and queue internals are served only when a token for them is configured
+if settings.internal_token:
+    app.include_router(internal.router)
+app.include_router(metrics.router)
 
 @app.get('/')
 def read_root():
@@ -0,0 +1,39 @@
+"""contacts per-user composite indexes
+
+Revision ID: 5f2c1a9d7e40
+Revises: be6a82746ee5
+Create Date: 2026-10-16 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c1a9d7e40'
+down_revision: Union[str, None] = 'be6a82746ee5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_contacts_user_id_id', ['user_id', 'id']),
+    ('ix_contacts_user_id_first_name', ['user_id', 'first_name', 'id']),
+    ('ix_contacts_user_id_last_name', ['user_id', 'last_name', 'id']),
+    ('ix_contacts_user_id_email', ['user_id', 'email']),
+    ('ix_contacts_user_id_birthday', ['user_id', 'birthday']),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'contacts', columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='contacts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,40 @@
+"""contacts birthday and email sort indexes
+
+Revision ID: 7b1e5c9a4d28
+Revises: e2d84f61a9b3
+Create Date: 2026-10-17 10:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e5c9a4d28'
+down_revision: Union[str, None] = 'e2d84f61a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# sort=birthday and sort=email pages (offset and keyset) read the index in (value, id) order
+INDEXES = (
+    ('ix_contacts_user_id_birthday', ['user_id', 'birthday', 'id']),
+    ('ix_contacts_user_id_email_id', ['user_id', 'email', 'id']),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'contacts', columns, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_contacts_user_id_email', table_name='contacts', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_user_id_email', 'contacts', ['user_id', 'email'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='contacts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""contacts birthday month-day column
+
+Revision ID: a83d4c6e2b17
+Revises: 5f2c1a9d7e40
+Create Date: 2026-10-16 21:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d4c6e2b17'
+down_revision: Union[str, None] = '5f2c1a9d7e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE contacts SET birthday_md = CAST(strftime('%m%d', birthday) AS INTEGER)")
+    else:
+        op.execute('UPDATE contacts SET birthday_md = EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday)')
+    with op.batch_alter_table('contacts') as batch_op:
+        batch_op.alter_column('birthday_md', existing_type=sa.SmallInteger(), nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_user_id_birthday_md', 'contacts', ['user_id', 'birthday_md'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_contacts_user_id_birthday', table_name='contacts', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_user_id_birthday', 'contacts', ['user_id', 'birthday'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_contacts_user_id_birthday_md', table_name='contacts', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('contacts', 'birthday_md')
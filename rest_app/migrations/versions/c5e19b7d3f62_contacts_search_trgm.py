@@ -0,0 +1,37 @@
+"""contacts trigram search index
+
+Revision ID: c5e19b7d3f62
+Revises: a83d4c6e2b17
+Create Date: 2026-10-16 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e19b7d3f62'
+down_revision: Union[str, None] = 'a83d4c6e2b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the trigram index only exists on PostgreSQL, other databases search with the in-process index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_user_id_search_trgm ON contacts USING gin "
+            "(user_id, lower(first_name || ' ' || last_name || ' ' || email || ' ' || coalesce(description, '')) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_contacts_user_id_search_trgm', table_name='contacts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,28 @@
+"""users contacts version
+
+Revision ID: e2d84f61a9b3
+Revises: c5e19b7d3f62
+Create Date: 2026-10-16 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d84f61a9b3'
+down_revision: Union[str, None] = 'c5e19b7d3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('contacts_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('contacts_modified_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'contacts_modified_at')
+    op.drop_column('users', 'contacts_version')
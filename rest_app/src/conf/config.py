@@ -19,6 +19,63 @@ class Settings(BaseSettings):
     cloudinary_name: str
     cloudinary_api_key: str
     cloudinary_api_secret: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_timeout: float = 30
+    internal_token: str = ''
+    redis_socket_timeout: float = 0.5
+    user_cache_size: int = 1024
+    user_cache_ttl: float = 60
+    user_cache_local_ttl: float = 5
+    user_cache_redis: bool = False
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 64
+    bcrypt_rounds: int = 12
+    bcrypt_calibrate: bool = True
+    bcrypt_target_ms: float = 250
+    bcrypt_min_rounds: int = 12
+    bcrypt_max_rounds: int = 15
+    token_cache_size: int = 10000
+    token_cache_max_ttl: float = 900
+    bulk_import_batch_size: int = 1000
+    bulk_import_max_errors: int = 1000
+    search_similarity_threshold: float = 0.3
+    search_index_size: int = 256
+    search_index_ttl: float = 300
+    contacts_cache_redis: bool = False
+    contacts_cache_ttl: float = 60
+    mail_pool_size: int = 2
+    mail_queue_size: int = 1000
+    mail_batch_size: int = 20
+    mail_max_retries: int = 3
+    mail_retry_backoff: float = 0.5
+    mail_shutdown_timeout: float = 10
+    mail_suppress_send: bool = False
+    avatar_storage: str = 'cloudinary'
+    avatar_local_dir: str = 'media/avatars'
+    avatar_base_url: str = '/api/avatars'
+    avatar_variant_sizes: list[int] = [32, 64, 128]
+    avatar_memory_items: int = 4096
+    gravatar_enabled: bool = True
+    gravatar_timeout: float = 2
+    gravatar_cache_size: int = 10000
+    gravatar_cache_ttl: float = 86400
+    gravatar_error_ttl: float = 300
+    rate_limit_enabled: bool = True
+    rate_limit: int = 30
+    rate_limit_window: float = 60
+    rate_limit_routes: dict[str, int] = {'GET /api/avatars/{digest}': 0, 'GET /metrics': 0}
+    rate_limit_prefilter: float = 0.1
+    rate_limit_retry_after: float = 1
+    avatar_max_bytes: int = 5 * 1024 * 1024
+    avatar_size: int = 250
+    avatar_upload_concurrency: int = 4
+    metrics_enabled: bool = True
+    slow_query_seconds: float = 0.2
+    n_plus_one_threshold: int = 5
+    db_debug_headers: bool = False
 
     class Config:
         env_file = '.env'
@@ -1,15 +1,114 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from src.conf.config import settings
+from src.database.pool import InstrumentedQueuePool
+from src.services.metrics import observe_query
+from src.services.query_profiler import query_profiler
+
+# synchronous drivers from existing .env files and their asyncio counterparts
+ASYNC_DRIVERS = {
+    'postgres': 'postgresql+asyncpg',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_url(url: str) -> str:
+    """
+    URL бази даних з асинхронним драйвером: ``postgresql://`` -> ``postgresql+asyncpg://``,
+    ``sqlite://`` -> ``sqlite+aiosqlite://``. Інші URL повертаються без змін.
+
+    :param url: URL бази даних
+    :type url: str
+    :rtype: str
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+SQLALCHEMY_DATABASE_URL = async_url(settings.sqlalchemy_database_url)
+
+_engine: AsyncEngine | None = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        seconds = time.perf_counter() - context._query_start
+        observe_query(seconds)
+        query_profiler.record(statement, parameters, seconds, executemany)
+
+
+def instrument_engine(engine: Engine):
+    """
+    Облік тривалості кожного запиту до бази даних у метриках (див. ``src.services.metrics``)
+    і в журналі запитів поточного HTTP-запиту (див. ``src.services.query_profiler``).
+
+    :param engine: синхронний рушій (``AsyncEngine.sync_engine``)
+    :type engine: Engine
+    """
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Спільний рушій бази даних. Створюється при старті застосунку (lifespan у main.py)
+    або при першому зверненні, а не при імпорті модуля: створення рушія завантажує драйвер бази даних.
+
+    :return: рушій бази даних
+    :rtype: AsyncEngine
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            SQLALCHEMY_DATABASE_URL,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping,
+            pool_timeout=settings.db_pool_timeout,
+        )
+        instrument_engine(_engine.sync_engine)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+async def dispose_engine():
+    """
+    Закриття з'єднань пулу при зупинці застосунку.
+    """
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+
+
+class LazySessionMaker(async_sessionmaker):
+    """
+    Фабрика сесій, що створює рушій бази даних перед першою сесією.
+    """
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
 
-SQLALCHEMY_DATABASE_URL = settings.sqlalchemy_database_url
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionMaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
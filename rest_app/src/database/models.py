@@ -1,12 +1,23 @@
-from sqlalchemy import Column, String, Integer, func, Date, Boolean
+from datetime import date
+
+from sqlalchemy import Column, String, Integer, SmallInteger, func, Date, Boolean, Index, literal_column
 from sqlalchemy.sql.sqltypes import DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql.schema import ForeignKey
 
 
 Base = declarative_base()
 
+def month_day(value: date) -> int:
+    """
+    Місяць і день дати у вигляді числа MMDD (19 червня -> 619), не залежить від року.
+    """
+    return value.month * 100 + value.day
+
+def _default_birthday_md(context) -> int:
+    return month_day(context.get_current_parameters()['birthday'])
+
 class Contact(Base):
     __tablename__ = 'contacts'
     id = Column(Integer, primary_key=True)
@@ -14,11 +25,39 @@ class Contact(Base):
     last_name = Column(String(25), nullable=False)
     email = Column(String(120), nullable=False, unique=True)
     birthday = Column(Date, nullable=False)
+    birthday_md = Column(SmallInteger, nullable=False, default=_default_birthday_md)
     description = Column(String, nullable=True)
     created_at = Column('created_at', DateTime, default=func.now())
     user_id = Column('user_id', ForeignKey('users.id', ondelete='CASCADE'), default=None)
     user = relationship('User', backref='contacts')
 
+    __table_args__ = (
+        Index('ix_contacts_user_id_id', 'user_id', 'id'),
+        Index('ix_contacts_user_id_first_name', 'user_id', 'first_name', 'id'),
+        Index('ix_contacts_user_id_last_name', 'user_id', 'last_name', 'id'),
+        Index('ix_contacts_user_id_email_id', 'user_id', 'email', 'id'),
+        Index('ix_contacts_user_id_birthday', 'user_id', 'birthday', 'id'),
+        Index('ix_contacts_user_id_birthday_md', 'user_id', 'birthday_md'),
+    )
+
+    @validates('birthday')
+    def _sync_birthday_md(self, key, value):
+        if value is not None:
+            self.birthday_md = month_day(value)
+        return value
+
+# spaces are inlined, not bound, so queries render exactly the indexed expression
+_space = literal_column("' '")
+contact_search_document = func.lower(
+    Contact.first_name + _space + Contact.last_name + _space + Contact.email + _space
+    + func.coalesce(Contact.description, literal_column("''"))
+)
+
+Index(
+    'ix_contacts_user_id_search_trgm', Contact.user_id, contact_search_document.label('search_document'),
+    postgresql_using='gin', postgresql_ops={'search_document': 'gin_trgm_ops'},
+).ddl_if(dialect='postgresql')
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
@@ -28,4 +67,6 @@ class User(Base):
     password = Column(String(255), nullable=False)
     created_at = Column('crated_at', DateTime, default=func.now())
     refresh_token = Column(String(255), nullable=True)
-    confirmed = Column(Boolean, default=False)
\ No newline at end of file
+    confirmed = Column(Boolean, default=False)
+    contacts_version = Column(Integer, nullable=False, default=0, server_default='0')
+    contacts_modified_at = Column(DateTime, nullable=True)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import time
+from bisect import bisect_left
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """
+    Статистика видачі з'єднань з пулу.
+
+    :param buckets: верхні межі кошиків гістограми часу очікування, с
+    """
+    buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Обнулення статистики.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def observe(self, seconds: float):
+        """
+        Запис часу очікування успішно виданого з'єднання.
+
+        :param self: посилання на поточний об'єкт класу
+        :param seconds: час очікування, с
+        :type seconds: float
+        """
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.wait_sum += seconds
+        self.checkouts += 1
+
+    def snapshot(self, pool=None) -> dict:
+        """
+        Поточний стан пулу та накопичена статистика.
+
+        :param self: посилання на поточний об'єкт класу
+        :param pool: пул з'єднань, стан якого треба додати
+        :return: словник зі станом пулу, лічильниками та кумулятивною гістограмою
+        :rtype: dict
+        """
+        histogram, total = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            histogram['+Inf' if bound == float('inf') else str(bound)] = total
+        data = {
+            'checkouts': self.checkouts,
+            'checkout_failures': self.failures,
+            'checkout_timeouts': self.timeouts,
+            'wait_seconds_sum': round(self.wait_sum, 6),
+            'wait_seconds_histogram': histogram,
+        }
+        if pool is not None and hasattr(pool, 'checkedout'):
+            data.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+            })
+        return data
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул з'єднань, що вимірює час очікування з'єднання та рахує невдалі спроби.
+    Статистика спільна для всіх екземплярів (пул перестворюється після dispose()).
+    """
+    stats = pool_stats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            self.stats.failures += 1
+            raise
+        except Exception:
+            self.stats.failures += 1
+            raise
+        self.stats.observe(time.perf_counter() - start)
+        return connection
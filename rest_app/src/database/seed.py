@@ -0,0 +1,318 @@
+"""
+Генератор синтетичних даних і масове завантаження юзерів та контактів для навантажувального тестування.
+
+Набір даних детермінований (``--seed``): кількість контактів у юзерів розподілена за законом Ципфа
+(``--skew``, 0 - порівну), дні народження рівномірно розподілені по року, а імена беруться з невеликого
+словника з варіантами написання (регістр, пропущена чи подвоєна літера), тож багато контактів мають
+однакові чи схожі імена. У Postgres дані завантажуються через COPY, у SQLite - через executemany
+великими транзакціями; індекси контактів при ``--reset`` створюються вже після завантаження.
+
+    python -m src.database.seed --users 10000 --contacts 10000000 --reset
+    python -m src.database.seed --database-url sqlite:///./load.db --users 1000 --contacts 100000 --reset
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, Sequence
+
+from sqlalchemy import Engine, Table, create_engine, func, select, text
+
+from src.database.models import Base, Contact, User, month_day
+
+FIRST_NAMES = (
+    'Olena', 'Andrii', 'Iryna', 'Oleksandr', 'Natalia', 'Dmytro', 'Tetiana', 'Serhii', 'Yulia', 'Mykola', 'Oksana',
+    'Volodymyr', 'Kateryna', 'Ivan', 'Mariia', 'Taras', 'Sofiia', 'Bohdan', 'Anna', 'Petro', 'John', 'Mary',
+    'James', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth', 'David', 'Barbara',
+    'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen', 'Anne', 'Ann', 'Hanna',
+    'Alex', 'Alexander', 'Alexandra', 'Sasha', 'Maria', 'Marie', 'Jon', 'Jan', 'Eva', 'Eve', 'Lee', 'Li',
+)
+LAST_NAMES = (
+    'Shevchenko', 'Kovalenko', 'Bondarenko', 'Tkachenko', 'Kravchenko', 'Boiko', 'Melnyk', 'Oliinyk', 'Koval',
+    'Shevchuk', 'Polishchuk', 'Lysenko', 'Marchenko', 'Moroz', 'Savchenko', 'Rudenko', 'Smith', 'Johnson',
+    'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez',
+    'Wilson', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Jackson', 'Martin', 'Lee', 'Thompson', 'White', 'Harris',
+    'Clark', 'Lewis', 'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Green', 'Baker', 'Adams', 'Nelson',
+)
+DOMAINS = ('gmail.com', 'ukr.net', 'outlook.com', 'i.ua', 'yahoo.com', 'example.com', 'meta.ua', 'proton.me')
+DESCRIPTIONS = (None, None, None, None, 'friend', 'colleague', 'family', 'neighbour', 'gym', 'university',
+                'met at the conference', 'call back after the holidays')
+
+USER_COLUMNS = ('id', 'username', 'email', 'password', 'confirmed', 'crated_at', 'contacts_version')
+CONTACT_COLUMNS = ('id', 'first_name', 'last_name', 'email', 'birthday', 'birthday_md', 'description', 'created_at',
+                   'user_id')
+CREATED_AT = '2024-01-01 00:00:00.000000'
+
+
+def user_email(user_id: int) -> str:
+    """
+    Електронна пошта згенерованого юзера.
+
+    :param user_id: ID юзера
+    :type user_id: int
+    :rtype: str
+    """
+    return f'user{user_id}@example.com'
+
+
+def sync_url(url: str) -> str:
+    """
+    Синхронний URL бази даних: ``sqlite+aiosqlite`` -> ``sqlite``, ``postgresql+asyncpg`` -> ``postgresql+psycopg2``.
+
+    :param url: асинхронний URL застосунку
+    :type url: str
+    :rtype: str
+    """
+    return url.replace('+aiosqlite', '').replace('+asyncpg', '+psycopg2')
+
+
+def _variants(name: str, rng: random.Random) -> list[tuple[str, str]]:
+    # exact spelling dominates, the rest are the typos and casing users really type
+    variants = [name] * 6 + [name.lower(), name.upper()]
+    if len(name) > 3:
+        index = rng.randrange(1, len(name) - 1)
+        variants.append(name[:index] + name[index + 1:])
+        variants.append(name[:index] + name[index] + name[index:])
+    return [(variant, name.lower()) for variant in variants]
+
+
+class DatasetGenerator:
+    """
+    Детермінований генератор юзерів і контактів. Рядки повертаються кортежами в порядку
+    ``USER_COLUMNS`` та ``CONTACT_COLUMNS``, тож їх можна одразу передати в executemany чи COPY.
+
+    :param users: кількість юзерів
+    :param contacts: загальна кількість контактів
+    :param seed: зерно генератора випадкових чисел
+    :param skew: показник закону Ципфа для кількості контактів у юзера, 0 - порівну
+    :param password_hash: хеш пароля всіх юзерів
+    """
+
+    def __init__(self, users: int, contacts: int, seed: int = 0, skew: float = 1.0, password_hash: str = ''):
+        self.users = users
+        self.contacts = contacts
+        self.seed = seed
+        self.skew = skew
+        self.password_hash = password_hash
+        rng = random.Random(seed)
+        self.first_names = [variant for name in FIRST_NAMES for variant in _variants(name, rng)]
+        self.last_names = [variant for name in LAST_NAMES for variant in _variants(name, rng)]
+        start = date(1950, 1, 1)
+        birthdays = (start + timedelta(days=day) for day in range((date(2010, 1, 1) - start).days))
+        self.birthdays = [(birthday.isoformat(), month_day(birthday)) for birthday in birthdays]
+
+    def contact_counts(self) -> list[int]:
+        """
+        Кількість контактів кожного юзера: частка юзера пропорційна ``rank ** -skew``,
+        а ранги перемішані, щоб найбільші юзери не йшли підряд.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: list[int]
+        """
+        if not self.users:
+            return []
+        weights = [rank ** -self.skew for rank in range(1, self.users + 1)]
+        random.Random(self.seed).shuffle(weights)
+        total = sum(weights)
+        shares = [self.contacts * weight / total for weight in weights]
+        counts = [int(share) for share in shares]
+        # largest remainder, so the counts add up exactly
+        by_remainder = sorted(range(self.users), key=lambda index: counts[index] - shares[index])
+        for index in by_remainder[:self.contacts - sum(counts)]:
+            counts[index] += 1
+        return counts
+
+    def user_rows(self, first_id: int = 1) -> Iterator[tuple]:
+        """
+        Рядки юзерів з ID, починаючи з ``first_id``.
+
+        :param self: посилання на поточний об'єкт класу
+        :param first_id: ID першого юзера
+        :type first_id: int
+        :rtype: Iterator[tuple]
+        """
+        for user_id in range(first_id, first_id + self.users):
+            yield user_id, f'user{user_id}', user_email(user_id), self.password_hash, True, CREATED_AT, 0
+
+    def contact_rows(self, first_user_id: int = 1, first_id: int = 1) -> Iterator[tuple]:
+        """
+        Рядки контактів юзерів ``first_user_id``.. з ID, починаючи з ``first_id``.
+
+        :param self: посилання на поточний об'єкт класу
+        :param first_user_id: ID першого юзера
+        :type first_user_id: int
+        :param first_id: ID першого контакту
+        :type first_id: int
+        :rtype: Iterator[tuple]
+        """
+        rng = random.Random(self.seed + 1)
+        rand = rng.random
+        first_names, last_names, birthdays = self.first_names, self.last_names, self.birthdays
+        n_first, n_last, n_birthdays = len(first_names), len(last_names), len(birthdays)
+        n_domains, n_descriptions = len(DOMAINS), len(DESCRIPTIONS)
+        contact_id = first_id
+        for user_id, count in enumerate(self.contact_counts(), first_user_id):
+            for _ in range(count):
+                first, first_slug = first_names[int(rand() * n_first)]
+                last, last_slug = last_names[int(rand() * n_last)]
+                birthday, birthday_md = birthdays[int(rand() * n_birthdays)]
+                yield (contact_id, first, last, f'{first_slug}.{last_slug}.{contact_id}@{DOMAINS[int(rand() * n_domains)]}',
+                       birthday, birthday_md, DESCRIPTIONS[int(rand() * n_descriptions)], CREATED_AT, user_id)
+                contact_id += 1
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+
+def _load_sqlite(engine: Engine, table: Table, columns: Sequence[str], rows: Iterable[tuple], batch: int) -> int:
+    sql = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    loaded = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # the dataset is disposable: durability is traded for load speed on this connection only
+        cursor.execute('PRAGMA synchronous = OFF')
+        for chunk in _batches(rows, batch):
+            cursor.executemany(sql, chunk)
+            connection.commit()
+            loaded += len(chunk)
+    finally:
+        connection.close()
+    return loaded
+
+
+def _load_postgresql(engine: Engine, table: Table, columns: Sequence[str], rows: Iterable[tuple], batch: int) -> int:
+    sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    loaded = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for chunk in _batches(rows, batch):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            connection.commit()
+            loaded += len(chunk)
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                       f"(SELECT coalesce(max(id), 1) FROM {table.name}))")
+        connection.commit()
+    finally:
+        connection.close()
+    return loaded
+
+
+def bulk_load(engine: Engine, table: Table, columns: Sequence[str], rows: Iterable[tuple], batch: int = 100_000) -> int:
+    """
+    Масове завантаження рядків у таблицю: COPY у Postgres, executemany у SQLite.
+    Кожні ``batch`` рядків - окрема транзакція.
+
+    :param engine: синхронний рушій бази даних
+    :type engine: Engine
+    :param table: таблиця
+    :type table: Table
+    :param columns: колонки в порядку значень рядка
+    :type columns: Sequence[str]
+    :param rows: рядки
+    :type rows: Iterable[tuple]
+    :param batch: кількість рядків у транзакції
+    :type batch: int
+    :return: кількість завантажених рядків
+    :rtype: int
+    """
+    if engine.dialect.name == 'postgresql':
+        return _load_postgresql(engine, table, columns, rows, batch)
+    if engine.dialect.name == 'sqlite':
+        return _load_sqlite(engine, table, columns, rows, batch)
+    raise ValueError(f'Bulk load is not supported for {engine.dialect.name}')
+
+
+def seed_database(engine: Engine, generator: DatasetGenerator, reset: bool = False, batch: int = 100_000) -> dict:
+    """
+    Завантаження згенерованого набору даних. З ``reset`` схема створюється заново, а індекси
+    контактів будуються після завантаження; без нього дані додаються після наявних ID.
+
+    :param engine: синхронний рушій бази даних
+    :type engine: Engine
+    :param generator: генератор набору даних
+    :type generator: DatasetGenerator
+    :param reset: видалити і створити таблиці заново
+    :type reset: bool
+    :param batch: кількість рядків у транзакції
+    :type batch: int
+    :return: ID першого юзера, кількість рядків і час завантаження
+    :rtype: dict
+    """
+    start = time.perf_counter()
+    indexes = sorted(Contact.__table__.indexes, key=lambda index: index.name) if reset else []
+    if reset:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for index in indexes:
+                index.drop(conn, checkfirst=True)
+    with engine.connect() as conn:
+        first_user_id = conn.scalar(select(func.coalesce(func.max(User.id), 0))) + 1
+        first_contact_id = conn.scalar(select(func.coalesce(func.max(Contact.id), 0))) + 1
+    users = bulk_load(engine, User.__table__, USER_COLUMNS, generator.user_rows(first_user_id), batch)
+    contacts = bulk_load(engine, Contact.__table__, CONTACT_COLUMNS,
+                         generator.contact_rows(first_user_id, first_contact_id), batch)
+    loaded = time.perf_counter() - start
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn, checkfirst=True)
+        if engine.dialect.name == 'postgresql':
+            conn.execute(text('ANALYZE users, contacts'))
+        else:
+            conn.execute(text('ANALYZE'))
+    elapsed = time.perf_counter() - start
+    return {
+        'first_user_id': first_user_id,
+        'users': users,
+        'contacts': contacts,
+        'load_seconds': round(loaded, 2),
+        'index_seconds': round(elapsed - loaded, 2),
+        'contacts_per_second': round(contacts / loaded) if loaded else 0,
+    }
+
+
+def main(argv: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database-url', help="database URL, the app's SQLALCHEMY_DATABASE_URL by default")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--contacts', type=int, default=100_000, help='contacts in total')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of contacts per user, 0 for even')
+    parser.add_argument('--password', default='password123', help='password of every generated user')
+    parser.add_argument('--rounds', type=int, default=4, help='bcrypt rounds of the shared password hash')
+    parser.add_argument('--batch', type=int, default=100_000, help='rows per transaction')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate the tables first')
+    args = parser.parse_args(argv)
+    url = args.database_url
+    if url is None:
+        from src.conf.config import settings
+
+        url = settings.sqlalchemy_database_url
+    from passlib.context import CryptContext
+
+    password_hash = CryptContext(schemes=['bcrypt'], bcrypt__rounds=args.rounds).hash(args.password)
+    generator = DatasetGenerator(args.users, args.contacts, args.seed, args.skew, password_hash)
+    engine = create_engine(sync_url(url))
+    try:
+        result = seed_database(engine, generator, args.reset, args.batch)
+    finally:
+        engine.dispose()
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,84 @@
-from typing import List
-from datetime import datetime, timedelta
+import calendar
+from typing import Any, AsyncIterator, List, Sequence, Tuple
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy import and_, or_, case, func, true, select, insert, update, tuple_
 
-from src.database.models import Contact, User
-from src.schemas import ContactModel
+from src.database.models import Contact, User, contact_search_document, month_day
+from src.schemas import CONTACT_FIELDS, ContactModel
+from src.services.contacts_cache import contacts_cache
+from src.services.contacts_io import EXPORT_FIELDS, Record
+from src.services.search import ContactIndex, normalize_query, search_indexes
 
-async def get_contacts(skip: int, limit: int, user: User, db: Session) -> List[Contact]:
+
+def _sort_columns(sort: str):
+    if sort == 'id':
+        return (Contact.id,)
+    return (getattr(Contact, sort), Contact.id)
+
+def _load_only(stmt, fields: Sequence[str] | None, *required: str):
+    # unrequested columns are not selected at all, touching them raises instead of lazy-loading
+    if fields:
+        columns = dict.fromkeys((*fields, *required))
+        stmt = stmt.options(load_only(*(getattr(Contact, field) for field in columns), raiseload=True))
+    return stmt
+
+def _cached_fields(fields: Sequence[str] | None, *required: str) -> Sequence[str]:
+    if not fields:
+        return CONTACT_FIELDS
+    return [field for field in CONTACT_FIELDS if field in fields or field in required or field == 'id']
+
+async def _all(stmt, db: AsyncSession) -> List[Contact]:
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+async def _first(stmt, db: AsyncSession) -> List[Contact]:
+    result = await db.execute(stmt)
+    contact = result.scalars().first()
+    return [contact] if contact is not None else []
+
+async def _contacts_changed(user: User):
+    search_indexes.pop(user.id)
+
+async def get_contacts_version(user: User, db: AsyncSession) -> Tuple[int, datetime | None]:
+    """
+    Лічильник змін контактів юзера та час останньої зміни. Читає лише рядок юзера, без контактів.
+
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :return: Лічильник змін та час останньої зміни в UTC
+    :rtype: Tuple[int, datetime | None]
+    """
+    result = await db.execute(select(User.contacts_version, User.contacts_modified_at).where(User.id == user.id))
+    version, modified_at = result.one()
+    # cached reads of this session are keyed by the same version the ETag is built from
+    db.info[('contacts_version', user.id)] = version
+    return version, modified_at
+
+async def _cached(query: tuple, fields: Sequence[str], load, user: User, db: AsyncSession) -> List[Contact]:
+    if contacts_cache.redis is None:
+        return await load()
+    version = db.info.get(('contacts_version', user.id))
+    if version is None:
+        version, _ = await get_contacts_version(user, db)
+    return await contacts_cache.fetch(user.id, version, query, fields, load)
+
+async def _touch_contacts(user: User, db: AsyncSession):
+    # runs in the same transaction as the contact write, so readers never see new rows with an old version
+    stmt = update(User).where(User.id == user.id).values(
+        contacts_version=User.contacts_version + 1,
+        contacts_modified_at=datetime.now(timezone.utc).replace(tzinfo=None),
+    ).execution_options(synchronize_session=False)
+    await db.execute(stmt)
+    db.info.pop(('contacts_version', user.id), None)
+
+async def get_contacts(skip: int, limit: int, user: User, db: AsyncSession, sort: str = 'id', fields: Sequence[str] | None = None) -> List[Contact]:
     """
     Поветрає список контактів з бази даних, маємо можливіть пагінації списку
 
@@ -18,13 +89,52 @@ async def get_contacts(skip: int, limit: int, user: User, db: Session) -> List[C
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
+    :param sort: Поле, за яким сортується список
+    :type sort: str
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
     :return: Повертає списов контактів
     :rtype: List[Contacts]
     """
-    return db.query(Contact).filter(Contact.user_id == user.id).offset(skip).limit(limit).all()
+    stmt = select(Contact).where(Contact.user_id == user.id).order_by(*_sort_columns(sort)).offset(skip).limit(limit)
+    stmt = _load_only(stmt, fields, sort)
+    query = ('contacts', skip, limit, sort, tuple(fields or ()))
+    return await _cached(query, _cached_fields(fields, sort), lambda: _all(stmt, db), user, db)
 
-async def get_contact_by_first_name(contact_first_name: str, user: User, db: Session) -> Contact:
+async def get_contacts_after(sort: str, value: Any, last_id: int, limit: int, user: User, db: AsyncSession, fields: Sequence[str] | None = None) -> List[Contact]:
+    """
+    Повертає сторінку контактів, що йдуть після останнього контакту попередньої сторінки (keyset-пагінація).
+    На відміну від skip, час отримання сторінки не залежить від її номера.
+
+    :param sort: Поле, за яким сортується список
+    :type sort: str
+    :param value: Значення поля сортування в останньому контакті попередньої сторінки
+    :type value: Any
+    :param last_id: ID останнього контакту попередньої сторінки
+    :type last_id: int
+    :param limit: Кількість контактів на одній сторінці пагінації 
+    :type limit: int
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
+    :return: Повертає списов контактів
+    :rtype: List[Contacts]
+    """
+    columns = _sort_columns(sort)
+    if sort == 'id':
+        seek = Contact.id > last_id
+    else:
+        seek = tuple_(*columns) > tuple_(value, last_id)
+    stmt = select(Contact).where(and_(Contact.user_id == user.id, seek)).order_by(*columns).limit(limit)
+    stmt = _load_only(stmt, fields, sort)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+async def get_contact_by_first_name(contact_first_name: str, user: User, db: AsyncSession, fields: Sequence[str] | None = None) -> Contact:
     """
     Повертає певний контакт за ім'ям. 
 
@@ -33,13 +143,19 @@ async def get_contact_by_first_name(contact_first_name: str, user: User, db: Ses
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
     :return: Повертає контакт за ім'ям
     :rtype: Contact
     """
-    return db.query(Contact).filter(and_(Contact.first_name == contact_first_name, Contact.user_id == user.id)).first()
+    stmt = select(Contact).where(and_(Contact.first_name == contact_first_name, Contact.user_id == user.id))
+    stmt = _load_only(stmt, fields)
+    query = ('first_name', contact_first_name, tuple(fields or ()))
+    contacts = await _cached(query, _cached_fields(fields), lambda: _first(stmt, db), user, db)
+    return contacts[0] if contacts else None
 
-async def get_contact_by_last_name(contact_last_name: str, user: User, db: Session) -> Contact:
+async def get_contact_by_last_name(contact_last_name: str, user: User, db: AsyncSession, fields: Sequence[str] | None = None) -> Contact:
     """
     Повертає певний контакт за прізвищем. 
 
@@ -48,13 +164,19 @@ async def get_contact_by_last_name(contact_last_name: str, user: User, db: Sessi
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
     :return: Повертаж контакт за прізвищем
     :rtype: Contact
     """
-    return db.query(Contact).filter(and_(Contact.last_name == contact_last_name, Contact.user_id == user.id)).first()
+    stmt = select(Contact).where(and_(Contact.last_name == contact_last_name, Contact.user_id == user.id))
+    stmt = _load_only(stmt, fields)
+    query = ('last_name', contact_last_name, tuple(fields or ()))
+    contacts = await _cached(query, _cached_fields(fields), lambda: _first(stmt, db), user, db)
+    return contacts[0] if contacts else None
 
-async def get_contact_by_email(contact_email: str, user: User, db: Session) -> Contact:
+async def get_contact_by_email(contact_email: str, user: User, db: AsyncSession, fields: Sequence[str] | None = None) -> Contact:
     """
     Повертає певний контакт за електроною поштою. 
 
@@ -63,28 +185,130 @@ async def get_contact_by_email(contact_email: str, user: User, db: Session) -> C
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
     :return: Повертаж контакт за електроною поштою
     :rtype: Contact
     """
-    return db.query(Contact).filter(and_(Contact.email == contact_email, Contact.user_id == user.id)).first()
+    stmt = select(Contact).where(and_(Contact.email == contact_email, Contact.user_id == user.id))
+    stmt = _load_only(stmt, fields)
+    query = ('email', contact_email, tuple(fields or ()))
+    contacts = await _cached(query, _cached_fields(fields), lambda: _first(stmt, db), user, db)
+    return contacts[0] if contacts else None
+
+async def _search_postgresql(query: str, skip: int, limit: int, threshold: float, user: User, db: AsyncSession,
+                             fields: Sequence[str] | None) -> List[Contact]:
+    # both conditions are answered by the GIN trigram index on (user_id, contact_search_document)
+    await db.execute(select(func.set_config('pg_trgm.word_similarity_threshold', str(threshold), True)))
+    prefix = or_(*(func.lower(column).startswith(query, autoescape=True) for column in (Contact.first_name, Contact.last_name, Contact.email)))
+    matches = or_(contact_search_document.contains(query, autoescape=True), contact_search_document.op('%>')(query))
+    rank = case((prefix, 1), else_=0) + func.word_similarity(query, contact_search_document)
+    stmt = select(Contact).where(and_(Contact.user_id == user.id, matches)).order_by(rank.desc(), Contact.id).offset(skip).limit(limit)
+    stmt = _load_only(stmt, fields)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+async def _search_index(user: User, db: AsyncSession) -> ContactIndex:
+    index = search_indexes.get(user.id)
+    if index is None:
+        stmt = select(Contact.id, Contact.first_name, Contact.last_name, Contact.email, Contact.description).where(Contact.user_id == user.id)
+        result = await db.execute(stmt)
+        index = ContactIndex(result.all())
+        search_indexes.set(user.id, index)
+    return index
+
+async def search_contacts(query: str, skip: int, limit: int, user: User, db: AsyncSession, threshold: float = 0.3,
+                          fields: Sequence[str] | None = None) -> List[Contact]:
+    """
+    Пошук контактів за ім'ям, прізвищем, електроною поштою та описом: за початком слова
+    або з помилками в написанні (схожість триграм). Першими йдуть контакти, в яких з запиту
+    починається ім'я, прізвище чи пошта, далі - за спаданням схожості.
+    PostgreSQL шукає за GIN-індексом pg_trgm, інші бази - за індексом юзера в пам'яті процесу.
+
+    :param query: Пошуковий запит
+    :type query: str
+    :param skip: Скільки знайдених контактів пропустити
+    :type skip: int
+    :param limit: Кількість контактів на одній сторінці пагінації 
+    :type limit: int
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :param threshold: Мінімальна схожість слова з запитом, від 0 до 1
+    :type threshold: float
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
+    :return: Повертає списов знайдених контактів
+    :rtype: List[Contacts]
+    """
+    query = normalize_query(query)
+    if not query:
+        return []
+    if db.get_bind().dialect.name == 'postgresql':
+        return await _search_postgresql(query, skip, limit, threshold, user, db, fields)
+    index = await _search_index(user, db)
+    ids = index.search(query, threshold)[skip:skip + limit]
+    if not ids:
+        return []
+    stmt = _load_only(select(Contact).where(and_(Contact.user_id == user.id, Contact.id.in_(ids))), fields)
+    result = await db.execute(stmt)
+    contacts = {contact.id: contact for contact in result.scalars().all()}
+    return [contacts[contact_id] for contact_id in ids if contact_id in contacts]
 
-async def upcoming_birthday(user: User, db: Session) -> List[Contact]:
+def birthday_window(today: date, days: int) -> Tuple[int, int, bool]:
     """
-    Повертає список контактів в яких день народженя в межах тижня від поточної дати. 
+    Межі вікна днів народження у форматі MMDD.
+    Люди, народжені 29 лютого, у невисокосний рік святкують 28 лютого.
+
+    :param today: Перший день вікна
+    :type today: date
+    :param days: Кількість днів після першого дня, що входять у вікно
+    :type days: int
+    :return: Початок вікна, кінець вікна та ознака переходу через Новий рік
+    :rtype: Tuple[int, int, bool]
+    """
+    end = today + timedelta(days=days)
+    start_md, end_md = month_day(today), month_day(end)
+    if end_md == 228 and not calendar.isleap(end.year):
+        end_md = 229
+    return start_md, end_md, end.year != today.year
+
+async def upcoming_birthday(user: User, db: AsyncSession, days: int = 7, today: date | None = None, fields: Sequence[str] | None = None) -> List[Contact]:
+    """
+    Повертає список контактів в яких день народженя в межах заданої кількості днів від поточної дати, 
+    незалежно від року народження. Список впорядкований за найближчим днем народження.
 
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
-    :return: Повертає список контактів в яких день народженя в межах тижня від поточної дати.
+    :type db: AsyncSession
+    :param days: Кількість днів від поточної дати
+    :type days: int
+    :param today: Поточна дата, за замовчуванням сьогодні
+    :type today: date | None
+    :param fields: Поля контакту, які треба завантажити, за замовчуванням усі
+    :type fields: Sequence[str] | None
+    :return: Повертає список контактів в яких день народженя в межах заданої кількості днів від поточної дати.
     :rtype: List[Contacts]
     """
-    today = datetime.today().date()
-    end_date = today + timedelta(days=7)
-    return db.query(Contact).filter(and_(Contact.birthday >= today, Contact.birthday <= end_date, Contact.user_id == user.id)).all()
+    today = today or date.today()
+    start_md, end_md, wraps = birthday_window(today, days)
+    if days >= 365:
+        in_window = true()
+    elif wraps:
+        in_window = or_(Contact.birthday_md >= start_md, Contact.birthday_md <= end_md)
+    else:
+        in_window = Contact.birthday_md.between(start_md, end_md)
+    stmt = select(Contact).where(and_(Contact.user_id == user.id, in_window)).order_by(
+        case((Contact.birthday_md >= start_md, 0), else_=1), Contact.birthday_md, Contact.id
+    )
+    stmt = _load_only(stmt, fields)
+    query = ('upcoming_birthday', today.isoformat(), days, tuple(fields or ()))
+    return await _cached(query, _cached_fields(fields), lambda: _all(stmt, db), user, db)
 
-async def create_contact(body: ContactModel, user: User, db: Session) -> Contact:
+async def create_contact(body: ContactModel, user: User, db: AsyncSession) -> Contact:
     """
     Створення нового контакту.
 
@@ -93,7 +317,7 @@ async def create_contact(body: ContactModel, user: User, db: Session) -> Contact
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає створений контакт 
     :rtype: Contact
     """
@@ -106,11 +330,127 @@ async def create_contact(body: ContactModel, user: User, db: Session) -> Contact
         user_id=user.id
     )
     db.add(contact)
-    db.commit()
-    db.refresh(contact)
+    await _touch_contacts(user, db)
+    await db.commit()
+    await _contacts_changed(user)
+    await db.refresh(contact)
     return contact
 
-async def update_contact(contact_id: int, body: ContactModel, user: User, db: Session) -> Contact | None:
+async def stream_contacts(user: User, db: AsyncSession, chunk_size: int = 1000) -> AsyncIterator[List[Tuple]]:
+    """
+    Потік усіх контактів юзера для експорту. Рядки читаються курсором на стороні сервера
+    пакетами по ``chunk_size`` і вибираються як кортежі колонок, без створення ORM-об'єктів,
+    тож пам'ять не залежить від кількості контактів.
+
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :param chunk_size: Кількість рядків, що читаються з курсора за раз
+    :type chunk_size: int
+    :return: Пакети рядків з полями у порядку EXPORT_FIELDS
+    :rtype: AsyncIterator[List[Tuple]]
+    """
+    columns = [getattr(Contact, field) for field in EXPORT_FIELDS]
+    stmt = select(*columns).where(Contact.user_id == user.id).order_by(Contact.id).execution_options(yield_per=chunk_size)
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        yield partition
+
+async def _insert_rows(rows: List[dict], db: AsyncSession):
+    if db.get_bind().dialect.name == 'postgresql':
+        # COPY is several times faster than a multi-row INSERT and runs inside the session's transaction
+        connection = await (await db.connection()).get_raw_connection()
+        columns = list(rows[0])
+        records = [tuple(row[column] for column in columns) for row in rows]
+        await connection.driver_connection.copy_records_to_table(Contact.__tablename__, records=records, columns=columns)
+    else:
+        await db.execute(insert(Contact.__table__), rows)
+
+async def _import_batch(batch: List[Tuple[int, ContactModel]], user: User, db: AsyncSession) -> Tuple[int, List[dict]]:
+    for attempt in range(2):
+        emails = {body.email for _, body in batch}
+        result = await db.execute(select(Contact.email).where(Contact.email.in_(emails)))
+        taken = set(result.scalars().all())
+        now = datetime.now()
+        rows, errors = [], []
+        for number, body in batch:
+            if body.email in taken:
+                errors.append({'row': number, 'error': 'email: Contact with this email already exists'})
+                continue
+            taken.add(body.email)
+            rows.append({
+                'first_name': body.first_name,
+                'last_name': body.last_name,
+                'email': body.email,
+                'birthday': body.birthday,
+                'birthday_md': month_day(body.birthday),
+                'description': body.description,
+                'created_at': now,
+                'user_id': user.id,
+            })
+        try:
+            if rows:
+                await _insert_rows(rows, db)
+                await _touch_contacts(user, db)
+            await db.commit()
+            return len(rows), errors
+        except IntegrityError:
+            # a concurrent request took one of the emails after the check, the second pass will see it
+            await db.rollback()
+    return 0, [{'row': number, 'error': 'Conflicting concurrent write, row was not saved'} for number, _ in batch]
+
+async def import_contacts(records: AsyncIterator[Record], user: User, db: AsyncSession, batch_size: int = 1000, max_errors: int = 1000) -> dict:
+    """
+    Масовий імпорт контактів з потоку записів. Кожен запис перевіряється моделлю ContactModel,
+    коректні записи зберігаються пакетами по ``batch_size`` (COPY для PostgreSQL, багаторядковий INSERT для інших баз),
+    конфлікти електронної пошти перевіряються одним запитом на пакет. Кожен пакет комітиться окремо,
+    тож у пам'яті одночасно тримається не більше одного пакета.
+
+    :param records: Потік записів (номер, поля контакту, помилка розбору)
+    :type records: AsyncIterator[Record]
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :param batch_size: Кількість контактів в одному пакеті
+    :type batch_size: int
+    :param max_errors: Максимальна кількість помилок у звіті, решта лише рахується
+    :type max_errors: int
+    :return: Кількість імпортованих та відхилених записів і помилки по рядках
+    :rtype: dict
+    """
+    imported, failed, errors, batch = 0, 0, [], []
+
+    def reject(row_errors: List[dict]):
+        nonlocal failed
+        failed += len(row_errors)
+        errors.extend(row_errors[:max(0, max_errors - len(errors))])
+
+    async def flush():
+        nonlocal imported
+        saved, row_errors = await _import_batch(batch, user, db)
+        imported += saved
+        reject(row_errors)
+        batch.clear()
+
+    async for number, data, error in records:
+        if error is None:
+            try:
+                batch.append((number, ContactModel.model_validate(data)))
+            except ValidationError as err:
+                error = '; '.join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in err.errors())
+        if error is not None:
+            reject([{'row': number, 'error': error}])
+        elif len(batch) >= batch_size:
+            await flush()
+    if batch:
+        await flush()
+    if imported:
+        await _contacts_changed(user)
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+async def update_contact(contact_id: int, body: ContactModel, user: User, db: AsyncSession) -> Contact | None:
     """
     Редагування інформації про певний контакт. 
 
@@ -121,21 +461,25 @@ async def update_contact(contact_id: int, body: ContactModel, user: User, db: Se
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає відредагований контакт або None
     :rtype: Contact | None
     """
-    contact = db.query(Contact).filter(and_(Contact.id == contact_id, Contact.user_id == user.id)).first()
+    stmt = select(Contact).where(and_(Contact.id == contact_id, Contact.user_id == user.id))
+    result = await db.execute(stmt)
+    contact = result.scalars().first()
     if contact:
         contact.first_name = body.first_name
         contact.last_name = body.last_name
         contact.email = body.email
         contact.birthday = body.birthday
         contact.description = body.description
-        db.commit()
+        await _touch_contacts(user, db)
+        await db.commit()
+        await _contacts_changed(user)
     return contact
 
-async def delete_contact(contact_id: int, user: User, db: Session) -> Contact | None:
+async def delete_contact(contact_id: int, user: User, db: AsyncSession) -> Contact | None:
     """
     Видалення певного контакту з бази данних.
 
@@ -144,12 +488,16 @@ async def delete_contact(contact_id: int, user: User, db: Session) -> Contact |
     :param user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає видалений контакт або None
     :rtype: Contact | None
     """
-    contact = db.query(Contact).filter(and_(Contact.id == contact_id, Contact.user_id == user.id)).first()
+    stmt = select(Contact).where(and_(Contact.id == contact_id, Contact.user_id == user.id))
+    result = await db.execute(stmt)
+    contact = result.scalars().first()
     if contact:
-        db.delete(contact)
-        db.commit()
+        await db.delete(contact)
+        await _touch_contacts(user, db)
+        await db.commit()
+        await _contacts_changed(user)
     return contact
\ No newline at end of file
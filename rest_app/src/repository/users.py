@@ -1,73 +1,89 @@
-from libgravatar import Gravatar
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserModel
+from src.services.user_cache import user_cache
+from src.services.token_cache import revoke_token
 
-async def get_user_by_email(email: str, db: Session) -> User:
+async def get_user_by_email(email: str, db: AsyncSession) -> User:
     """
     Отримання певного юзера за електронною поштою.
 
     :param email: електрона пошта за якою проводится пошук
     :type email: str
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: повертає юзера
     :rtype: User
     """
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-async def create_user(body: UserModel, db: Session) -> User:
+async def create_user(body: UserModel, db: AsyncSession) -> User:
     """
-    Створення нового юзера.
+    Створення нового юзера. Зображення з Gravatar додається пізніше фоновим кроком assign_gravatar.
 
     :param body: інформація про нового юзера
     :type body: UserModel
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: повертає юзера
     :rtype: User
     """
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception as e:
-        print(e)
-    new_user = User(**body.model_dump(), avatar=avatar)
+    new_user = User(**body.model_dump())
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
-async def update_token(user: User, token: str | None, db: Session):
+async def update_token(user: User, token: str | None, db: AsyncSession):
     """
-    Оновлення ключа доступу.
+    Оновлення ключа доступу. Попередній ключ видаляється з кешу перевірених токенів.
 
     :param user: Аутентифікований юзер 
     :type user: User
     :pram token: ключ доступу аутентифікованого юзера
     :type token: str | None
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
+    if user.refresh_token != token:
+        revoke_token(user.refresh_token)
     user.refresh_token = token
-    db.commit()
+    await db.commit()
+    await user_cache.invalidate(user.email)
 
-async def confirmed_email(email: str, db: Session):
+async def update_password(user: User, hashed_password: str, db: AsyncSession):
+    """
+    Оновлення хешу пароля, наприклад після підвищення вартості bcrypt.
+
+    :param user: Аутентифікований юзер 
+    :type user: User
+    :param hashed_password: новий хеш пароля
+    :type hashed_password: str
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    """
+    user.password = hashed_password
+    await db.commit()
+    await user_cache.invalidate(user.email)
+
+async def confirmed_email(email: str, db: AsyncSession):
     """
     Підтвердження електронної пошти.
     
     :param email: електронна пошта для підтвердження
     :type email: str
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     user = await get_user_by_email(email, db)
     user.confirmed = True
-    db.commit()
+    await db.commit()
+    await user_cache.invalidate(email)
 
-async def update_avatar(email: str, url: str, db: Session):
+async def update_avatar(email: str, url: str, db: AsyncSession):
     """
     Оновлення зображення користувача.
     
@@ -76,9 +92,27 @@ async def update_avatar(email: str, url: str, db: Session):
     :param url: посилання на нове зображення юзера
     :type url: str
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     user = await get_user_by_email(email, db)
     user.avatar = url
-    db.commit()
-    return user
\ No newline at end of file
+    await db.commit()
+    await user_cache.invalidate(email)
+    return user
+
+async def assign_avatar(user_id: int, email: str, url: str, db: AsyncSession):
+    """
+    Встановлення зображення юзеру, у якого зображення ще немає.
+
+    :param user_id: ID юзера
+    :type user_id: int
+    :param email: електронна пошта юзера
+    :type email: str
+    :param url: посилання на зображення
+    :type url: str
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    """
+    await db.execute(update(User).where(User.id == user_id, User.avatar.is_(None)).values(avatar=url))
+    await db.commit()
+    await user_cache.invalidate(email)
@@ -1,55 +1,62 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Security, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.schemas import UserModel, UserResponse, TokenModel, RequestEmail
 from src.repository import users as repository_users
 from src.services.auth import auth_service
 from src.services.email import send_email
+from src.services.gravatar import assign_gravatar
+from src.conf.config import settings
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 security = HTTPBearer()
 
 @router.post('/signup',response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(body: UserModel, background_task: BackgroundTasks, request: Request, db: Session = Depends(get_db)):
+async def signup(body: UserModel, background_task: BackgroundTasks, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Регістрація новогою юзера.
 
     :param body: Інформація про нового користувача
     :type boby: UserModel
-    :param background_task: фонове відправлення повідомлення для підтверження юзера
+    :param background_task: фонове відправлення повідомлення для підтверження юзера та пошук зображення в Gravatar
     :type background_task: BackgroundTasks
     :param request: Http запит
     :type request: Request
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     exist_user = await repository_users.get_user_by_email(body.email, db)
     if exist_user: 
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Account already exists')
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.hash_password(body.password)
     new_user = await repository_users.create_user(body, db)
     background_task.add_task(send_email, new_user.email, new_user.username, request.base_url)
+    if settings.gravatar_enabled:
+        background_task.add_task(assign_gravatar, new_user.id, new_user.email)
     return {'user': new_user, 'detail': 'User successfully created'}
 
 @router.post('/login', response_model=TokenModel)
-async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """
     Авторизація юзера.
 
     :param body: Інформація для авторизації юзера
     :type boby: OAuth2PasswordRequestForm = Depends()
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     user = await repository_users.get_user_by_email(body.username, db)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid email')
     if not user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Email not confirmed')
-    if not auth_service.verify_password(body.password, user.password):
+    valid, new_hash = await auth_service.check_password(body.password, user.password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid password')
+    if new_hash:
+        await repository_users.update_password(user, new_hash, db)
     
     access_token = await auth_service.create_access_token(data={'sub': user.email})
     refresh_token = await auth_service.create_refresh_token(data={'sub': user.email})
@@ -57,19 +64,20 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
     return {'access_token': access_token, 'refresh_token': refresh_token, 'token_type': 'bearer'}
 
 @router.get('/refresh_token', response_model=TokenModel)
-async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(security), db: Session = Depends(get_db)):
+async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(security), db: AsyncSession = Depends(get_db)):
     """
     Оновлення ключа доступу для юзера
 
     :param credentials: Інформація про певного юзера
     :type credentials: HTTPAuthorizationCredentials = Security(security)
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     token = credentials.credentials
     email = await auth_service.decode_refresh_token(token)
     user = await repository_users.get_user_by_email(email, db)
     if user.refresh_token != token:
+        auth_service.revoke_token(token)
         await repository_users.update_token(user, None, db)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
@@ -79,14 +87,14 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(sec
     return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get('/confirmed_email/{token}')
-async def confirmed_email(token: str, db: Session = Depends(get_db)):
+async def confirmed_email(token: str, db: AsyncSession = Depends(get_db)):
     """
     Підтвердження електронної пошти користувача за ключем доступу.
 
     :param token: ключ доступу користувача
     :type credentials: str
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     email = await auth_service.get_email_from_token(token)
     user = await repository_users.get_user_by_email(email, db)
@@ -98,7 +106,7 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
     return {'message': 'Email confirmed'}
 
 @router.post('/request_email')
-async def request_email(body: RequestEmail, background_task: BackgroundTasks, request: Request, db: Session=Depends(get_db)):
+async def request_email(body: RequestEmail, background_task: BackgroundTasks, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Надсилання листа для користувача.
 
@@ -109,7 +117,7 @@ async def request_email(body: RequestEmail, background_task: BackgroundTasks, re
     :param request: Http запит
     :type request: Request
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
     user = await repository_users.get_user_by_email(body.email, db)
 
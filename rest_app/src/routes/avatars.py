@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response, status
+
+from src.services.avatars import LocalStorage, avatar_uploader
+from src.services.conditional import etag_matches
+
+router = APIRouter(prefix='/avatars', tags=['avatars'])
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+@router.get('/{digest}', response_class=Response)
+async def read_avatar(request: Request, digest: str = Path(pattern='^[0-9a-f]{64}$'),
+                      size: int = Query(250, ge=1, le=2048)):
+    """
+    Зображення юзера з локального сховища. Посилання містить SHA-256 зображення, тож вміст
+    за ним ніколи не змінюється і може кешуватися клієнтами та проксі без перевірки.
+
+    :param request: Http запит
+    :type request: Request
+    :param digest: SHA-256 зображення
+    :type digest: str
+    :param size: бажаний розмір зображення, пікселі; повертається найменша копія, не менша за нього
+    :type size: int
+    :return: зображення у форматі JPEG
+    :rtype: Response
+    """
+    storage = avatar_uploader.storage
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Avatar not found')
+    variant = storage.variant_size(size)
+    etag = f'"{digest[:32]}-{variant or 0}"'
+    headers = {'ETag': etag, 'Cache-Control': IMMUTABLE}
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    data = await storage.read(digest, variant)
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Avatar not found')
+    return Response(data, media_type='image/jpeg', headers=headers)
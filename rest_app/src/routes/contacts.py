@@ -1,114 +1,265 @@
-from typing import List
+from typing import Dict, List, Literal, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, status, Request, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.db import get_db
+from src.database.db import get_db, SessionLocal
 from src.database.models import User
-from src.schemas import ContactModel, ResponseModel
+from src.conf.config import settings
+from src.schemas import BulkImportResponse, ContactModel, ResponseModel, SortKey, CONTACT_FIELDS
 from src.repository import contacts as repository_contact
 from src.services.auth import auth_service
+from src.services.conditional import contacts_etag, not_modified, validator_headers
+from src.services.contacts_io import EXPORT_MEDIA_TYPES, encode_rows, iter_lines, parser_for
+from src.services.pagination import encode_cursor, decode_cursor
+from src.services.responses import contacts_response
 
 from pydantic import EmailStr
 
 router = APIRouter(prefix='/contacts', tags=['contacts'])
 
+def contact_fields(fields: str | None = Query(None, description='Comma-separated contact fields to return, e.g. first_name,last_name')) -> Tuple[str, ...] | None:
+    """
+    Розбір параметра fields - набору полів контакту, які треба повернути.
+
+    :param fields: Поля через кому
+    :type fields: str | None
+    :return: Вибрані поля у порядку ResponseModel або None, якщо потрібні всі поля
+    :rtype: Tuple[str, ...] | None
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = requested.difference(CONTACT_FIELDS)
+    if not requested or unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else 'No fields requested')
+    return tuple(field for field in CONTACT_FIELDS if field in requested)
+
+async def contacts_validators(request: Request, current_user: User = Depends(auth_service.get_current_user),
+                              db: AsyncSession = Depends(get_db)) -> Dict[str, str]:
+    """
+    Умовний GET для контактів юзера. Якщо ETag з If-None-Match (або If-Modified-Since) ще актуальний,
+    відповідає 304 Not Modified, не читаючи жодного контакту з бази даних.
+
+    :param request: Http запит
+    :type request: Request
+    :param current_user: Аутентифікований юзер 
+    :type current_user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :return: Заголовки ETag та Last-Modified для відповіді
+    :rtype: Dict[str, str]
+    """
+    # the version is read before any contact row, so a concurrent write can only leave the ETag older than the data
+    version, modified_at = await repository_contact.get_contacts_version(current_user, db)
+    etag = contacts_etag(current_user.id, version)
+    headers = validator_headers(etag, modified_at)
+    if not_modified(request.headers, etag, modified_at):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return headers
+
 @router.get('/', response_model=List[ResponseModel])
-async def read_contacts(skip: int = 0, limit: int = 10, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def read_contacts(skip: int = 0, limit: int = 10, cursor: str | None = None, sort: SortKey = 'id', 
+                        fields: Tuple[str, ...] | None = Depends(contact_fields), validators: Dict[str, str] = Depends(contacts_validators),
+                        current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Отримання списку контактів, пряма взаємодія з юзером.
+    Якщо сторінка повна, в заголовку X-Next-Cursor повертається курсор наступної сторінки.
 
     :param skip: Скільки контактів пропустити з початку бази даних 
     :type skip: int
     :param limit: Кількість контактів на одній сторінці пагінації 
     :type limit: int
+    :param cursor: Курсор з попередньої сторінки, якщо задано - skip та sort ігноруються
+    :type cursor: str | None
+    :param sort: Поле, за яким сортується список
+    :type sort: SortKey
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
+    :param validators: Заголовки ETag та Last-Modified
+    :type validators: Dict[str, str]
     :param current_user: Аутентифікований юзер 
     :type user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Список контактів
     :rtype: List[Contacts]
     """
-    contacts = await repository_contact.get_contacts(skip, limit, current_user, db)
-    return contacts
+    if cursor is None:
+        contacts = await repository_contact.get_contacts(skip, limit, current_user, db, sort, fields)
+    else:
+        try:
+            sort, value, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor')
+        contacts = await repository_contact.get_contacts_after(sort, value, last_id, limit, current_user, db, fields)
+    response = contacts_response(contacts, fields)
+    response.headers.update(validators)
+    if contacts and len(contacts) == limit:
+        last = contacts[-1]
+        response.headers['X-Next-Cursor'] = encode_cursor(sort, getattr(last, sort), last.id)
+    return response
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_contacts(format: Literal['ndjson', 'csv', 'vcard'] = 'ndjson', current_user: User = Depends(auth_service.get_current_user)):
+    """
+    Експорт усіх контактів юзера потоком у форматі NDJSON, CSV або vCard, пряма взаємодія з юзером.
+    Відповідь читається з бази під час передачі, тому використовує власну сесію, що живе до кінця потоку.
+
+    :param format: Формат експорту
+    :type format: str
+    :param current_user: Аутентифікований юзер 
+    :type current_user: User
+    :return: Потокова відповідь з контактами
+    :rtype: StreamingResponse
+    """
+    async def body():
+        async with SessionLocal() as db:
+            async for chunk in encode_rows(repository_contact.stream_contacts(current_user, db), format):
+                yield chunk
+
+    extension = 'vcf' if format == 'vcard' else format
+    return StreamingResponse(body(), media_type=EXPORT_MEDIA_TYPES[format],
+                             headers={'Content-Disposition': f'attachment; filename="contacts.{extension}"'})
+
+@router.get('/search', response_model=List[ResponseModel])
+async def search_contacts(q: str = Query(min_length=1, max_length=100), skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100),
+                          fields: Tuple[str, ...] | None = Depends(contact_fields), validators: Dict[str, str] = Depends(contacts_validators),
+                          current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
+    """
+    Пошук контактів за ім'ям, прізвищем, електроною поштою та описом, пряма взаємодія з юзером.
+    Знаходить збіги за початком слова та з помилками в написанні, найрелевантніші контакти йдуть першими.
+
+    :param q: Пошуковий запит
+    :type q: str
+    :param skip: Скільки знайдених контактів пропустити
+    :type skip: int
+    :param limit: Кількість контактів на одній сторінці пагінації
+    :type limit: int
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
+    :param validators: Заголовки ETag та Last-Modified
+    :type validators: Dict[str, str]
+    :param current_user: Аутентифікований юзер
+    :type current_user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :return: Список знайдених контактів
+    :rtype: List[Contacts]
+    """
+    contacts = await repository_contact.search_contacts(q, skip, limit, current_user, db, settings.search_similarity_threshold, fields)
+    response = contacts_response(contacts, fields)
+    response.headers.update(validators)
+    return response
 
 @router.get('/firts_name/{first_name}', response_model=ResponseModel)
-async def get_contact_by_first_name(first_name: str, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def get_contact_by_first_name(first_name: str, fields: Tuple[str, ...] | None = Depends(contact_fields),
+                                    validators: Dict[str, str] = Depends(contacts_validators), current_user: User = Depends(auth_service.get_current_user),
+                                    db: AsyncSession = Depends(get_db)):
     """
     Повертає певний контакт за ім'ям, пряма взаємодія з юзером.
 
     :param first_name: Ім'я для пошуку
     :type first_name: str
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
+    :param validators: Заголовки ETag та Last-Modified
+    :type validators: Dict[str, str]
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає контакт за ім'ям
     :rtype: Contact
     """
-    contact = await repository_contact.get_contact_by_first_name(first_name, current_user, db)
+    contact = await repository_contact.get_contact_by_first_name(first_name, current_user, db, fields)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=('Contact not found'))
-    return contact
+    response = contacts_response(contact, fields)
+    response.headers.update(validators)
+    return response
 
 @router.get('/last_name/{last_name}', response_model=ResponseModel)
-async def get_contact_by_last_name(last_name: str, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def get_contact_by_last_name(last_name: str, fields: Tuple[str, ...] | None = Depends(contact_fields),
+                                   validators: Dict[str, str] = Depends(contacts_validators), current_user: User = Depends(auth_service.get_current_user),
+                                   db: AsyncSession = Depends(get_db)):
     """
     Повертає певний контакт за прізвищем, пряма взаємодія з юзером.
 
     :param last_name: Прізвище для пошуку
     :type last_name: str
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
+    :param validators: Заголовки ETag та Last-Modified
+    :type validators: Dict[str, str]
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертаж контакт за прізвищем
     :rtype: Contact
     """
-    contact = await repository_contact.get_contact_by_last_name(last_name, current_user, db)
+    contact = await repository_contact.get_contact_by_last_name(last_name, current_user, db, fields)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=('Contact not found'))
-    return contact
+    response = contacts_response(contact, fields)
+    response.headers.update(validators)
+    return response
 
 @router.get('/email/{email}', response_model=ResponseModel)
-async def get_contact_by_email_name(email: EmailStr, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def get_contact_by_email_name(email: EmailStr, fields: Tuple[str, ...] | None = Depends(contact_fields),
+                                    validators: Dict[str, str] = Depends(contacts_validators), current_user: User = Depends(auth_service.get_current_user),
+                                    db: AsyncSession = Depends(get_db)):
     """
     Повертає певний контакт за електроною поштою, пряма взаємодія з юзером.
 
     :param email: Електрона пошта для пошуку
     :type email: EmailStr
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
+    :param validators: Заголовки ETag та Last-Modified
+    :type validators: Dict[str, str]
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертаж контакт за електроною поштою
     :rtype: Contact
     """
-    contact = await repository_contact.get_contact_by_email(email, current_user, db)
+    contact = await repository_contact.get_contact_by_email(email, current_user, db, fields)
     if contact is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=('Contact not found'))
-    return contact
+    response = contacts_response(contact, fields)
+    response.headers.update(validators)
+    return response
 
 @router.get('/upcoming_birthay', response_model=List[ResponseModel])
-async def upcoming_birthday(current_user: User = Depends(auth_service.get_current_user),db: Session = Depends(get_db)):
+async def upcoming_birthday(days: int = Query(7, ge=0, le=365), fields: Tuple[str, ...] | None = Depends(contact_fields),
+                            current_user: User = Depends(auth_service.get_current_user),db: AsyncSession = Depends(get_db)):
     """
-    Повертає список контактів в яких день народженя в межах тижня від поточної дати, пряма взаємодія з юзером.
+    Повертає список контактів в яких день народженя в межах заданої кількості днів від поточної дати, пряма взаємодія з юзером.
 
+    :param days: Кількість днів від поточної дати, за замовчуванням тиждень
+    :type days: int
+    :param fields: Поля контакту, які треба повернути, за замовчуванням усі
+    :type fields: Tuple[str, ...] | None
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
-    :return: Повертає список контактів в яких день народженя в межах тижня від поточної дати.
+    :type db: AsyncSession
+    :return: Повертає список контактів в яких день народженя в межах заданої кількості днів від поточної дати.
     :rtype: List[Contacts]
     """
-    contact = await repository_contact.upcoming_birthday(current_user,db)
+    contact = await repository_contact.upcoming_birthday(current_user, db, days, fields=fields)
     if contact is []:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=('No contacts in this time area'))
-    return contact
+    return contacts_response(contact, fields)
 
 
 @router.post('/', response_model=ResponseModel)
-async def create_contact(body: ContactModel, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def create_contact(body: ContactModel, current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Створення нового контакту, пряма взаємодія з юзером.
 
@@ -117,14 +268,36 @@ async def create_contact(body: ContactModel, current_user: User = Depends(auth_s
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає створений контакт 
     :rtype: Contact
     """
     return await repository_contact.create_contact(body, current_user, db)
 
+@router.post('/bulk', response_model=BulkImportResponse)
+async def import_contacts(request: Request, current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
+    """
+    Масовий імпорт контактів, пряма взаємодія з юзером.
+    Тіло запиту читається потоком у форматі CSV (text/csv), NDJSON (application/x-ndjson) або vCard (text/vcard).
+
+    :param request: Http запит
+    :type request: Request
+    :param current_user: Аутентифікований юзер 
+    :type current_user: User
+    :param db: База даниз з яких отримуємо данні
+    :type db: AsyncSession
+    :return: Кількість імпортованих контактів та помилки по рядках
+    :rtype: dict
+    """
+    parser = parser_for(request.headers.get('content-type'))
+    if parser is None:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                            detail='Expected text/csv, application/x-ndjson or text/vcard')
+    records = parser(iter_lines(request.stream()))
+    return await repository_contact.import_contacts(records, current_user, db, settings.bulk_import_batch_size, settings.bulk_import_max_errors)
+
 @router.put('/{contact_id}', response_model=ResponseModel)
-async def change_contact(contact_id: int, body: ContactModel, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def change_contact(contact_id: int, body: ContactModel, current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Редагування інформації про певний контакт, пряма взаємодія з юзером.
 
@@ -135,7 +308,7 @@ async def change_contact(contact_id: int, body: ContactModel, current_user: User
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає відредагований контакт або None
     :rtype: Contact | None
     """
@@ -145,7 +318,7 @@ async def change_contact(contact_id: int, body: ContactModel, current_user: User
     return contact
 
 @router.delete('/{contact_id}', response_model=ResponseModel)
-async def delete_contact(contact_id: int, current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def delete_contact(contact_id: int, current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Видалення певного контакту з бази данних, пряма взаємодія з юзером.
 
@@ -154,7 +327,7 @@ async def delete_contact(contact_id: int, current_user: User = Depends(auth_serv
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     :return: Повертає видалений контакт або None
     :rtype: Contact | None
     """
@@ -0,0 +1,93 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from src.conf.config import settings
+from src.database.db import get_engine
+from src.database.pool import pool_stats
+from src.services.user_cache import user_cache
+from src.services.contacts_cache import contacts_cache
+from src.services.auth import auth_service
+from src.services.email import mail_sender
+from src.services.avatars import avatar_uploader
+from src.services.gravatar import gravatar_resolver
+from src.services.rate_limit import rate_limiter
+
+async def require_internal_token(x_internal_token: str = Header('')):
+    """
+    Доступ до внутрішньої статистики лише з токеном ``INTERNAL_TOKEN`` у заголовку ``X-Internal-Token``.
+
+    :param x_internal_token: токен із заголовка запиту
+    :type x_internal_token: str
+    :raises HTTPException: 403, якщо токен не збігається
+    """
+    if not settings.internal_token or not secrets.compare_digest(x_internal_token, settings.internal_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Forbidden')
+
+router = APIRouter(prefix='/internal', tags=['internal'], include_in_schema=False,
+                   dependencies=[Depends(require_internal_token)])
+
+@router.get('/pool')
+async def read_pool_stats():
+    """
+    Статистика пулу з'єднань з базою даних: видані з'єднання, переповнення,
+    гістограма часу очікування та невдалі спроби отримати з'єднання.
+
+    :return: стан пулу з'єднань
+    :rtype: dict
+    """
+    return pool_stats.snapshot(get_engine().sync_engine.pool)
+
+@router.get('/cache')
+async def read_cache_stats():
+    """
+    Лічильники влучань та промахів кешу автентифікованих юзерів і кешу запитів контактів,
+    гістограма часу читання кешу контактів з Redis.
+
+    :return: статистика кешу
+    :rtype: dict
+    """
+    return {'users': user_cache.stats(), 'contacts': contacts_cache.stats()}
+
+@router.get('/hashing')
+async def read_hashing_stats():
+    """
+    Стан пулу хешування паролів: вартість bcrypt, зайняті потоки та глибина черги.
+
+    :return: статистика хешування
+    :rtype: dict
+    """
+    return auth_service.hasher.stats()
+
+@router.get('/mail')
+async def read_mail_stats():
+    """
+    Стан черги надсилання листів: глибина черги, надіслані, невдалі та повторені листи,
+    гістограма часу надсилання.
+
+    :return: статистика надсилання листів
+    :rtype: dict
+    """
+    return mail_sender.stats()
+
+@router.get('/avatars')
+async def read_avatar_stats():
+    """
+    Лічильники завантажень зображень юзерів: активні, успішні та відхилені завантаження,
+    обсяг отриманих і збережених даних, результати пошуку зображень у Gravatar.
+
+    :return: статистика завантажень
+    :rtype: dict
+    """
+    return {**avatar_uploader.stats(), 'gravatar': gravatar_resolver.stats()}
+
+@router.get('/rate-limit')
+async def read_rate_limit_stats():
+    """
+    Лічильники обмеження запитів: перевірки без Redis і через Redis, відхилені запити,
+    помилки Redis та запити, дозволені через недоступність Redis.
+
+    :return: статистика обмеження запитів
+    :rtype: dict
+    """
+    return rate_limiter.stats()
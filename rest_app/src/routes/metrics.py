@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.services.auth import auth_service
+from src.services.email import mail_sender
+from src.services.metrics import CallbackMetric, registry
+
+router = APIRouter(tags=['metrics'], include_in_schema=False)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry.register(CallbackMetric('mail_queue_depth', 'Emails waiting in the send queue.',
+                                 lambda: mail_sender.stats()['queue_depth']))
+registry.register(CallbackMetric('mail_sent_total', 'Emails sent.', lambda: mail_sender.sent, 'counter'))
+registry.register(CallbackMetric('mail_failed_total', 'Emails that could not be sent.', lambda: mail_sender.failed,
+                                 'counter'))
+registry.register(CallbackMetric('password_hash_queued', 'Password hashing jobs waiting for a bcrypt thread.',
+                                 lambda: auth_service.hasher.queued))
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def read_metrics():
+    """
+    Метрики застосунку у текстовому форматі Prometheus: затримка HTTP-запитів за маршрутами,
+    запити в обробці, запити до бази даних на HTTP-запит, час bcrypt і JWT, черга листів.
+
+    :return: метрики поточного процесу
+    :rtype: PlainTextResponse
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
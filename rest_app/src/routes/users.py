@@ -1,13 +1,11 @@
 from fastapi import APIRouter, Depends, status, UploadFile, File
-from sqlalchemy.orm import Session
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.database.models import User
 from src.repository import users as repository_users
 from src.services.auth import auth_service
-from src.conf.config import settings
+from src.services.avatars import avatar_uploader
 from src.schemas import UserDb
 
 router = APIRouter(prefix='/users', tags=['users'])
@@ -24,26 +22,17 @@ async def read_user_me(current_user: UserDb = Depends(auth_service.get_current_u
     return current_user
 
 @router.patch('/avatar', response_model=UserDb)
-async def update_avatar_user(file: UploadFile = File(), current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def update_avatar_user(file: UploadFile = File(), current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Оновлення зображення юзера.
 
-    :param file: файл для нового зображення юзера.
+    :param file: файл для нового зображення юзера, зменшується до 250x250 перед збереженням
     :type file: UploadFile
     :param current_user: Аутентифікований юзер 
     :type current_user: User
     :param db: База даниз з яких отримуємо данні
-    :type db: Session
+    :type db: AsyncSession
     """
-    cloudinary.config(
-        cloud_name=settings.cloudinary_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True
-    )
-
-    r = cloudinary.uploader.upload(file.file, public_id=f'RestApp/{current_user.username}', overwrite=True)
-    src_url = cloudinary.CloudinaryImage(f'RestApp/{current_user.username}')\
-                        .build_url(width=250, heigth=250, crop='fill', version=r.get('version'))
+    src_url = await avatar_uploader.upload(file, f'RestApp/{current_user.username}')
     user = await repository_users.update_avatar(current_user.email, src_url, db)
     return user
\ No newline at end of file
@@ -1,6 +1,10 @@
 from datetime import datetime, date
+from typing import List, Literal
+
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 
+SortKey = Literal['id', 'first_name', 'last_name', 'email', 'birthday']
+
 class ResponseModel(BaseModel):
     id: int
     first_name: str = Field(max_length=25)
@@ -12,6 +16,8 @@ class ResponseModel(BaseModel):
     class Config:
         from_attributes = True
 
+CONTACT_FIELDS = tuple(ResponseModel.model_fields)
+
 class ContactModel(BaseModel):
     first_name: str = Field(max_length=25)
     last_name: str = Field(max_length=25)
@@ -22,6 +28,15 @@ class ContactModel(BaseModel):
     class Config:
         from_attributes = True
 
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class BulkImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+
 class UserModel(BaseModel): 
     username: str = Field(min_length=5, max_length=16)
     email: str
@@ -32,7 +47,7 @@ class UserDb(BaseModel):
     username: str
     email: str
     created_at: datetime
-    avatar: str
+    avatar: str | None = None
 
     class Config:
         from_attributes = True
@@ -1,33 +1,67 @@
 from typing import Optional
 
-from jose import JWSError, jwt
+from jose import JWSError, JWTError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+import time
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.repository import users as repository_users
+from src.services.user_cache import user_cache
+from src.services.hashing import PasswordHasher
+from src.services import token_cache
+from src.services.metrics import auth_duration
 from src.conf.config import settings
 
 
+def _jwt():
+    """
+    Модуль ``jose.jwt`` (разом з криптографічними бекендами) імпортується при першому
+    створенні чи перевірці токена, а не при імпорті застосунку.
+    """
+    from jose import jwt
+
+    return jwt
+
+
 class Auth:
     """
     Клас для роботи з автентифікацією юзера.
-    :param pwd_context: управління налаштуваннями та методами шифрування паролів
+    :param hasher: хешування паролів bcrypt в окремому пулі потоків
     :param SECRET_KEY: секретний ключ
     :param ALGORITHM: алгорист шифрування
     :param oauth2_scheme: це клас з бібліотеки FastAPI, який використовується для створення аутентифікаційної схеми OAuth2 для захисту API-маршрутів
     """
-    pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+    hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_queue, settings.bcrypt_rounds)
     SECRET_KEY = settings.secret_key
     ALGORITHM = settings.algorithm
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/auth/login')
 
+    def _encode(self, claims: dict) -> str:
+        start = time.perf_counter()
+        token = _jwt().encode(claims, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        auth_duration.observe(time.perf_counter() - start, 'jwt_encode')
+        return token
+
+    def _decode(self, token: str) -> dict:
+        start = time.perf_counter()
+        try:
+            return _jwt().decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+        finally:
+            auth_duration.observe(time.perf_counter() - start, 'jwt_decode')
+
+    @property
+    def pwd_context(self):
+        """
+        Поточні налаштування шифрування паролів.
+        """
+        return self.hasher.context
+
     def verify_password(self, plain_password, hashed_password):
         """
-        Первірка паролю
+        Первірка паролю. Блокуючий виклик, в обробниках запитів слід використовувати check_password.
         :param self: посилання на поточний об'єкт класу
         :param plain_password: поточний пароль
         :param hashed_password: хешований(закодований) пароль
@@ -36,12 +70,33 @@ class Auth:
     
     def get_password_hash(self, password: str):
         """
-        Отримання хешу пароля.
+        Отримання хешу пароля. Блокуючий виклик, в обробниках запитів слід використовувати hash_password.
 
         :param self: посилання на поточний об'єкт класу
         :param password: пароль для якого треба отримати хеш
         """
         return self.pwd_context.hash(password)
+
+    async def check_password(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Перевірка паролю поза циклом подій.
+
+        :param self: посилання на поточний об'єкт класу
+        :param plain_password: поточний пароль
+        :param hashed_password: хешований(закодований) пароль
+        :return: результат перевірки та новий хеш, якщо збережений має застарілу вартість
+        :rtype: tuple[bool, str | None]
+        """
+        return await self.hasher.verify(plain_password, hashed_password)
+
+    async def hash_password(self, password: str) -> str:
+        """
+        Отримання хешу пароля поза циклом подій.
+
+        :param self: посилання на поточний об'єкт класу
+        :param password: пароль для якого треба отримати хеш
+        """
+        return await self.hasher.hash(password)
     
     async def create_access_token(self, data: dict, expires_delta: Optional[float] = None):
         """
@@ -59,7 +114,7 @@ class Auth:
         else:
             expire = datetime.utcnow() + timedelta(minutes=15)
         to_encode.update({"iat": datetime.utcnow(), "exp": expire, "scope": "access_token"})
-        encoded_access_token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        encoded_access_token = self._encode(to_encode)
         return encoded_access_token
 
     # define a function to generate a new refresh token
@@ -79,9 +134,37 @@ class Auth:
         else:
             expire = datetime.utcnow() + timedelta(days=7)
         to_encode.update({"iat": datetime.utcnow(), "exp": expire, "scope": "refresh_token"})
-        encoded_refresh_token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        encoded_refresh_token = self._encode(to_encode)
         return encoded_refresh_token
     
+    def decode_token(self, token: str) -> dict:
+        """
+        Перевірка підпису та розшифрування ключа доступу.
+        Вміст уже перевірених токенів береться з кешу до закінчення їх терміну дії.
+
+        :param self: посилання на поточний об'єкт класу
+        :param token: ключ доступу
+        :type token: str
+        :return: вміст токена
+        :rtype: dict
+        :raises JWTError: якщо токен недійсний або прострочений
+        """
+        payload = token_cache.get_payload(token)
+        if payload is None:
+            payload = self._decode(token)
+            token_cache.store_payload(token, payload)
+        return payload
+
+    def revoke_token(self, token: str | None):
+        """
+        Відкликання ключа доступу: токен видаляється з кешу перевірених токенів.
+
+        :param self: посилання на поточний об'єкт класу
+        :param token: ключ доступу
+        :type token: str | None
+        """
+        token_cache.revoke_token(token)
+
     async def decode_refresh_token(self, refresh_token: str):
         """
         Розшифрування ключа оновлення доступу
@@ -91,23 +174,23 @@ class Auth:
         :type refresh_token: str
         """
         try:
-            payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload['scope'] == 'refresh_token':
+            payload = self.decode_token(refresh_token)
+            if payload.get('scope') == 'refresh_token':
                 email = payload['sub']
                 return email
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid scope for token')
-        except JWSError:
+        except (JWTError, JWSError):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
         
-    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
         """
-        Отримання поточного юзера.
+        Отримання поточного юзера. Юзер береться з кешу, а при промаху - з бази даних.
 
         :param self: посилання на поточний об'єкт класу
         :param token: ключ доступу користувача
         :type token: str
         :param db: База даниз з яких отримуємо данні
-        :type db: Session
+        :type db: AsyncSession
         """
         credentials_exeption = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -116,19 +199,22 @@ class Auth:
         )
 
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
-            if payload['scope'] == 'access_token':
+            payload = self.decode_token(token)
+            if payload.get('scope') == 'access_token':
                 email = payload['sub']
                 if email is None:
                     raise credentials_exeption
             else:
                 raise credentials_exeption
-        except JWSError as e:
+        except (JWTError, JWSError) as e:
             raise credentials_exeption
         
-        user = await repository_users.get_user_by_email(email, db)
+        user = await user_cache.get(email)
         if user is None:
-            raise credentials_exeption
+            user = await repository_users.get_user_by_email(email, db)
+            if user is None:
+                raise credentials_exeption
+            await user_cache.set(user)
         return user 
     
     def create_email_token(self, data: dict):
@@ -142,7 +228,7 @@ class Auth:
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=7)
         to_encode.update({'iat': datetime.utcnow(), 'exp': expire})
-        token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        token = self._encode(to_encode)
         return token
     
     async def get_email_from_token(self, token: str):
@@ -154,7 +240,7 @@ class Auth:
         :type data: str
         """
         try:
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self._decode(token)
             email = payload['sub']
             return email
         except JWSError as e:
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+from typing import Sequence
+
+from fastapi import HTTPException, UploadFile, status
+
+from src.conf.config import settings
+from src.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 64 * 1024
+
+
+class AvatarStorage(ABC):
+    """
+    Сховище зображень юзерів. Реалізації зберігають вже підготовлене зображення
+    і повертають посилання на нього.
+    """
+
+    @abstractmethod
+    async def save(self, name: str, data: bytes) -> str:
+        """
+        Збереження зображення.
+
+        :param self: посилання на поточний об'єкт класу
+        :param name: назва зображення, наприклад ``RestApp/<username>``
+        :type name: str
+        :param data: зображення у форматі JPEG
+        :type data: bytes
+        :return: посилання на збережене зображення
+        :rtype: str
+        """
+
+
+class CloudinaryStorage(AvatarStorage):
+    """
+    Зберігання зображень у Cloudinary. Бібліотека імпортується та налаштовується один раз при першому
+    завантаженні, а синхронне завантаження виконується в окремому потоці, щоб не блокувати цикл подій.
+    """
+
+    def __init__(self, cloud_name: str, api_key: str, api_secret: str):
+        self.credentials = {'cloud_name': cloud_name, 'api_key': api_key, 'api_secret': api_secret}
+        self._upload = None
+
+    def _uploader(self):
+        if self._upload is None:
+            import cloudinary
+            import cloudinary.uploader
+
+            cloudinary.config(**self.credentials, secure=True)
+            self._upload = cloudinary.uploader.upload
+        return self._upload
+
+    async def save(self, name: str, data: bytes) -> str:
+        result = await asyncio.to_thread(self._uploader(), data, public_id=name, overwrite=True)
+        return result['secure_url']
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Локальне сховище зображень з адресацією за вмістом: назва файлу - це SHA-256 зображення,
+    тож однакові зображення зберігаються один раз, а збережений файл ніколи не змінюється.
+    Зменшені копії розміром ``sizes`` створюються один раз при збереженні (або при першому запиті,
+    якщо набір розмірів змінився), а прочитані копії тримаються в пам'яті процесу.
+
+    :param root: папка для зображень
+    :param base_url: префікс посилань на зображення
+    :param sizes: розміри зменшених копій, пікселі
+    :param memory_items: скільки копій тримати в пам'яті
+    """
+
+    def __init__(self, root: str | Path, base_url: str, sizes: Sequence[int] = (), memory_items: int = 1024):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip('/')
+        self.sizes = tuple(sorted(set(sizes)))
+        self.memory = TTLCache(memory_items, float('inf'))
+
+    def path(self, digest: str, size: int | None = None) -> Path:
+        """
+        Шлях до файлу зображення або його зменшеної копії.
+
+        :param self: посилання на поточний об'єкт класу
+        :param digest: SHA-256 зображення
+        :type digest: str
+        :param size: розмір копії або None для вихідного зображення
+        :type size: int | None
+        :rtype: Path
+        """
+        suffix = '' if size is None else f'-{size}'
+        return self.root / digest[:2] / f'{digest}{suffix}.jpg'
+
+    def variant_size(self, size: int) -> int | None:
+        """
+        Найменша копія, не менша за ``size``; для більших розмірів - вихідне зображення (None).
+
+        :param self: посилання на поточний об'єкт класу
+        :param size: бажаний розмір, пікселі
+        :type size: int
+        :rtype: int | None
+        """
+        index = bisect_left(self.sizes, size)
+        return self.sizes[index] if index < len(self.sizes) else None
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # a unique temporary file: concurrent writes of the same image must not share one
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _store(self, digest: str, data: bytes):
+        original = self.path(digest)
+        if not original.exists():
+            self._write(original, data)
+        for size in self.sizes:
+            if not self.path(digest, size).exists():
+                self._write(self.path(digest, size), resize_avatar(data, size))
+
+    async def save(self, name: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._store, digest, data)
+        return f'{self.base_url}/{digest}'
+
+    def _load(self, digest: str, size: int | None) -> bytes | None:
+        path = self.path(digest, size)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            if size is None or not self.path(digest).exists():
+                return None
+        data = resize_avatar(self.path(digest).read_bytes(), size)
+        self._write(path, data)
+        return data
+
+    async def read(self, digest: str, size: int | None) -> bytes | None:
+        """
+        Зображення або його копія з пам'яті, а при промаху - з диска.
+
+        :param self: посилання на поточний об'єкт класу
+        :param digest: SHA-256 зображення
+        :type digest: str
+        :param size: розмір копії (з variant_size) або None для вихідного зображення
+        :type size: int | None
+        :return: зображення у форматі JPEG або None, якщо його немає
+        :rtype: bytes | None
+        """
+        data = self.memory.get((digest, size))
+        if data is None:
+            data = await asyncio.to_thread(self._load, digest, size)
+            if data is not None:
+                self.memory.set((digest, size), data)
+        return data
+
+
+def resize_avatar(data: bytes, size: int) -> bytes:
+    """
+    Обрізання зображення до квадрата по центру та зменшення до ``size`` x ``size`` пікселів.
+
+    :param data: вихідне зображення
+    :type data: bytes
+    :param size: сторона квадрата, пікселі
+    :type size: int
+    :return: зображення у форматі JPEG
+    :rtype: bytes
+    :raises HTTPException: якщо файл не є зображенням
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEG decoder can scale down by 1/2..1/8 while decoding, far cheaper than a full decode
+            image.draft('RGB', (size, size))
+            image = ImageOps.exif_transpose(image)
+            image = ImageOps.fit(image.convert('RGB'), (size, size), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='File is not a supported image')
+    output = io.BytesIO()
+    image.save(output, 'JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+
+class AvatarUploader:
+    """
+    Завантаження зображень юзерів: файл читається частинами з обмеженням розміру,
+    зменшується локально в окремому потоці і лише потім передається в сховище.
+    Одночасно обробляється не більше ``concurrency`` завантажень.
+
+    :param storage: сховище зображень
+    :param max_bytes: максимальний розмір файлу
+    :param size: сторона квадратного зображення, пікселі
+    :param concurrency: максимальна кількість одночасних завантажень
+    """
+
+    def __init__(self, storage: AvatarStorage, max_bytes: int, size: int, concurrency: int):
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.size = size
+        self.concurrency = concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self.in_flight = 0
+        self.uploaded = 0
+        self.rejected = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _too_large(self) -> HTTPException:
+        self.rejected += 1
+        return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                             detail=f'File is larger than {self.max_bytes} bytes')
+
+    async def read(self, file: UploadFile) -> bytes:
+        """
+        Читання файлу частинами, не більше ``max_bytes``.
+
+        :param self: посилання на поточний об'єкт класу
+        :param file: завантажений файл
+        :type file: UploadFile
+        :rtype: bytes
+        :raises HTTPException: 413, якщо файл завеликий
+        """
+        if file.size is not None and file.size > self.max_bytes:
+            raise self._too_large()
+        chunks, total = [], 0
+        while chunk := await file.read(_CHUNK):
+            total += len(chunk)
+            if total > self.max_bytes:
+                raise self._too_large()
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    async def upload(self, file: UploadFile, name: str) -> str:
+        """
+        Підготовка та збереження зображення юзера.
+
+        :param self: посилання на поточний об'єкт класу
+        :param file: завантажений файл
+        :type file: UploadFile
+        :param name: назва зображення в сховищі
+        :type name: str
+        :return: посилання на збережене зображення
+        :rtype: str
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        data = await self.read(file)
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                avatar = await asyncio.to_thread(resize_avatar, data, self.size)
+                url = await self.storage.save(name, avatar)
+            finally:
+                self.in_flight -= 1
+        self.uploaded += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(avatar)
+        return url
+
+    def stats(self) -> dict:
+        """
+        Лічильники завантажень зображень.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        return {
+            'storage': type(self.storage).__name__,
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'uploaded': self.uploaded,
+            'rejected': self.rejected,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'memory': self.storage.memory.stats() if isinstance(self.storage, LocalStorage) else None,
+        }
+
+
+def create_storage() -> AvatarStorage:
+    """
+    Сховище зображень за налаштуваннями: ``cloudinary`` (за замовчуванням) або ``local``.
+    Локальне сховище підходить лише для одного екземпляра застосунку з постійним диском.
+
+    :rtype: AvatarStorage
+    """
+    if settings.avatar_storage == 'local':
+        return LocalStorage(settings.avatar_local_dir, settings.avatar_base_url, settings.avatar_variant_sizes,
+                            settings.avatar_memory_items)
+    return CloudinaryStorage(settings.cloudinary_name, settings.cloudinary_api_key, settings.cloudinary_api_secret)
+
+
+avatar_uploader = AvatarUploader(create_storage(), settings.avatar_max_bytes, settings.avatar_size,
+                                 settings.avatar_upload_concurrency)
@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Обмежений за розміром кеш в пам'яті процесу з часом життя записів.
+    При переповненні витісняється запис, який найдовше не використовувався (LRU).
+
+    :param maxsize: максимальна кількість записів
+    :param ttl: час життя запису за замовчуванням, с
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Отримання запису з кешу.
+
+        :param self: посилання на поточний об'єкт класу
+        :param key: ключ запису
+        :param default: значення, якщо запису немає або він застарів
+        """
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """
+        Збереження запису в кеші.
+
+        :param self: посилання на поточний об'єкт класу
+        :param key: ключ запису
+        :param value: значення
+        :param ttl: час життя запису, с; за замовчуванням - ttl кешу
+        :type ttl: float | None
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """
+        Видалення запису з кешу.
+
+        :param self: посилання на поточний об'єкт класу
+        :param key: ключ запису
+        """
+        self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Очищення кешу та лічильників.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Лічильники влучань та промахів кешу.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
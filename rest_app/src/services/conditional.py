@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+
+def contacts_etag(user_id: int, version: int) -> str:
+    """
+    Слабкий ETag контактів юзера. Змінюється з кожною зміною контактів, тож однаковий URL
+    з однаковим ETag завжди повертає однакові дані.
+
+    :param user_id: ID юзера
+    :type user_id: int
+    :param version: лічильник змін контактів юзера
+    :type version: int
+    :rtype: str
+    """
+    return f'W/"{user_id}-{version}"'
+
+
+def validator_headers(etag: str, modified_at: datetime | None) -> Dict[str, str]:
+    """
+    Заголовки ETag та Last-Modified для відповіді. Відповідь можна зберігати лише в кеші клієнта
+    і перед повторним використанням треба перевірити.
+
+    :param etag: ETag відповіді
+    :type etag: str
+    :param modified_at: час останньої зміни в UTC
+    :type modified_at: datetime | None
+    :rtype: Dict[str, str]
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if modified_at is not None:
+        headers['Last-Modified'] = format_datetime(modified_at.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Слабке порівняння ETag з заголовком If-None-Match (RFC 9110, 13.1.2).
+
+    :param if_none_match: значення заголовка If-None-Match
+    :type if_none_match: str
+    :param etag: поточний ETag
+    :type etag: str
+    :rtype: bool
+    """
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.strip().removeprefix('W/') == opaque for tag in if_none_match.split(','))
+
+
+def not_modified(headers, etag: str, modified_at: datetime | None) -> bool:
+    """
+    Чи можна відповісти 304 Not Modified. If-Modified-Since враховується лише без If-None-Match.
+
+    :param headers: заголовки запиту
+    :param etag: поточний ETag
+    :type etag: str
+    :param modified_at: час останньої зміни в UTC
+    :type modified_at: datetime | None
+    :rtype: bool
+    """
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since is None or modified_at is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return modified_at.replace(tzinfo=timezone.utc, microsecond=0) <= since
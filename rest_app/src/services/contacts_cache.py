@@ -0,0 +1,222 @@
+import hashlib
+import logging
+import struct
+import time
+from bisect import bisect_left
+from datetime import date
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Sequence
+
+from src.conf.config import settings
+from src.database.models import Contact
+from src.schemas import CONTACT_FIELDS
+from src.services.redis_client import get_redis, redis_error
+
+if TYPE_CHECKING:
+    from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+_VERSION = 1
+_HEADER = struct.Struct('<BBI')
+_INT = struct.Struct('<q')
+_SIZE = struct.Struct('<I')
+_NULL = 0xFFFFFFFF
+_DATE_FIELDS = frozenset({'birthday'})
+_INT_FIELDS = frozenset({'id'})
+
+
+def encode_contacts(contacts: Sequence[Contact], fields: Sequence[str] = CONTACT_FIELDS) -> bytes:
+    """
+    Компактне двійкове кодування контактів: заголовок з маскою полів і кількістю рядків,
+    далі значення полів кожного рядка (числа та дати - фіксованої довжини, рядки - довжина і UTF-8).
+
+    :param contacts: контакти
+    :type contacts: Sequence[Contact]
+    :param fields: поля, які треба зберегти
+    :type fields: Sequence[str]
+    :rtype: bytes
+    """
+    mask = 0
+    for number, field in enumerate(CONTACT_FIELDS):
+        if field in fields:
+            mask |= 1 << number
+    columns = [field for field in CONTACT_FIELDS if field in fields]
+    parts = [_HEADER.pack(_VERSION, mask, len(contacts))]
+    for contact in contacts:
+        for field in columns:
+            value = getattr(contact, field)
+            if field in _INT_FIELDS:
+                parts.append(_INT.pack(value))
+            elif field in _DATE_FIELDS:
+                parts.append(_SIZE.pack(value.toordinal()))
+            elif value is None:
+                parts.append(_SIZE.pack(_NULL))
+            else:
+                raw = value.encode()
+                parts.append(_SIZE.pack(len(raw)))
+                parts.append(raw)
+    return b''.join(parts)
+
+
+def decode_contacts(raw: bytes) -> List[Contact]:
+    """
+    Розкодування контактів, збережених encode_contacts, у від'єднані об'єкти Contact.
+
+    :param raw: закодовані контакти
+    :type raw: bytes
+    :rtype: List[Contact]
+    :raises ValueError: якщо дані в іншому форматі або пошкоджені
+    """
+    try:
+        return _decode(raw)
+    except (struct.error, OverflowError) as err:
+        raise ValueError(f'Corrupted contacts cache entry: {err}') from err
+
+
+def _decode(raw: bytes) -> List[Contact]:
+    version, mask, count = _HEADER.unpack_from(raw)
+    if version != _VERSION:
+        raise ValueError(f'Unknown contacts cache format {version}')
+    columns = [field for number, field in enumerate(CONTACT_FIELDS) if mask & (1 << number)]
+    data, offset, contacts = memoryview(raw), _HEADER.size, []
+    for _ in range(count):
+        values = {}
+        for field in columns:
+            if field in _INT_FIELDS:
+                values[field] = _INT.unpack_from(data, offset)[0]
+                offset += _INT.size
+                continue
+            size = _SIZE.unpack_from(data, offset)[0]
+            offset += _SIZE.size
+            if field in _DATE_FIELDS:
+                values[field] = date.fromordinal(size)
+            elif size == _NULL:
+                values[field] = None
+            else:
+                values[field] = str(data[offset:offset + size], 'utf-8')
+                offset += size
+        contacts.append(Contact(**values))
+    if offset != len(raw):
+        raise ValueError('Truncated contacts cache entry')
+    return contacts
+
+
+class ContactsCache:
+    """
+    Кеш результатів запитів контактів у Redis (read-through).
+
+    Ключ запису містить лічильник змін контактів юзера (``users.contacts_version``), прочитаний
+    запитом з бази даних. Лічильник збільшується в тій самій транзакції, що й зміна контактів,
+    тож окремої інвалідації немає: записи старих версій більше не читаються і зникають після ``ttl``.
+    Без Redis кеш вимкнений і запити завжди йдуть у базу даних.
+
+    :param ttl: час життя запису, с
+    :param redis: функція, що повертає клієнт Redis, або None, щоб вимкнути кеш
+    """
+    prefix = 'contacts:'
+    buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+    def __init__(self, ttl: float, redis: Callable[[], 'aioredis.Redis'] | None = None):
+        self.ttl = ttl
+        self.redis = redis
+        self.reset()
+
+    def reset(self):
+        """
+        Обнулення статистики.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.latency_sum = 0.0
+
+    def _observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.latency_sum += seconds
+
+    def _error(self, err: Exception):
+        self.errors += 1
+        logger.warning('Contacts cache: redis unavailable: %s', err)
+
+    def _key(self, user_id: int, version: int, query: tuple) -> str:
+        digest = hashlib.blake2b(repr(query).encode(), digest_size=12).hexdigest()
+        return f"{self.prefix}{user_id}:{version}:{digest}"
+
+    async def fetch(self, user_id: int, version: int, query: tuple, fields: Sequence[str],
+                    load: Callable[[], Awaitable[List[Contact]]]) -> List[Contact]:
+        """
+        Результат запиту з кешу, а при промаху - з бази даних з подальшим збереженням у кеші.
+
+        :param self: посилання на поточний об'єкт класу
+        :param user_id: ID юзера
+        :type user_id: int
+        :param version: лічильник змін контактів юзера, прочитаний до контактів
+        :type version: int
+        :param query: назва запиту та його параметри
+        :type query: tuple
+        :param fields: поля контактів, що повертає запит
+        :type fields: Sequence[str]
+        :param load: функція, що виконує запит до бази даних
+        :return: список контактів
+        :rtype: List[Contact]
+        """
+        if self.redis is None:
+            return await load()
+        redis = self.redis()
+        key = self._key(user_id, version, query)
+        start = time.perf_counter()
+        try:
+            raw = await redis.get(key)
+        except redis_error() as err:
+            self._error(err)
+            return await load()
+        self._observe(time.perf_counter() - start)
+        if raw is not None:
+            try:
+                contacts = decode_contacts(raw)
+            except ValueError as err:
+                # an entry of another format version or a damaged one is a miss
+                self.errors += 1
+                logger.warning('Contacts cache: unreadable entry %s: %s', key, err)
+                try:
+                    await redis.delete(key)
+                except redis_error() as err:
+                    self._error(err)
+            else:
+                self.hits += 1
+                return contacts
+        self.misses += 1
+        contacts = await load()
+        try:
+            await redis.set(key, encode_contacts(contacts, fields), ex=max(1, int(self.ttl)))
+        except redis_error() as err:
+            self._error(err)
+        return contacts
+
+    def stats(self) -> dict:
+        """
+        Влучання, промахи та гістограма часу читання з Redis.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        histogram, total = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            histogram['+Inf' if bound == float('inf') else str(bound)] = total
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.redis is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'errors': self.errors,
+            'latency_seconds_sum': round(self.latency_sum, 6),
+            'latency_seconds_histogram': histogram,
+        }
+
+
+contacts_cache = ContactsCache(settings.contacts_cache_ttl, get_redis if settings.contacts_cache_redis else None)
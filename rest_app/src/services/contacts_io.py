@@ -0,0 +1,307 @@
+import codecs
+import csv
+import io
+import json
+import re
+from typing import AsyncIterator, Callable, Dict, Sequence, Tuple
+
+Record = Tuple[int, dict | None, str | None]
+
+# longest line or record of an import body, characters; longer ones are reported as row errors
+MAX_RECORD_LENGTH = 64 * 1024
+
+EXPORT_FIELDS = ('id', 'first_name', 'last_name', 'email', 'birthday', 'description')
+
+CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/vcard': 'vcard',
+    'text/x-vcard': 'vcard',
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], encoding: str = 'utf-8',
+                     max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[str | None]:
+    """
+    Розбиття потоку байтів на рядки тексту без завантаження всього тіла запиту в пам'ять.
+    Замість рядка, довшого за ``max_length`` символів, повертається None, а сам рядок не буферизується.
+
+    :param chunks: потік байтів, наприклад ``request.stream()``
+    :type chunks: AsyncIterator[bytes]
+    :param encoding: кодування тексту
+    :type encoding: str
+    :param max_length: максимальна довжина рядка, символів
+    :type max_length: int
+    :return: рядки без символів кінця рядка або None для надто довгих рядків
+    :rtype: AsyncIterator[str | None]
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parts, size, skipping = [], 0, False
+    async for chunk in chunks:
+        *lines, last = decoder.decode(chunk).split('\n')
+        for line in lines:
+            if parts:
+                line = ''.join(parts) + line
+                parts, size = [], 0
+            if skipping or len(line) > max_length:
+                skipping = False
+                yield None
+            else:
+                yield line.rstrip('\r')
+        if not skipping and last:
+            parts.append(last)
+            size += len(last)
+            if size > max_length:
+                # the rest of this line is dropped up to the next line break
+                parts, size, skipping = [], 0, True
+    line = ''.join(parts) + decoder.decode(b'', final=True)
+    if skipping or len(line) > max_length:
+        yield None
+    elif line:
+        yield line.rstrip('\r')
+
+
+def _too_long(max_length: int) -> str:
+    return f'Record is longer than {max_length} characters'
+
+
+async def parse_csv(lines: AsyncIterator[str | None], max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[Record]:
+    """
+    Розбір CSV з рядком заголовків. Поля в лапках можуть містити переноси рядків;
+    запис, довший за ``max_length`` символів (наприклад, з незакритими лапками), є помилкою.
+
+    :param lines: рядки тексту
+    :type lines: AsyncIterator[str | None]
+    :param max_length: максимальна довжина запису, символів
+    :type max_length: int
+    :return: номер запису, словник полів або None, помилка розбору або None
+    :rtype: AsyncIterator[Record]
+    """
+    header, number = None, 0
+    parts, quotes, size = [], 0, 0
+    async for line in lines:
+        if line is not None:
+            parts.append(line)
+            quotes += line.count('"')
+            size += len(line) + 1
+            if quotes % 2 and size <= max_length:
+                continue
+        if line is None or size > max_length:
+            parts, quotes, size = [], 0, 0
+            number += 1
+            yield number, None, _too_long(max_length)
+            continue
+        record = '\n'.join(parts)
+        parts, quotes, size = [], 0, 0
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        number += 1
+        if len(values) != len(header):
+            yield number, None, f'Expected {len(header)} columns, got {len(values)}'
+            continue
+        yield number, {key: value or None for key, value in zip(header, values)}, None
+    if parts:
+        yield number + 1, None, 'Unterminated quoted field'
+
+
+async def parse_ndjson(lines: AsyncIterator[str | None], max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[Record]:
+    """
+    Розбір NDJSON - один JSON-об'єкт на рядок.
+
+    :param lines: рядки тексту
+    :type lines: AsyncIterator[str | None]
+    :param max_length: максимальна довжина рядка, символів (довші рядки вже замінені на None)
+    :type max_length: int
+    :return: номер запису, словник полів або None, помилка розбору або None
+    :rtype: AsyncIterator[Record]
+    """
+    number = 0
+    async for line in lines:
+        if line is None:
+            number += 1
+            yield number, None, _too_long(max_length)
+            continue
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as err:
+            yield number, None, f'Invalid JSON: {err}'
+            continue
+        if not isinstance(data, dict):
+            yield number, None, 'Expected a JSON object'
+            continue
+        yield number, data, None
+
+
+_VCARD_ESCAPE = re.compile(r'\\(.)')
+_VCARD_COMPONENT = re.compile(r'((?:[^;\\]|\\.)*)(?:;|$)')
+
+
+def _unescape_vcard(value: str) -> str:
+    return _VCARD_ESCAPE.sub(lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def _vcard_to_contact(properties: Dict[str, str]) -> dict:
+    data = {}
+    if 'N' in properties:
+        parts = _VCARD_COMPONENT.findall(properties['N'])
+        data['last_name'] = _unescape_vcard(parts[0]) or None
+        data['first_name'] = _unescape_vcard(parts[1]) if len(parts) > 1 and parts[1] else None
+    if not data.get('first_name') and 'FN' in properties:
+        data['first_name'] = _unescape_vcard(properties['FN'])
+    if 'EMAIL' in properties:
+        data['email'] = properties['EMAIL']
+    if 'BDAY' in properties:
+        bday = properties['BDAY']
+        data['birthday'] = f'{bday[:4]}-{bday[4:6]}-{bday[6:8]}' if len(bday) == 8 and bday.isdigit() else bday
+    if 'NOTE' in properties:
+        data['description'] = _unescape_vcard(properties['NOTE'])
+    return data
+
+
+async def parse_vcard(lines: AsyncIterator[str | None], max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[Record]:
+    """
+    Розбір vCard (BEGIN:VCARD ... END:VCARD). Використовуються властивості N, FN, EMAIL, BDAY та NOTE.
+    Картка, довша за ``max_length`` символів, є помилкою, а її решта пропускається до наступної картки.
+
+    :param lines: рядки тексту
+    :type lines: AsyncIterator[str | None]
+    :param max_length: максимальна довжина картки, символів
+    :type max_length: int
+    :return: номер картки, словник полів або None, помилка розбору або None
+    :rtype: AsyncIterator[Record]
+    """
+    properties, previous, number, size = None, None, 0, 0
+
+    def add(parts):
+        name, _, value = ''.join(parts).partition(':')
+        name = name.split(';')[0].upper()
+        properties.setdefault(name, value)
+
+    async for line in lines:
+        if properties is not None:
+            size += len(line) + 1 if line is not None else max_length + 1
+            if size > max_length:
+                number += 1
+                yield number, None, _too_long(max_length)
+                properties, previous = None, None
+                continue
+        if line is None:
+            continue
+        if line[:1] in (' ', '\t'):
+            if previous is not None:
+                previous.append(line[1:])
+            continue
+        if previous is not None and properties is not None:
+            add(previous)
+        previous = None
+        upper = line.strip().upper()
+        if upper == 'BEGIN:VCARD':
+            properties, size = {}, len(line) + 1
+        elif upper == 'END:VCARD':
+            if properties is not None:
+                number += 1
+                yield number, _vcard_to_contact(properties), None
+            properties = None
+        elif properties is not None and line.strip():
+            previous = [line]
+    if properties is not None:
+        yield number + 1, None, 'Missing END:VCARD'
+
+
+PARSERS: Dict[str, Callable[[AsyncIterator[str | None]], AsyncIterator[Record]]] = {
+    'csv': parse_csv,
+    'ndjson': parse_ndjson,
+    'vcard': parse_vcard,
+}
+
+
+def parser_for(content_type: str | None) -> Callable[[AsyncIterator[str | None]], AsyncIterator[Record]] | None:
+    """
+    Вибір парсера за заголовком Content-Type.
+
+    :param content_type: значення заголовка Content-Type
+    :type content_type: str | None
+    :return: парсер або None, якщо формат не підтримується
+    """
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return PARSERS.get(CONTENT_TYPES.get(media_type))
+
+
+def _csv_writer():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def write(row: Sequence) -> str:
+        writer.writerow(row)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+    return write
+
+
+_json_string = json.encoder.encode_basestring
+
+
+def format_ndjson(row: Sequence) -> str:
+    # the layout is fixed, so only the strings need escaping; this is several times faster than json.dumps
+    id, first_name, last_name, email, birthday, description = row
+    return (f'{{"id": {id}, "first_name": {_json_string(first_name)}, "last_name": {_json_string(last_name)}, '
+            f'"email": {_json_string(email)}, "birthday": "{birthday.isoformat()}", '
+            f'"description": {"null" if description is None else _json_string(description)}}}\n')
+
+
+def _escape_vcard(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace(',', '\\,').replace(';', '\\;')
+
+
+def format_vcard(row: Sequence) -> str:
+    _, first_name, last_name, email, birthday, description = row
+    lines = [
+        'BEGIN:VCARD',
+        'VERSION:3.0',
+        f'N:{_escape_vcard(last_name)};{_escape_vcard(first_name)};;;',
+        f'FN:{_escape_vcard(first_name)} {_escape_vcard(last_name)}',
+        f'EMAIL:{email}',
+        f'BDAY:{birthday.isoformat()}',
+    ]
+    if description:
+        lines.append(f'NOTE:{_escape_vcard(description)}')
+    lines.append('END:VCARD\r\n')
+    return '\r\n'.join(lines)
+
+
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'vcard': 'text/vcard',
+}
+
+
+async def encode_rows(batches: AsyncIterator[Sequence[Sequence]], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Перетворення потоку пакетів контактів у байти вибраного формату, по одному шматку на пакет.
+
+    :param batches: пакети рядків з полями у порядку ``EXPORT_FIELDS``
+    :type batches: AsyncIterator[Sequence[Sequence]]
+    :param fmt: формат - csv, ndjson або vcard
+    :type fmt: str
+    :return: шматки тексту в UTF-8
+    :rtype: AsyncIterator[bytes]
+    """
+    if fmt == 'csv':
+        format_row = _csv_writer()
+        yield format_row(EXPORT_FIELDS).encode()
+    else:
+        format_row = format_ndjson if fmt == 'ndjson' else format_vcard
+    async for rows in batches:
+        yield ''.join(map(format_row, rows)).encode()
@@ -1,13 +1,44 @@
-from pydantic import EmailStr
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
-
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, EmailStr, SecretStr
 
 from src.conf.config import settings
 from src.services.auth import auth_service
 
-conf = ConnectionConfig(
+if TYPE_CHECKING:
+    import aiosmtplib
+    from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+
+class MailConfig(BaseModel):
+    """
+    Налаштування SMTP-сервера та папка шаблонів (поля як у ``fastapi_mail.ConnectionConfig``).
+    """
+    MAIL_USERNAME: str
+    MAIL_PASSWORD: SecretStr
+    MAIL_FROM: str
+    MAIL_PORT: int = 465
+    MAIL_SERVER: str
+    MAIL_FROM_NAME: str | None = None
+    MAIL_STARTTLS: bool = False
+    MAIL_SSL_TLS: bool = True
+    USE_CREDENTIALS: bool = True
+    VALIDATE_CERTS: bool = True
+    TIMEOUT: float = 60
+    SUPPRESS_SEND: bool = False
+    TEMPLATE_FOLDER: Path
+
+
+conf = MailConfig(
     MAIL_USERNAME=settings.mail_username,
     MAIL_PASSWORD=settings.mail_password,
     MAIL_FROM=settings.mail_from,
@@ -19,11 +50,288 @@ conf = ConnectionConfig(
     USE_CREDENTIALS=True,
     VALIDATE_CERTS=True,
     TEMPLATE_FOLDER=Path(__file__).parent / 'templates',
+    SUPPRESS_SEND=settings.mail_suppress_send,
 )
 
+
+def is_permanent(err: Exception) -> bool:
+    """
+    Чи є помилка SMTP остаточною (5xx або відхилені отримувачі), тобто повтор не допоможе.
+
+    :param err: помилка надсилання
+    :type err: Exception
+    :rtype: bool
+    """
+    from aiosmtplib import SMTPRecipientsRefused, SMTPResponseException
+
+    if isinstance(err, SMTPRecipientsRefused):
+        return True
+    return isinstance(err, SMTPResponseException) and err.code >= 500
+
+
+class MailSender:
+    """
+    Довготривалий відправник листів з пулом постійних SMTP-з'єднань і обмеженою чергою.
+
+    ``pool_size`` обробників тримають по одному відкритому з'єднанню і забирають листи з черги
+    пачками до ``batch_size``, тож TLS-рукостискання та логін виконуються один раз на з'єднання,
+    а не на кожен лист. Коли в черзі ``max_queue`` листів, постановка нового листа чекає на
+    вільне місце. Тимчасові помилки (4xx, розрив з'єднання) повторюються до ``max_retries`` разів
+    з експоненційною затримкою, остаточні (5xx) - ні. Скомпільовані шаблони кешуються.
+    aiosmtplib та jinja2 імпортуються при першому листі, а не при імпорті застосунку.
+
+    :param conf: налаштування SMTP-сервера та папка шаблонів
+    :param pool_size: кількість з'єднань (обробників черги)
+    :param max_queue: максимальна кількість листів у черзі
+    :param batch_size: максимальна кількість листів, що надсилаються через з'єднання за раз
+    :param max_retries: кількість повторів при тимчасовій помилці
+    :param retry_backoff: затримка перед першим повтором, с
+    """
+    buckets = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+    def __init__(self, conf: MailConfig, pool_size: int, max_queue: int, batch_size: int,
+                 max_retries: int, retry_backoff: float):
+        self.conf = conf
+        self.pool_size = pool_size
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._templates: 'Environment | None' = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self.reset()
+
+    def reset(self):
+        """
+        Обнулення статистики.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections = 0
+        self.peak_depth = 0
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.latency_sum = 0.0
+
+    def _observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.latency_sum += seconds
+
+    @property
+    def templates(self) -> 'Environment':
+        """
+        Середовище шаблонів jinja2, створюється при першому рендерингу.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: jinja2.Environment
+        """
+        if self._templates is None:
+            from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+            self._templates = Environment(loader=FileSystemLoader(self.conf.TEMPLATE_FOLDER),
+                                          autoescape=select_autoescape(), auto_reload=False)
+        return self._templates
+
+    def render(self, template_name: str, body: dict) -> str:
+        """
+        Рендеринг шаблону листа. Шаблон компілюється один раз і далі береться з кешу Environment.
+
+        :param self: посилання на поточний об'єкт класу
+        :param template_name: назва файлу шаблону
+        :type template_name: str
+        :param body: змінні шаблону
+        :type body: dict
+        :rtype: str
+        """
+        return self.templates.get_template(template_name).render(**body)
+
+    def build(self, recipient: str, subject: str, template_name: str, body: dict) -> EmailMessage:
+        """
+        Створення HTML-листа з шаблону.
+
+        :param self: посилання на поточний об'єкт класу
+        :param recipient: електронна пошта отримувача
+        :type recipient: str
+        :param subject: тема листа
+        :type subject: str
+        :param template_name: назва файлу шаблону
+        :type template_name: str
+        :param body: змінні шаблону
+        :type body: dict
+        :rtype: EmailMessage
+        """
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = formataddr((self.conf.MAIL_FROM_NAME or '', self.conf.MAIL_FROM))
+        message['To'] = recipient
+        message.set_content(self.render(template_name, body), subtype='html')
+        return message
+
+    def _start(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._queue is not None and self._queue.qsize():
+                logger.warning('Mail sender: %s queued messages left on a stopped event loop', self._queue.qsize())
+            self._loop = loop
+            self._queue = asyncio.Queue(self.max_queue)
+            self._workers = [loop.create_task(self._worker(self._queue)) for _ in range(self.pool_size)]
+        return self._queue
+
+    async def send(self, recipient: str, subject: str, template_name: str, body: dict):
+        """
+        Постановка листа в чергу. Якщо черга заповнена, чекає, поки в ній звільниться місце.
+
+        :param self: посилання на поточний об'єкт класу
+        :param recipient: електронна пошта отримувача
+        :type recipient: str
+        :param subject: тема листа
+        :type subject: str
+        :param template_name: назва файлу шаблону
+        :type template_name: str
+        :param body: змінні шаблону
+        :type body: dict
+        """
+        message = self.build(recipient, subject, template_name, body)
+        queue = self._start()
+        await queue.put(message)
+        self.peak_depth = max(self.peak_depth, queue.qsize())
+
+    async def _connect(self) -> 'aiosmtplib.SMTP':
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(hostname=self.conf.MAIL_SERVER, port=self.conf.MAIL_PORT, timeout=self.conf.TIMEOUT,
+                               use_tls=self.conf.MAIL_SSL_TLS, start_tls=self.conf.MAIL_STARTTLS,
+                               validate_certs=self.conf.VALIDATE_CERTS)
+        await smtp.connect()
+        if self.conf.USE_CREDENTIALS:
+            try:
+                await smtp.login(self.conf.MAIL_USERNAME, self.conf.MAIL_PASSWORD.get_secret_value())
+            except BaseException:
+                # the caller never gets the client, so its socket has to be closed here
+                smtp.close()
+                raise
+        self.connections += 1
+        return smtp
+
+    @staticmethod
+    async def _close(smtp: 'aiosmtplib.SMTP | None'):
+        if smtp is None or not smtp.is_connected:
+            return
+        from aiosmtplib import SMTPException
+
+        try:
+            await smtp.quit()
+        except (SMTPException, OSError, asyncio.TimeoutError):
+            smtp.close()
+
+    async def _deliver(self, smtp: 'aiosmtplib.SMTP | None', message: EmailMessage) -> 'aiosmtplib.SMTP | None':
+        from aiosmtplib import SMTPException
+
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._connect()
+                await smtp.send_message(message)
+            except (SMTPException, OSError, asyncio.TimeoutError) as err:
+                if is_permanent(err):
+                    # the client already reset the transaction, the connection stays usable
+                    self.failed += 1
+                    logger.error('Mail to %s rejected: %s', message['To'], err)
+                    return smtp
+                await self._close(smtp)
+                smtp = None
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.error('Mail to %s failed after %s attempts: %s', message['To'], attempt + 1, err)
+                    return None
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+            else:
+                self._observe(time.perf_counter() - start)
+                self.sent += 1
+                return smtp
+        return smtp
+
+    async def _worker(self, queue: asyncio.Queue):
+        smtp = None
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < self.batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                for message in batch:
+                    try:
+                        if not self.conf.SUPPRESS_SEND:
+                            smtp = await self._deliver(smtp, message)
+                    except Exception:
+                        # an unexpected error (e.g. a malformed header) must not stop the worker:
+                        # without workers the queue fills up and send() blocks forever
+                        self.failed += 1
+                        logger.exception('Mail to %s failed', message['To'])
+                        if smtp is not None:
+                            smtp.close()
+                        smtp = None
+                    finally:
+                        queue.task_done()
+        finally:
+            await self._close(smtp)
+
+    async def close(self, timeout: float):
+        """
+        Надсилання листів, що залишились у черзі (не довше ``timeout``), та закриття з'єднань.
+
+        :param self: посилання на поточний об'єкт класу
+        :param timeout: максимальний час очікування, с
+        :type timeout: float
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning('Mail sender: %s messages were not sent before shutdown', self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._loop, self._queue, self._workers = None, None, []
+
+    def stats(self) -> dict:
+        """
+        Глибина черги, лічильники надсилання та гістограма часу надсилання листа.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        histogram, total = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            histogram['+Inf' if bound == float('inf') else str(bound)] = total
+        return {
+            'pool_size': self.pool_size,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'peak_queue_depth': self.peak_depth,
+            'max_queue': self.max_queue,
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'connections': self.connections,
+            'latency_seconds_sum': round(self.latency_sum, 6),
+            'latency_seconds_histogram': histogram,
+        }
+
+
+mail_sender = MailSender(conf, settings.mail_pool_size, settings.mail_queue_size, settings.mail_batch_size,
+                         settings.mail_max_retries, settings.mail_retry_backoff)
+
+
 async def send_email(email: EmailStr, username: str, host: str):
     """
-    Надсилання електронного листа.
+    Постановка листа для підтвердження електронної пошти в чергу надсилання.
 
     :param email: електронна пошта отримувача
     :type email: EmailStr
@@ -32,16 +340,6 @@ async def send_email(email: EmailStr, username: str, host: str):
     :param host: відправник
     :type host: str
     """
-    try:
-        token_verification = auth_service.create_email_token({'sub': email})
-        message = MessageSchema(
-            subject = 'Confirme your email',
-            recipients = [email],
-            template_body = {'host': host, 'username': username, 'token': token_verification},
-            subtype = MessageType.html
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name='email_template.html')
-    except ConnectionErrors as err:
-        print(err)
\ No newline at end of file
+    token_verification = auth_service.create_email_token({'sub': email})
+    await mail_sender.send(email, 'Confirme your email', 'email_template.html',
+                           {'host': host, 'username': username, 'token': token_verification})
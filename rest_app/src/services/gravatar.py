@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import logging
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from fastapi import HTTPException
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.repository import users as repository_users
+from src.services.avatars import LocalStorage, avatar_uploader, resize_avatar
+from src.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def gravatar_url(email: str, **options) -> str:
+    """
+    Посилання на зображення в Gravatar; libgravatar імпортується при першому виклику.
+
+    :param email: електронна пошта
+    :type email: str
+    :rtype: str
+    """
+    from libgravatar import Gravatar
+
+    return Gravatar(email).get_image(**options)
+
+
+def email_key(email: str) -> str:
+    """
+    Ключ кешу - SHA-256 нормалізованої електронної пошти, щоб адреси не зберігались у пам'яті.
+
+    :param email: електронна пошта
+    :type email: str
+    :rtype: str
+    """
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class GravatarResolver:
+    """
+    Пошук зображення юзера в Gravatar. Виконується після реєстрації, поза обробником запиту,
+    і триває не довше ``timeout``. Результат (посилання або його відсутність) кешується
+    за хешем пошти; помилки мережі кешуються на коротший час ``error_ttl``.
+    При локальному сховищі зображення копіюється в нього, щоб не залежати від Gravatar при показі.
+
+    :param timeout: максимальний час звернення до Gravatar, с
+    :param maxsize: максимальна кількість записів кешу
+    :param ttl: час життя запису кешу, с
+    :param error_ttl: час життя запису після помилки, с
+    """
+
+    def __init__(self, timeout: float, maxsize: int, ttl: float, error_ttl: float):
+        self.timeout = timeout
+        self.error_ttl = error_ttl
+        self.cache = TTLCache(maxsize, ttl)
+        self.found = 0
+        self.missing = 0
+        self.errors = 0
+
+    def _download(self, url: str) -> bytes | None:
+        try:
+            with urlopen(Request(url, headers={'User-Agent': 'rest_app'}), timeout=self.timeout) as response:
+                return response.read(settings.avatar_max_bytes)
+        except HTTPError as err:
+            if err.code == 404:
+                return None
+            raise
+
+    async def _store(self, email: str, data: bytes) -> str:
+        storage = avatar_uploader.storage
+        if isinstance(storage, LocalStorage):
+            avatar = await asyncio.to_thread(resize_avatar, data, settings.avatar_size)
+            return await storage.save(f'gravatar/{email_key(email)}', avatar)
+        return gravatar_url(email, size=settings.avatar_size)
+
+    async def resolve(self, email: str) -> str | None:
+        """
+        Посилання на зображення юзера з Gravatar.
+
+        :param self: посилання на поточний об'єкт класу
+        :param email: електронна пошта юзера
+        :type email: str
+        :return: посилання або None, якщо зображення немає чи Gravatar недоступний
+        :rtype: str | None
+        """
+        key = email_key(email)
+        avatar = self.cache.get(key, _MISSING)
+        if avatar is not _MISSING:
+            return avatar
+        url = gravatar_url(email, size=settings.avatar_size, default='404')
+        try:
+            data = await asyncio.wait_for(asyncio.to_thread(self._download, url), self.timeout)
+            avatar = None if data is None else await self._store(email, data)
+        except (asyncio.TimeoutError, URLError, OSError, HTTPException) as err:
+            self.errors += 1
+            logger.warning('Gravatar lookup failed: %r', err)
+            self.cache.set(key, None, self.error_ttl)
+            return None
+        if avatar is None:
+            self.missing += 1
+        else:
+            self.found += 1
+        self.cache.set(key, avatar)
+        return avatar
+
+    def stats(self) -> dict:
+        """
+        Лічильники пошуку зображень у Gravatar.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        return {'found': self.found, 'missing': self.missing, 'errors': self.errors, 'cache': self.cache.stats()}
+
+
+gravatar_resolver = GravatarResolver(settings.gravatar_timeout, settings.gravatar_cache_size,
+                                     settings.gravatar_cache_ttl, settings.gravatar_error_ttl)
+
+
+async def assign_gravatar(user_id: int, email: str):
+    """
+    Фоновий крок після реєстрації: пошук зображення в Gravatar і збереження його юзеру,
+    якщо юзер ще не завантажив власне зображення.
+
+    :param user_id: ID нового юзера
+    :type user_id: int
+    :param email: електронна пошта юзера
+    :type email: str
+    """
+    avatar = await gravatar_resolver.resolve(email)
+    if avatar is None:
+        return
+    async with SessionLocal() as db:
+        await repository_users.assign_avatar(user_id, email, avatar, db)
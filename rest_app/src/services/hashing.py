@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from src.services.metrics import auth_duration
+
+logger = logging.getLogger(__name__)
+
+
+def bcrypt_rounds(hashed_password: str) -> int | None:
+    """
+    Вартість (rounds) з bcrypt-хешу виду ``$2b$12$...``.
+
+    :param hashed_password: хеш пароля
+    :type hashed_password: str
+    :return: вартість хешу або None, якщо це не bcrypt-хеш
+    :rtype: int | None
+    """
+    parts = hashed_password.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """
+    Хешування паролів bcrypt поза циклом подій.
+
+    Обчислення виконуються в обмеженому пулі потоків (bcrypt звільняє GIL), тож одночасно
+    хешується не більше ``workers`` паролів. Якщо в черзі вже ``max_queue`` завдань,
+    нові запити відхиляються з 503, щоб сплеск логінів не накопичував нескінченну чергу.
+
+    :param workers: кількість потоків для хешування
+    :param max_queue: максимальна кількість завдань, що очікують на вільний потік
+    :param rounds: вартість bcrypt для нових хешів
+    """
+
+    def __init__(self, workers: int, max_queue: int, rounds: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self.set_rounds(rounds)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def set_rounds(self, rounds: int):
+        """
+        Зміна вартості bcrypt для нових хешів.
+
+        :param self: посилання на поточний об'єкт класу
+        :param rounds: вартість bcrypt
+        :type rounds: int
+        """
+        self.rounds = rounds
+        self._context = None
+
+    @property
+    def context(self):
+        """
+        Контекст passlib для поточної вартості, створюється при першому хешуванні.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: passlib.context.CryptContext
+        """
+        if self._context is None:
+            from passlib.context import CryptContext
+
+            self._context = CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=self.rounds)
+        return self._context
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    @staticmethod
+    def _timed(func, *args) -> tuple:
+        start = time.perf_counter()
+        return func(*args), time.perf_counter() - start
+
+    async def _run(self, operation: str, func, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Server is busy, try again later')
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+        self.in_flight += 1
+        try:
+            # timed in the worker thread, observed back on the event loop: metrics stay lock-free
+            result, elapsed = await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, func, *args)
+            auth_duration.observe(elapsed, operation)
+            return result
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Отримання хешу пароля.
+
+        :param self: посилання на поточний об'єкт класу
+        :param password: пароль
+        :type password: str
+        :rtype: str
+        """
+        return await self._run('bcrypt_hash', self.context.hash, password)
+
+    def _verify_and_update(self, plain_password: str, hashed_password: str):
+        if not self.context.verify(plain_password, hashed_password):
+            return False, None
+        rounds = bcrypt_rounds(hashed_password)
+        if rounds is not None and rounds < self.rounds:
+            return True, self.context.hash(plain_password)
+        return True, None
+
+    async def verify(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Перевірка пароля. Якщо пароль правильний, а хеш має застарілу (меншу) вартість,
+        повертається новий хеш, який треба зберегти замість старого.
+
+        :param self: посилання на поточний об'єкт класу
+        :param plain_password: пароль
+        :type plain_password: str
+        :param hashed_password: збережений хеш
+        :type hashed_password: str
+        :return: результат перевірки та новий хеш або None
+        :rtype: tuple[bool, str | None]
+        """
+        valid, new_hash = await self._run('bcrypt_verify', self._verify_and_update, plain_password, hashed_password)
+        if new_hash is not None:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def calibrate(self, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+        """
+        Підбір найбільшої вартості bcrypt, при якій хешування триває не довше ``target_ms``.
+        Кожен наступний рівень вартості вдвічі дорожчий, тож достатньо одного заміру.
+        Результат ніколи не менший за ``min_rounds``, навіть якщо хешування з нею довше ``target_ms``.
+
+        :param self: посилання на поточний об'єкт класу
+        :param target_ms: бажана тривалість хешування, мс
+        :type target_ms: float
+        :param min_rounds: мінімально допустима вартість
+        :type min_rounds: int
+        :param max_rounds: максимально допустима вартість
+        :type max_rounds: int
+        :return: обрана вартість
+        :rtype: int
+        """
+        from passlib.context import CryptContext
+
+        context = CryptContext(schemes=['bcrypt'], bcrypt__rounds=min_rounds)
+        context.hash('calibration')
+        start = time.perf_counter()
+        context.hash('calibration')
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        rounds = min_rounds
+        while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+            rounds += 1
+            elapsed_ms *= 2
+        logger.info('bcrypt calibrated: %s rounds, ~%.0f ms per hash', rounds, elapsed_ms)
+        self.set_rounds(rounds)
+        return rounds
+
+    def stats(self) -> dict:
+        """
+        Лічильники пулу хешування.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'max_queue': self.max_queue,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'rehashed': self.rehashed,
+        }
+
+    def shutdown(self):
+        """
+        Зупинка пулу потоків. Пул буде створено знову при наступному хешуванні.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,250 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.services.query_profiler import begin_request, request_db
+from src.services.route_templates import RouteTemplates
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+AUTH_BUCKETS = QUERY_BUCKETS + (2.5,)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence, le: str | None = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """
+    Базовий клас метрики: назва, опис, тип і назви міток.
+    """
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """
+        Рядки значень метрики без заголовків HELP і TYPE.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: Iterable[str]
+        """
+
+    def render(self) -> str:
+        """
+        Метрика у текстовому форматі Prometheus.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: str
+        """
+        header = f'# HELP {self.name} {self.help}\n# TYPE {self.name} {self.type}\n'
+        return header + ''.join(f'{sample}\n' for sample in self.samples())
+
+
+class Histogram(Metric):
+    """
+    Гістограма з фіксованими кошиками, окремо для кожного набору значень міток.
+
+    :param buckets: верхні межі кошиків
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        """
+        Додавання спостереження.
+
+        :param self: посилання на поточний об'єкт класу
+        :param value: значення
+        :type value: float
+        :param labels: значення міток у порядку ``labels``
+        """
+        series = self.series.get(labels)
+        if series is None:
+            # one counter per bucket, then +Inf and the sum
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in list(self.series.items()):
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                total += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                yield f'{self.name}_bucket{_labels(self.labels, labels, le)} {total}'
+            yield f'{self.name}_sum{_labels(self.labels, labels)} {_number(series[-1])}'
+            yield f'{self.name}_count{_labels(self.labels, labels)} {total}'
+
+
+class Gauge(Metric):
+    """
+    Значення, що може зростати і зменшуватись, окремо для кожного набору значень міток.
+    """
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in list(self.values.items()):
+            yield f'{self.name}{_labels(self.labels, labels)} {_number(value)}'
+
+
+class CallbackMetric(Metric):
+    """
+    Метрика без міток, значення якої читається з функції під час збору (наприклад, глибина черги).
+
+    :param func: функція, що повертає поточне значення
+    :param type: тип метрики Prometheus (gauge або counter)
+    """
+
+    def __init__(self, name: str, help: str, func: Callable[[], float], type: str = 'gauge'):
+        super().__init__(name, help)
+        self.func = func
+        self.type = type
+
+    def samples(self) -> Iterable[str]:
+        yield f'{self.name} {_number(self.func())}'
+
+
+class Registry:
+    """
+    Набір метрик у форматі Prometheus, що віддаються на ``/metrics``.
+
+    Метрики живуть у пам'яті процесу і оновлюються лише з циклу подій, тому обходяться без блокувань:
+    спостереження - це пошук кошика (bisect) і два додавання. При кількох воркерах кожен процес
+    віддає власні значення.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Додавання метрики; метрика з тією ж назвою замінюється.
+
+        :param self: посилання на поточний об'єкт класу
+        :param metric: метрика
+        :type metric: Metric
+        :rtype: Metric
+        """
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Усі метрики у текстовому форматі Prometheus.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: str
+        """
+        return ''.join(metric.render() for metric in list(self.metrics.values()))
+
+
+registry = Registry()
+http_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency until the last body chunk is sent.',
+    ('method', 'route', 'status')))
+http_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP requests being handled.', ('method', 'route')))
+request_queries = registry.register(Histogram(
+    'http_request_db_queries', 'Database queries issued while handling one HTTP request.', ('method', 'route'),
+    COUNT_BUCKETS))
+request_db_time = registry.register(Histogram(
+    'http_request_db_seconds', 'Database time spent while handling one HTTP request.', ('method', 'route'),
+    QUERY_BUCKETS))
+query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'Duration of a single database statement.', (), QUERY_BUCKETS))
+auth_duration = registry.register(Histogram(
+    'auth_operation_duration_seconds', 'Time of bcrypt hashing and JWT signing in the auth service.', ('operation',),
+    AUTH_BUCKETS))
+
+
+def observe_query(seconds: float):
+    """
+    Облік виконаного запиту до бази даних у загальній гістограмі. Кількість і час запитів
+    поточного HTTP-запиту рахує журнал ``src.services.query_profiler``.
+
+    :param seconds: тривалість запиту, с
+    :type seconds: float
+    """
+    query_duration.observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware метрик HTTP: затримка за методом, шаблоном маршруту і статусом, кількість
+    запитів в обробці, а також кількість і час запитів до бази даних на один HTTP-запит.
+    Запити, що не відповідають жодному маршруту, мають мітку ``route="unmatched"``,
+    щоб довільні шляхи не створювали нових рядів метрик.
+
+    :param app: ASGI застосунок
+    :param templates: пошук шаблону маршруту
+    """
+
+    def __init__(self, app: ASGIApp, templates: RouteTemplates | None = None):
+        self.app = app
+        self.templates = templates or RouteTemplates()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        method = scope['method']
+        route = self.templates.resolve(scope) or 'unmatched'
+        log, token = begin_request()
+        state = {'status': 500, 'done': False}
+        http_in_flight.inc(method, route)
+        start = time.perf_counter()
+
+        def finish():
+            state['done'] = True
+            http_in_flight.dec(method, route)
+            http_duration.observe(time.perf_counter() - start, method, route, state['status'])
+            request_queries.observe(log.count, method, route)
+            request_db_time.observe(log.seconds, method, route)
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start':
+                state['status'] = message['status']
+            await send(message)
+            if message['type'] == 'http.response.body' and not message.get('more_body', False) and not state['done']:
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not state['done']:
+                finish()
+            if token is not None:
+                request_db.reset(token)
@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, Tuple
+
+
+SORT_KEYS = ('id', 'first_name', 'last_name', 'email', 'birthday')
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """
+    Створення непрозорого курсора пагінації.
+
+    :param sort: поле, за яким відсортовано список
+    :type sort: str
+    :param value: значення поля сортування в останньому контакті сторінки
+    :type value: Any
+    :param last_id: ID останнього контакту сторінки
+    :type last_id: int
+    :return: курсор для наступної сторінки
+    :rtype: str
+    """
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any, int]:
+    """
+    Розшифрування курсора пагінації.
+
+    :param cursor: курсор, отриманий з попередньої сторінки
+    :type cursor: str
+    :return: поле сортування, значення поля та ID останнього контакту
+    :rtype: Tuple[str, Any, int]
+    :raises ValueError: якщо курсор пошкоджений
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort, value, last_id = json.loads(raw)
+        if sort == 'birthday':
+            value = date.fromisoformat(value)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if sort not in SORT_KEYS or not isinstance(last_id, int):
+        raise ValueError('Invalid cursor')
+    return sort, value, last_id
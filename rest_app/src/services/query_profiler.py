@@ -0,0 +1,198 @@
+import logging
+import re
+from contextvars import ContextVar, Token
+from functools import lru_cache
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w$])\d+(?:\.\d+)?\b')
+# bound parameters of every DB-API paramstyle (qmark, numeric, named, format, pyformat),
+# with the type cast asyncpg adds to them: $1::INTEGER
+_PLACEHOLDER = re.compile(r'(?:\?|\$\d+|(?<!:):\w+|%\(\w+\)s|%s)(?:::\w+)?')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+_ROWS = re.compile(r'(\(\?(?:, \?)*\))(?:, \1)+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Нормалізований текст SQL: один пробіл між словами, літерали і параметри замінені на ``?``,
+    списки ``IN (...)`` і кілька рядків ``VALUES`` згорнуті, тож запити, що відрізняються лише
+    значеннями, мають однаковий текст.
+
+    :param statement: текст запиту
+    :type statement: str
+    :rtype: str
+    """
+    sql = _WHITESPACE.sub(' ', statement).strip()
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _ROWS.sub(r'\1, ...', sql)
+
+
+def redact(parameters, executemany: bool = False) -> str:
+    """
+    Параметри запиту для журналу: замість значень (паролі, email, токени) лише їх типи.
+
+    :param parameters: параметри запиту (послідовність або словник)
+    :param executemany: параметри - це список наборів параметрів
+    :type executemany: bool
+    :rtype: str
+    """
+    if executemany:
+        return f'{len(parameters)} x {redact(parameters[0]) if parameters else "()"}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in parameters or ()) + ')'
+
+
+class QueryLog:
+    """
+    Запити до бази даних, виконані під час обробки одного HTTP-запиту: загальна кількість і час,
+    а також кількість і час за кожним нормалізованим текстом запиту.
+    """
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: dict[str, list] = {}
+
+    def add(self, sql: str, seconds: float):
+        """
+        Облік виконаного запиту.
+
+        :param self: посилання на поточний об'єкт класу
+        :param sql: нормалізований текст запиту
+        :type sql: str
+        :param seconds: тривалість запиту, с
+        :type seconds: float
+        """
+        self.count += 1
+        self.seconds += seconds
+        stats = self.statements.get(sql)
+        if stats is None:
+            self.statements[sql] = [1, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+
+    def repeated(self, threshold: int) -> list[tuple[str, int, float]]:
+        """
+        Запити, виконані щонайменше ``threshold`` разів, від найчастішого.
+
+        :param self: посилання на поточний об'єкт класу
+        :param threshold: мінімальна кількість повторів
+        :type threshold: int
+        :return: нормалізований текст, кількість і сумарний час кожного запиту
+        :rtype: list[tuple[str, int, float]]
+        """
+        repeated = [(sql, count, seconds) for sql, (count, seconds) in self.statements.items() if count >= threshold]
+        return sorted(repeated, key=lambda item: -item[1])
+
+
+# queries of the HTTP request being handled; set by the outermost middleware, filled by engine events
+request_db: ContextVar[QueryLog | None] = ContextVar('request_db', default=None)
+
+
+def begin_request() -> tuple[QueryLog, Token | None]:
+    """
+    Журнал запитів поточного HTTP-запиту. Якщо зовнішній middleware вже створив журнал,
+    використовується він, інакше створюється новий.
+
+    :return: журнал і токен для ``request_db.reset`` (None, якщо журнал створено раніше)
+    :rtype: tuple[QueryLog, Token | None]
+    """
+    log = request_db.get()
+    if log is not None:
+        return log, None
+    log = QueryLog()
+    return log, request_db.set(log)
+
+
+class QueryProfiler:
+    """
+    Профілювання запитів до бази даних, викликається подіями рушія (див. ``src.database.db``):
+    облік запиту в журналі поточного HTTP-запиту і журналювання повільних запитів.
+    Значення параметрів у журнал не потрапляють.
+
+    :param slow_seconds: поріг повільного запиту, с (0 - вимкнено)
+    """
+
+    def __init__(self, slow_seconds: float):
+        self.slow_seconds = slow_seconds
+
+    def record(self, statement: str, parameters, seconds: float, executemany: bool = False):
+        """
+        Облік виконаного запиту.
+
+        :param self: посилання на поточний об'єкт класу
+        :param statement: текст запиту
+        :type statement: str
+        :param parameters: параметри запиту
+        :param seconds: тривалість запиту, с
+        :type seconds: float
+        :param executemany: запит виконано для списку наборів параметрів
+        :type executemany: bool
+        """
+        log = request_db.get()
+        if log is not None:
+            log.add(normalize_sql(statement), seconds)
+        if 0 < self.slow_seconds <= seconds:
+            logger.warning('Slow query (%.1f ms): %s; parameters: %s', seconds * 1000, normalize_sql(statement),
+                           redact(parameters, executemany))
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware профілювання запитів до бази даних на HTTP-запит.
+
+    Якщо один і той самий запит (з точністю до значень) виконано щонайменше ``n_plus_one`` разів,
+    у журнал пишеться попередження про можливу проблему N+1 - зазвичай це запит у циклі
+    або ліниве завантаження зв'язку для кожного об'єкта. З ``headers`` відповідь містить
+    заголовки ``X-DB-Queries`` (кількість запитів) і ``Server-Timing`` (час у базі даних, мс).
+
+    :param app: ASGI застосунок
+    :param n_plus_one: поріг повторів одного запиту (0 - вимкнено)
+    :param headers: додавати відладкові заголовки до відповіді
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one: int = 5, headers: bool = False):
+        self.app = app
+        self.n_plus_one = n_plus_one
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        log, token = begin_request()
+
+        async def send_wrapper(message: Message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = list(message.get('headers', ())) + [
+                    (b'x-db-queries', str(log.count).encode()),
+                    (b'server-timing', f'db;dur={log.seconds * 1000:.1f}'.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper if self.headers else send)
+        finally:
+            if self.n_plus_one > 0:
+                repeated = log.repeated(self.n_plus_one)
+                if repeated:
+                    logger.warning('Possible N+1 in %s %s: %s', scope['method'], scope['path'], '; '.join(
+                        f'{count}x ({seconds * 1000:.1f} ms) {sql}' for sql, count, seconds in repeated))
+            if token is not None:
+                request_db.reset(token)
+
+
+query_profiler = QueryProfiler(settings.slow_query_seconds)
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Callable, Dict
+
+from jose import JWSError, JWTError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.conf.config import settings
+from src.services.auth import auth_service
+from src.services.cache import TTLCache
+from src.services.redis_client import get_redis, redis_error
+from src.services.route_templates import RouteTemplates
+
+if TYPE_CHECKING:
+    from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Sliding window counter: the previous fixed window is weighted by the part of it that still
+# overlaps the sliding window. Requests already allowed by the local pre-filter (ARGV[4]) are
+# always added, the current request is added only when it fits into the limit.
+SLIDING_WINDOW = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local pending = tonumber(ARGV[4])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0') + pending
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local used = math.floor(previous * (window - elapsed) / window) + current
+local allowed = 0
+if used < limit then
+    allowed = 1
+    current = current + 1
+    used = used + 1
+end
+if pending > 0 or allowed == 1 then
+    redis.call('SET', KEYS[1], current, 'PX', window * 2)
+end
+return {allowed, limit - used}
+"""
+
+
+class RateLimiter:
+    """
+    Обмеження кількості запитів за ковзним вікном у Redis: одна атомарна перевірка
+    (Lua-скрипт) на запит.
+
+    Перед Redis стоїть локальний запас запитів: після кожної дозволеної перевірки в Redis клієнт
+    отримує ``prefilter`` частку залишку ліміту, яку витрачає без звернення до Redis, а ці запити
+    додаються до лічильника в Redis при наступній перевірці. Після відмови запас порожній до кінця
+    вікна, і кожен запит клієнта перевіряється в Redis. Якщо Redis недоступний, запити дозволяються
+    (fail-open), а наступна спроба звернутися до Redis буде не раніше ніж через ``retry_after``.
+
+    :param redis: функція, що повертає клієнт Redis
+    :param prefilter: частка залишку ліміту, яку можна витратити без звернення до Redis (0 - вимкнено)
+    :param retry_after: пауза після помилки Redis, с
+    :param maxsize: максимальна кількість локальних лічильників
+    """
+
+    def __init__(self, redis: Callable[[], 'aioredis.Redis'], prefilter: float, retry_after: float, maxsize: int = 65536):
+        self.redis = redis
+        self.prefilter = prefilter
+        self.retry_after = retry_after
+        self.buckets = TTLCache(maxsize, float('inf'))
+        self._script = None
+        self._client = None
+        self._down_until = 0.0
+        self.reset()
+
+    def reset(self):
+        """
+        Обнулення статистики та локальних лічильників.
+
+        :param self: посилання на поточний об'єкт класу
+        """
+        self.buckets.clear()
+        self._down_until = 0.0
+        self.local = 0
+        self.remote = 0
+        self.limited = 0
+        self.errors = 0
+        self.failed_open = 0
+
+    def _bucket(self, key: str) -> list | None:
+        if self.prefilter <= 0:
+            return None
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            # local tokens, requests allowed locally and not yet counted in Redis, no tokens until
+            bucket = [0, 0, 0.0]
+            self.buckets.set(key, bucket)
+        return bucket
+
+    def _run_script(self, keys: list, args: list):
+        client = self.redis()
+        if self._script is None or self._client is not client:
+            self._client = client
+            self._script = client.register_script(SLIDING_WINDOW)
+        return self._script(keys=keys, args=args)
+
+    async def hit(self, key: str, limit: int, window: float) -> tuple[bool, float]:
+        """
+        Перевірка та облік запиту.
+
+        :param self: посилання на поточний об'єкт класу
+        :param key: ключ лічильника (маршрут і клієнт)
+        :type key: str
+        :param limit: максимальна кількість запитів за вікно
+        :type limit: int
+        :param window: тривалість вікна, с
+        :type window: float
+        :return: чи дозволено запит та через скільки секунд варто повторити відхилений запит
+        :rtype: tuple[bool, float]
+        """
+        now = time.time()
+        bucket = self._bucket(key)
+        if bucket is not None and bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[1] += 1
+            self.local += 1
+            return True, 0.0
+        if now < self._down_until:
+            self.failed_open += 1
+            return True, 0.0
+        pending = 0
+        if bucket is not None:
+            pending, bucket[1] = bucket[1], 0
+        window_ms = int(window * 1000)
+        now_ms = int(now * 1000)
+        index = now_ms // window_ms
+        try:
+            allowed, remaining = await self._run_script([f'rl:{key}:{index}', f'rl:{key}:{index - 1}'],
+                                                        [limit, window_ms, now_ms % window_ms, pending])
+        except (redis_error(), OSError, RuntimeError, asyncio.TimeoutError) as err:
+            if bucket is not None:
+                bucket[1] += pending
+            self.errors += 1
+            self.failed_open += 1
+            self._down_until = now + self.retry_after
+            logger.warning('Rate limiter: redis unavailable, requests are not limited: %r', err)
+            return True, 0.0
+        self.remote += 1
+        retry_after = (window_ms - now_ms % window_ms) / 1000
+        if bucket is not None:
+            if not allowed:
+                # a client over the limit gets nothing locally until the window resets
+                bucket[0], bucket[2] = 0, now + retry_after
+            elif now >= bucket[2]:
+                bucket[0] = max(0, math.floor(remaining * self.prefilter))
+        if allowed:
+            return True, 0.0
+        self.limited += 1
+        return False, retry_after
+
+    def stats(self) -> dict:
+        """
+        Лічильники перевірок: без Redis, через Redis, відхилені запити та помилки Redis.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        return {
+            'local': self.local,
+            'remote': self.remote,
+            'limited': self.limited,
+            'errors': self.errors,
+            'failed_open': self.failed_open,
+            'buckets': len(self.buckets),
+        }
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware обмеження запитів. Лічильник ведеться окремо для кожного маршруту
+    (метод і шаблон шляху) і кожного клієнта: автентифікованого юзера за ключем доступу
+    або IP-адреси для анонімних запитів.
+
+    :param app: ASGI застосунок
+    :param limiter: обмежувач запитів
+    :param limit: ліміт запитів за вікно за замовчуванням
+    :param window: тривалість вікна, с
+    :param routes: ліміти окремих маршрутів виду ``{'POST /api/auth/login': 10}``, 0 - без обмеження
+    :param identify: функція, що повертає юзера з ключа доступу або None
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter, limit: int, window: float, routes: Dict[str, int],
+                 identify: Callable[[str], str | None]):
+        self.app = app
+        self.limiter = limiter
+        self.limit = limit
+        self.window = window
+        self.routes = routes
+        self.identify = identify
+        self.templates = RouteTemplates()
+
+    def _client(self, scope: Scope) -> str:
+        for name, value in scope['headers']:
+            if name == b'authorization':
+                scheme, _, token = value.decode('latin-1').partition(' ')
+                if scheme.lower() == 'bearer' and token:
+                    user = self.identify(token)
+                    if user is not None:
+                        return f'user:{user}'
+                break
+        client = scope.get('client')
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        route = f"{scope['method']} {self.templates.resolve(scope) or '*'}"
+        limit = self.routes.get(route, self.limit)
+        if limit <= 0:
+            return await self.app(scope, receive, send)
+        allowed, retry_after = await self.limiter.hit(f'{route}:{self._client(scope)}', limit, self.window)
+        if allowed:
+            return await self.app(scope, receive, send)
+        await send({'type': 'http.response.start', 'status': 429, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'retry-after', str(math.ceil(retry_after)).encode()),
+            (b'x-ratelimit-limit', str(limit).encode()),
+        ]})
+        await send({'type': 'http.response.body', 'body': b'{"detail":"Rate limit exceeded. Try again later."}'})
+
+
+def token_subject(token: str) -> str | None:
+    """
+    Юзер (sub) з ключа доступу для ключа лічильника. Недійсні токени не враховуються.
+
+    :param token: ключ доступу
+    :type token: str
+    :rtype: str | None
+    """
+    try:
+        payload = auth_service.decode_token(token)
+    except (JWTError, JWSError):
+        return None
+    return payload.get('sub') if payload.get('scope') == 'access_token' else None
+
+
+rate_limiter = RateLimiter(get_redis, settings.rate_limit_prefilter, settings.rate_limit_retry_after)
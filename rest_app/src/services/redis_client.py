@@ -0,0 +1,58 @@
+from typing import TYPE_CHECKING
+
+from src.conf.config import settings
+
+if TYPE_CHECKING:
+    from redis import asyncio as aioredis
+
+_client: 'aioredis.Redis | None' = None
+
+def redis_error() -> type[Exception]:
+    """
+    Базовий клас помилок Redis для ``except``. Пакет redis імпортується лише тоді, коли помилка
+    вже сталася, тобто коли клієнт Redis існує.
+
+    :rtype: type[Exception]
+    """
+    from redis.exceptions import RedisError
+    return RedisError
+
+def get_redis() -> 'aioredis.Redis':
+    """
+    Спільний асинхронний клієнт Redis, створюється при першому зверненні
+    (або при старті застосунку, див. lifespan у main.py).
+
+    :return: клієнт Redis
+    :rtype: redis.asyncio.Redis
+    """
+    global _client
+    if _client is None:
+        from redis import asyncio as aioredis
+
+        _client = aioredis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=0,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+        )
+    return _client
+
+def set_redis(client: 'aioredis.Redis | None'):
+    """
+    Заміна спільного клієнта Redis (наприклад, на fakeredis у тестах).
+
+    :param client: новий клієнт Redis
+    :type client: redis.asyncio.Redis | None
+    """
+    global _client
+    _client = client
+
+async def close_redis():
+    """
+    Закриття спільного клієнта Redis.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,49 @@
+from operator import attrgetter
+from typing import Any, Sequence
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from src.schemas import CONTACT_FIELDS
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-відповідь, що кодується pydantic-core (Rust) замість json.dumps.
+    Дати та datetime серіалізуються в ISO 8601, як і в JSONResponse після jsonable_encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def contact_rows(contacts: Sequence, fields: Sequence[str] = CONTACT_FIELDS) -> list:
+    """
+    Контакти з бази даних у вигляді словників лише з вибраними полями.
+    Дані вже пройшли перевірку при збереженні, тож повторно моделлю не перевіряються.
+
+    :param contacts: ORM-об'єкти контактів
+    :type contacts: Sequence
+    :param fields: поля у порядку CONTACT_FIELDS
+    :type fields: Sequence[str]
+    :rtype: list
+    """
+    fields = tuple(fields)
+    if len(fields) == 1:
+        field = fields[0]
+        return [{field: getattr(contact, field)} for contact in contacts]
+    getter = attrgetter(*fields)
+    return [dict(zip(fields, getter(contact))) for contact in contacts]
+
+
+def contacts_response(data, fields: Sequence[str] | None = None) -> FastJSONResponse:
+    """
+    Готова відповідь з контактом або списком контактів без повторної перевірки через response_model.
+
+    :param data: контакт або список контактів з бази даних
+    :param fields: поля, які треба повернути, за замовчуванням усі поля ResponseModel
+    :type fields: Sequence[str] | None
+    :rtype: FastJSONResponse
+    """
+    rows = contact_rows(data if isinstance(data, list) else [data], fields or CONTACT_FIELDS)
+    return FastJSONResponse(rows if isinstance(data, list) else rows[0])
@@ -0,0 +1,39 @@
+from starlette.routing import Match
+from starlette.types import Scope
+
+from src.services.cache import TTLCache
+
+_MISSING = object()
+
+
+class RouteTemplates:
+    """
+    Шаблон шляху маршруту, що обробить запит (``/api/contacts/{contact_id}``), ще до маршрутизації.
+    Результат пошуку кешується за методом і шляхом запиту.
+
+    :param maxsize: максимальна кількість запам'ятованих шляхів
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.cache = TTLCache(maxsize, float('inf'))
+
+    def resolve(self, scope: Scope) -> str | None:
+        """
+        Шаблон шляху маршруту для запиту.
+
+        :param self: посилання на поточний об'єкт класу
+        :param scope: ASGI scope запиту
+        :type scope: Scope
+        :return: шаблон шляху або None, якщо запит не відповідає жодному маршруту
+        :rtype: str | None
+        """
+        key = (scope['method'], scope['path'])
+        template = self.cache.get(key, _MISSING)
+        if template is _MISSING:
+            template = None
+            for route in scope['app'].router.routes:
+                if route.matches(scope)[0] == Match.FULL:
+                    template = route.path
+                    break
+            self.cache.set(key, template)
+        return template
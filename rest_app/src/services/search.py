@@ -0,0 +1,115 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from src.conf.config import settings
+from src.services.cache import TTLCache
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize_query(query: str) -> str:
+    """
+    Пошуковий запит у нижньому регістрі з одним пробілом між словами.
+
+    :param query: запит юзера
+    :type query: str
+    :rtype: str
+    """
+    return ' '.join(query.lower().split())
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    """
+    Триграми слова так, як їх рахує pg_trgm: два пробіли на початку, один в кінці.
+
+    :param word: слово в нижньому регістрі
+    :type word: str
+    :rtype: FrozenSet[str]
+    """
+    padded = f'  {word} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class ContactIndex:
+    """
+    Триграмний індекс контактів одного юзера в пам'яті процесу - заміна індексу pg_trgm
+    для баз без нього (SQLite). Слова імені, прізвища, пошти та опису розкладаються на триграми,
+    тож запит знаходить контакти за префіксом слова або з помилками в написанні.
+
+    :param rows: рядки (id, first_name, last_name, email, description)
+    :type rows: Iterable[Tuple]
+    """
+
+    def __init__(self, rows: Iterable[Tuple]):
+        self._names: Dict[int, Tuple[str, ...]] = {}
+        self._contacts: Dict[str, Set[int]] = defaultdict(set)
+        self._words: Dict[str, Set[str]] = defaultdict(set)
+        self._sizes: Dict[str, int] = {}
+        for contact_id, *fields in rows:
+            self._names[contact_id] = tuple(field.lower() for field in fields[:3])
+            for word in _WORD.findall(' '.join(field for field in fields if field).lower()):
+                if word not in self._sizes:
+                    word_trigrams = trigrams(word)
+                    self._sizes[word] = len(word_trigrams)
+                    for trigram in word_trigrams:
+                        self._words[trigram].add(word)
+                self._contacts[word].add(contact_id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _match_word(self, token: str, threshold: float) -> Dict[int, float]:
+        # shared trigrams are counted from the postings, so no word outside them is ever looked at
+        token_trigrams = trigrams(token)
+        shared = Counter()
+        for trigram in token_trigrams:
+            shared.update(self._words.get(trigram, ()))
+        scores: Dict[int, float] = {}
+        for word, count in shared.items():
+            if word.startswith(token):
+                score = 1.0
+            else:
+                score = count / (len(token_trigrams) + self._sizes[word] - count)
+                if score < threshold:
+                    continue
+            for contact_id in self._contacts[word]:
+                if score > scores.get(contact_id, 0.0):
+                    scores[contact_id] = score
+        return scores
+
+    def search(self, query: str, threshold: float) -> List[int]:
+        """
+        Пошук контактів, у яких кожне слово запиту збігається з початком слова
+        або схоже на слово не менше ніж на ``threshold``.
+        Контакти, в яких з запиту починається ім'я, прізвище чи пошта, йдуть першими,
+        далі - за спаданням схожості та за ID.
+
+        :param self: посилання на поточний об'єкт класу
+        :param query: нормалізований запит
+        :type query: str
+        :param threshold: мінімальна схожість слова
+        :type threshold: float
+        :return: ID знайдених контактів у порядку релевантності
+        :rtype: List[int]
+        """
+        tokens = _WORD.findall(query)
+        if not tokens:
+            return []
+        ranks: Dict[int, float] = {}
+        for number, token in enumerate(tokens):
+            scores = self._match_word(token, threshold)
+            if number == 0:
+                ranks = scores
+            else:
+                ranks = {contact_id: rank + scores[contact_id] for contact_id, rank in ranks.items() if contact_id in scores}
+            if not ranks:
+                return []
+        for contact_id in ranks:
+            ranks[contact_id] /= len(tokens)
+            if any(name.startswith(query) for name in self._names[contact_id]):
+                ranks[contact_id] += 1
+        return sorted(ranks, key=lambda contact_id: (-ranks[contact_id], contact_id))
+
+
+search_indexes = TTLCache(settings.search_index_size, settings.search_index_ttl)
@@ -0,0 +1,51 @@
+import hashlib
+import time
+
+from src.conf.config import settings
+from src.services.cache import TTLCache
+
+token_cache = TTLCache(settings.token_cache_size, settings.token_cache_max_ttl)
+
+def token_digest(token: str) -> bytes:
+    """
+    Ключ кешу для ключа доступу - sha256 від токена, сам токен в пам'яті не зберігається.
+
+    :param token: ключ доступу
+    :type token: str
+    :rtype: bytes
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+def get_payload(token: str) -> dict | None:
+    """
+    Вміст уже перевіреного ключа доступу з кешу.
+
+    :param token: ключ доступу
+    :type token: str
+    :return: вміст токена або None
+    :rtype: dict | None
+    """
+    return token_cache.get(token_digest(token))
+
+def store_payload(token: str, payload: dict):
+    """
+    Збереження вмісту перевіреного ключа доступу. Запис живе не довше, ніж сам токен (exp).
+
+    :param token: ключ доступу
+    :type token: str
+    :param payload: вміст токена
+    :type payload: dict
+    """
+    ttl = payload.get('exp', 0) - time.time()
+    if ttl > 0:
+        token_cache.set(token_digest(token), payload, ttl=min(ttl, token_cache.ttl))
+
+def revoke_token(token: str | None):
+    """
+    Видалення відкликаного ключа доступу з кешу.
+
+    :param token: ключ доступу
+    :type token: str | None
+    """
+    if token:
+        token_cache.pop(token_digest(token))
@@ -0,0 +1,138 @@
+import json
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable
+
+from src.conf.config import settings
+from src.database.models import User
+from src.services.cache import TTLCache
+from src.services.redis_client import get_redis, redis_error
+
+if TYPE_CHECKING:
+    from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Кеш автентифікованих юзерів за ключем - електронною поштою з ключа доступу (sub).
+
+    Записи зберігаються в пам'яті процесу та, за бажанням, у Redis, щоб кеш був спільним
+    для всіх воркерів. В режимі Redis локальний запис живе не довше ``local_ttl``,
+    тож інвалідація в одному воркері видна іншим не пізніше ніж через ``local_ttl`` секунд.
+    Кешуються лише публічні поля юзера, пароль та refresh token не кешуються.
+
+    :param maxsize: максимальна кількість записів в пам'яті процесу
+    :param ttl: час життя запису, с
+    :param redis: функція, що повертає клієнт Redis, або None для кешу лише в пам'яті
+    :param local_ttl: час життя локального запису в режимі Redis, с
+    """
+    fields = ('id', 'username', 'email', 'avatar', 'created_at', 'confirmed')
+    prefix = 'user:'
+
+    def __init__(self, maxsize: int, ttl: float, redis: Callable[[], 'aioredis.Redis'] | None = None, local_ttl: float | None = None):
+        self.ttl = ttl
+        self.redis = redis
+        self.local = TTLCache(maxsize, min(ttl, local_ttl) if redis and local_ttl else ttl)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+
+    def _copy(self, user: User) -> User:
+        return User(**{field: getattr(user, field) for field in self.fields})
+
+    def _dumps(self, user: User) -> str:
+        data = {field: getattr(user, field) for field in self.fields}
+        if data['created_at'] is not None:
+            data['created_at'] = data['created_at'].isoformat()
+        return json.dumps(data)
+
+    def _loads(self, raw: bytes) -> User:
+        data = json.loads(raw)
+        if data['created_at'] is not None:
+            data['created_at'] = datetime.fromisoformat(data['created_at'])
+        return User(**data)
+
+    async def get(self, email: str) -> User | None:
+        """
+        Отримання юзера з кешу.
+
+        :param self: посилання на поточний об'єкт класу
+        :param email: електронна пошта юзера
+        :type email: str
+        :return: від'єднана копія юзера або None
+        :rtype: User | None
+        """
+        user = self.local.get(email)
+        if user is not None or self.redis is None:
+            return user
+        try:
+            raw = await self.redis().get(self.prefix + email)
+        except redis_error() as err:
+            self.redis_errors += 1
+            logger.warning('User cache: redis unavailable: %s', err)
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+        self.redis_hits += 1
+        user = self._loads(raw)
+        self.local.set(email, user)
+        return user
+
+    async def set(self, user: User):
+        """
+        Збереження юзера в кеші.
+
+        :param self: посилання на поточний об'єкт класу
+        :param user: юзер з бази даних
+        :type user: User
+        """
+        self.local.set(user.email, self._copy(user))
+        if self.redis is None:
+            return
+        try:
+            await self.redis().set(self.prefix + user.email, self._dumps(user), ex=max(1, int(self.ttl)))
+        except redis_error() as err:
+            self.redis_errors += 1
+            logger.warning('User cache: redis unavailable: %s', err)
+
+    async def invalidate(self, email: str | None):
+        """
+        Видалення юзера з кешу після зміни його даних.
+
+        :param self: посилання на поточний об'єкт класу
+        :param email: електронна пошта юзера
+        :type email: str | None
+        """
+        if email is None:
+            return
+        self.local.pop(email)
+        if self.redis is None:
+            return
+        try:
+            await self.redis().delete(self.prefix + email)
+        except redis_error() as err:
+            self.redis_errors += 1
+            logger.warning('User cache: redis unavailable: %s', err)
+
+    def stats(self) -> dict:
+        """
+        Лічильники влучань та промахів кешу.
+
+        :param self: посилання на поточний об'єкт класу
+        :rtype: dict
+        """
+        data = {'local': self.local.stats()}
+        if self.redis is not None:
+            data['redis'] = {'hits': self.redis_hits, 'misses': self.redis_misses, 'errors': self.redis_errors}
+        return data
+
+
+user_cache = UserCache(
+    settings.user_cache_size,
+    settings.user_cache_ttl,
+    get_redis if settings.user_cache_redis else None,
+    settings.user_cache_local_ttl,
+)
@@ -3,18 +3,25 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from main import app
 from src.database.models import Base
 from src.database.db import get_db
 
 SQLALCHEMY_DATABASE_URL = 'sqlite:///./test.db'
+ASYNC_SQLALCHEMY_DATABASE_URL = 'sqlite+aiosqlite:///./test.db'
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={'check_same_thread': False}
 )
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs every request in its own event loop, so aiosqlite connections must not be pooled
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+AsyncTestSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 @pytest.fixture(scope='module')
 def session():
     Base.metadata.drop_all(bind=engine)
@@ -28,11 +35,9 @@ def session():
 
 @pytest.fixture(scope='module')
 def client(session):
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_db():
+        async with AsyncTestSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
     yield TestClient(app)
@@ -0,0 +1,101 @@
+import asyncio
+import io
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from src.routes import avatars
+from src.services.avatars import LocalStorage, avatar_uploader, resize_avatar
+
+
+def avatar(color=(200, 30, 30)) -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (600, 600), color).save(output, 'PNG')
+    return resize_avatar(output.getvalue(), 250)
+
+
+class TestLocalStorage(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.tmp.name, '/api/avatars', sizes=(32, 128))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_variants_are_generated_once(self):
+        data = avatar()
+        url = await self.storage.save('RestApp/a', data)
+        digest = url.rsplit('/', 1)[1]
+        for size in (32, 128):
+            with Image.open(self.storage.path(digest, size)) as image:
+                self.assertEqual(image.size, (size, size))
+        self.assertEqual(await self.storage.save('RestApp/b', data), url)
+
+    def test_variant_size(self):
+        self.assertEqual([self.storage.variant_size(s) for s in (1, 32, 33, 128, 129)], [32, 32, 128, 128, None])
+
+    async def test_reads_are_served_from_memory(self):
+        digest = (await self.storage.save('RestApp/a', avatar())).rsplit('/', 1)[1]
+        first = await self.storage.read(digest, 32)
+        self.storage.path(digest, 32).unlink()
+        self.assertEqual(await self.storage.read(digest, 32), first)
+        self.assertEqual(self.storage.memory.stats()['hits'], 1)
+
+    async def test_missing_variant_is_created(self):
+        storage = LocalStorage(self.tmp.name, '/api/avatars')
+        digest = (await storage.save('RestApp/a', avatar())).rsplit('/', 1)[1]
+        with Image.open(io.BytesIO(await self.storage.read(digest, 128))) as image:
+            self.assertEqual(image.size, (128, 128))
+        self.assertTrue(self.storage.path(digest, 128).exists())
+
+    def test_concurrent_writes_of_one_file(self):
+        path = self.storage.path('ab' * 32)
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda i: LocalStorage._write(path, bytes([i]) * 1024), range(64)))
+        self.assertEqual(len(path.read_bytes()), 1024)
+        self.assertEqual([p.name for p in path.parent.iterdir()], [path.name])
+
+    async def test_unknown_digest(self):
+        self.assertIsNone(await self.storage.read('0' * 64, 32))
+        self.assertIsNone(await self.storage.read('0' * 64, None))
+
+
+class TestAvatarRoute(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original = avatar_uploader.storage
+        avatar_uploader.storage = LocalStorage(self.tmp.name, '/api/avatars', sizes=(64,))
+        self.url = asyncio.run(avatar_uploader.storage.save('RestApp/a', avatar()))
+        app = FastAPI()
+        app.include_router(avatars.router, prefix='/api')
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        avatar_uploader.storage = self.original
+        self.tmp.cleanup()
+
+    def test_immutable_caching(self):
+        response = self.client.get(self.url, params={'size': 40})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-type'], 'image/jpeg')
+        self.assertIn('immutable', response.headers['cache-control'])
+        with Image.open(io.BytesIO(response.content)) as image:
+            self.assertEqual(image.size, (64, 64))
+        repeat = self.client.get(self.url, params={'size': 40}, headers={'If-None-Match': response.headers['etag']})
+        self.assertEqual((repeat.status_code, repeat.content), (304, b''))
+        self.assertNotEqual(self.client.get(self.url).headers['etag'], response.headers['etag'])
+
+    def test_not_found(self):
+        self.assertEqual(self.client.get('/api/avatars/' + 'f' * 64).status_code, 404)
+        self.assertEqual(self.client.get('/api/avatars/../../etc/passwd').status_code, 404)
+        self.assertEqual(self.client.get('/api/avatars/abc').status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from src.services.avatars import AvatarUploader, LocalStorage, resize_avatar
+
+
+def picture(width: int, height: int, fmt: str = 'PNG') -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(output, fmt)
+    return output.getvalue()
+
+
+def upload_file(data: bytes) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename='avatar.png')
+
+
+class SlowStorage(LocalStorage):
+
+    def __init__(self, root):
+        super().__init__(root, '/static/avatars')
+        self.active = 0
+        self.peak = 0
+
+    async def save(self, name: str, data: bytes) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        return await super().save(name, data)
+
+
+class TestResize(unittest.TestCase):
+
+    def test_square_crop(self):
+        with Image.open(io.BytesIO(resize_avatar(picture(1200, 800), 250))) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (250, 250)))
+
+    def test_large_jpeg_is_smaller(self):
+        data = picture(3000, 3000, 'JPEG')
+        self.assertLess(len(resize_avatar(data, 250)), len(data))
+
+    def test_not_an_image(self):
+        with self.assertRaises(HTTPException) as err:
+            resize_avatar(b'plain text', 250)
+        self.assertEqual(err.exception.status_code, 400)
+
+
+class TestAvatarUploader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = LocalStorage(self.tmp.name, '/static/avatars/')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_upload_to_local_storage(self):
+        uploader = AvatarUploader(self.storage, max_bytes=1024 * 1024, size=250, concurrency=2)
+        url = await uploader.upload(upload_file(picture(800, 600)), 'RestApp/Jhon Doe')
+        digest = url.rsplit('/', 1)[1]
+        self.assertEqual(url, f'/static/avatars/{digest}')
+        with Image.open(self.storage.path(digest)) as image:
+            self.assertEqual(image.size, (250, 250))
+        self.assertEqual(uploader.stats()['uploaded'], 1)
+
+    async def test_size_limit(self):
+        uploader = AvatarUploader(self.storage, max_bytes=1000, size=250, concurrency=2)
+        with self.assertRaises(HTTPException) as err:
+            await uploader.upload(upload_file(b'\0' * 200_000), 'RestApp/user')
+        self.assertEqual(err.exception.status_code, 413)
+        self.assertEqual(uploader.rejected, 1)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+    async def test_concurrency_limit(self):
+        storage = SlowStorage(self.tmp.name)
+        uploader = AvatarUploader(storage, max_bytes=1024 * 1024, size=64, concurrency=2)
+        data = picture(300, 300)
+        await asyncio.gather(*(uploader.upload(upload_file(data), f'RestApp/user{i}') for i in range(6)))
+        self.assertEqual(storage.peak, 2)
+        self.assertEqual(uploader.stats()['in_flight'], 0)
+
+    async def test_loop_is_not_blocked(self):
+        uploader = AvatarUploader(self.storage, max_bytes=10 * 1024 * 1024, size=250, concurrency=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await uploader.upload(upload_file(picture(4000, 4000)), 'RestApp/big')
+        task.cancel()
+        self.assertGreater(ticks, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import import_contacts
+from src.services.contacts_io import iter_lines, parse_csv, parse_ndjson, parse_vcard, parser_for
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def collect(records) -> list:
+    return [record async for record in records]
+
+
+class TestParsers(unittest.IsolatedAsyncioTestCase):
+
+    async def test_iter_lines_splits_across_chunks(self):
+        lines = await collect(iter_lines(chunks(b'first\r\nsec', b'ond\n\xd0', b'\xa6\xd1\x96\n', b'tail')))
+        self.assertEqual(lines, ['first', 'second', 'Ці', 'tail'])
+
+    async def test_iter_lines_drops_overlong_lines(self):
+        lines = await collect(iter_lines(chunks(b'short\n0123', b'456789abc', b'def\nafter\n', b'x' * 20), max_length=10))
+        self.assertEqual(lines, ['short', None, 'after', None])
+
+    async def test_csv_record_length_is_limited(self):
+        body = b'first_name,email\nAnn,"unterminated\n' + b'line\n' * 100
+        records = await collect(parse_csv(iter_lines(chunks(body)), max_length=64))
+        self.assertEqual(records[0], (1, None, 'Record is longer than 64 characters'))
+        self.assertTrue(all(data is None for _, data, _ in records))
+        body = b'first_name,email\n' + b'x' * 100 + b'\nAnn,ann@mail.com\n'
+        records = await collect(parse_csv(iter_lines(chunks(body), max_length=64), max_length=64))
+        self.assertEqual(records, [(1, None, 'Record is longer than 64 characters'),
+                                   (2, {'first_name': 'Ann', 'email': 'ann@mail.com'}, None)])
+
+    async def test_ndjson_overlong_line(self):
+        body = b'{"note": "' + b'x' * 100 + b'"}\n{"first_name": "Ann"}\n'
+        records = await collect(parse_ndjson(iter_lines(chunks(body), max_length=64), max_length=64))
+        self.assertEqual(records, [(1, None, 'Record is longer than 64 characters'), (2, {'first_name': 'Ann'}, None)])
+
+    async def test_vcard_card_length_is_limited(self):
+        body = (b'BEGIN:VCARD\nNOTE:' + b'\n x' * 100 + b'\nEND:VCARD\n'
+                b'BEGIN:VCARD\nFN:Ann\nEND:VCARD\n')
+        records = await collect(parse_vcard(iter_lines(chunks(body)), max_length=64))
+        self.assertEqual(records, [(1, None, 'Record is longer than 64 characters'), (2, {'first_name': 'Ann'}, None)])
+
+    async def test_csv(self):
+        body = (b'first_name,last_name,email,birthday,description\n'
+                b'Vitaliy,Yevchu,evciu97@gmail.com,1997-06-19,"multi\nline, note"\n'
+                b'only,two\n')
+        records = await collect(parse_csv(iter_lines(chunks(body))))
+        self.assertEqual(records[0], (1, {'first_name': 'Vitaliy', 'last_name': 'Yevchu', 'email': 'evciu97@gmail.com',
+                                          'birthday': '1997-06-19', 'description': 'multi\nline, note'}, None))
+        self.assertEqual(records[1][0], 2)
+        self.assertIsNone(records[1][1])
+        self.assertIn('columns', records[1][2])
+
+    async def test_ndjson(self):
+        body = b'{"first_name": "Vitaliy"}\n\nnot json\n[1]\n'
+        records = await collect(parse_ndjson(iter_lines(chunks(body))))
+        self.assertEqual(records[0], (1, {'first_name': 'Vitaliy'}, None))
+        self.assertIn('Invalid JSON', records[1][2])
+        self.assertEqual(records[2][2], 'Expected a JSON object')
+
+    async def test_vcard(self):
+        body = (b'BEGIN:VCARD\nVERSION:3.0\nN:Yevchu;Vitaliy;;;\nFN:Vitaliy Yevchu\n'
+                b'EMAIL;TYPE=INTERNET:evciu97@gmail.com\nBDAY:19970619\nNOTE:long\n  note\\, folded\nEND:VCARD\n'
+                b'BEGIN:VCARD\nFN:Broken\n')
+        records = await collect(parse_vcard(iter_lines(chunks(body))))
+        self.assertEqual(records[0], (1, {'first_name': 'Vitaliy', 'last_name': 'Yevchu', 'email': 'evciu97@gmail.com',
+                                          'birthday': '1997-06-19', 'description': 'long note, folded'}, None))
+        self.assertEqual(records[1], (2, None, 'Missing END:VCARD'))
+
+    def test_parser_for(self):
+        self.assertIs(parser_for('text/csv; charset=utf-8'), parse_csv)
+        self.assertIs(parser_for('application/x-ndjson'), parse_ndjson)
+        self.assertIs(parser_for('text/vcard'), parse_vcard)
+        self.assertIsNone(parser_for('application/json'))
+        self.assertIsNone(parser_for(None))
+
+
+class TestImportContacts(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'import.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.user = User(email='owner@mail.com', password='x')
+            db.add(self.user)
+            await db.flush()
+            db.add(Contact(first_name='a', last_name='b', email='taken@mail.com', birthday=date(1990, 1, 1), user_id=self.user.id))
+            await db.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_import_reports_rows_and_saves_valid_contacts(self):
+        body = (b'first_name,last_name,email,birthday\n'
+                b'Ann,Lee,ann@mail.com,1990-06-19\n'
+                b'Bob,Ray,taken@mail.com,1991-01-01\n'
+                b'Cid,Moe,not-an-email,1992-01-01\n'
+                b'Dan,Poe,ann@mail.com,1993-01-01\n'
+                b'Eve,Kim,eve@mail.com,1994-12-31\n')
+        async with self.SessionLocal() as db:
+            report = await import_contacts(parse_csv(iter_lines(chunks(body))), self.user, db, batch_size=2)
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(report['failed'], 3)
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3, 4])
+        self.assertTrue(report['errors'][0]['error'].startswith('email: Contact with this email already exists'))
+        self.assertTrue(report['errors'][1]['error'].startswith('email:'))
+        async with self.SessionLocal() as db:
+            contacts = (await db.execute(select(Contact).where(Contact.email.in_(['ann@mail.com', 'eve@mail.com'])))).scalars().all()
+        self.assertEqual({(c.email, c.birthday_md, c.user_id) for c in contacts},
+                         {('ann@mail.com', 619, self.user.id), ('eve@mail.com', 1231, self.user.id)})
+        self.assertTrue(all(c.created_at is not None for c in contacts))
+
+    async def test_error_report_is_capped(self):
+        body = b'\n'.join(b'{"first_name": "x"}' for _ in range(10))
+        async with self.SessionLocal() as db:
+            report = await import_contacts(parse_ndjson(iter_lines(chunks(body))), self.user, db, max_errors=3)
+        self.assertEqual(report['failed'], 10)
+        self.assertEqual(len(report['errors']), 3)
+
+    async def test_import_many_rows(self):
+        n = int(os.environ.get('BULK_IMPORT_ROWS', 5000))
+
+        async def body():
+            yield b'first_name,last_name,email,birthday\n'
+            for start in range(0, n, 1000):
+                yield ''.join(f'n{i},s{i},c{i}@mail.com,1990-01-{i % 28 + 1:02d}\n' for i in range(start, min(start + 1000, n))).encode()
+
+        started = time.perf_counter()
+        async with self.SessionLocal() as db:
+            report = await import_contacts(parse_csv(iter_lines(body())), self.user, db)
+            count = (await db.execute(select(func.count()).select_from(Contact))).scalar()
+        self.assertEqual(report, {'imported': n, 'failed': 0, 'errors': []})
+        self.assertEqual(count, n + 1)
+        self.assertLess(time.perf_counter() - started, max(10, n / 5000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.db import get_db
+from src.database.models import Base, Contact, User
+from src.routes import contacts
+from src.schemas import ContactModel
+from src.services.auth import auth_service
+from src.services.conditional import contacts_etag, etag_matches, not_modified, validator_headers
+
+
+class TestValidators(unittest.TestCase):
+
+    def test_weak_comparison(self):
+        etag = contacts_etag(1, 5)
+        self.assertEqual(etag, 'W/"1-5"')
+        self.assertTrue(etag_matches('W/"1-5"', etag))
+        self.assertTrue(etag_matches('"1-5"', etag))
+        self.assertTrue(etag_matches('W/"1-4", W/"1-5"', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('W/"1-4"', etag))
+
+    def test_last_modified(self):
+        headers = validator_headers('W/"1-1"', datetime(2025, 6, 19, 10, 30, 15, 500))
+        self.assertEqual(headers['Last-Modified'], 'Thu, 19 Jun 2025 10:30:15 GMT')
+        self.assertNotIn('Last-Modified', validator_headers('W/"1-0"', None))
+
+    def test_if_modified_since(self):
+        modified_at = datetime(2025, 6, 19, 10, 30, 15, 500)
+        self.assertTrue(not_modified({'if-modified-since': 'Thu, 19 Jun 2025 10:30:15 GMT'}, 'W/"1-1"', modified_at))
+        self.assertFalse(not_modified({'if-modified-since': 'Thu, 19 Jun 2025 10:30:14 GMT'}, 'W/"1-1"', modified_at))
+        self.assertFalse(not_modified({'if-modified-since': 'garbage'}, 'W/"1-1"', modified_at))
+
+    def test_if_none_match_wins(self):
+        headers = {'if-none-match': 'W/"1-0"', 'if-modified-since': 'Thu, 19 Jun 2025 10:30:15 GMT'}
+        self.assertFalse(not_modified(headers, 'W/"1-1"', datetime(2025, 6, 19)))
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'conditional.db')
+        self.engine = create_engine('sqlite:///' + path)
+        Base.metadata.create_all(self.engine)
+        with Session(self.engine, expire_on_commit=False) as db:
+            self.user = User(email='owner@mail.com', password='x')
+            db.add(self.user)
+            db.flush()
+            db.add(Contact(first_name='Vitaliy', last_name='Yevchu', email='evciu97@gmail.com', birthday=date(1997, 6, 19),
+                           user_id=self.user.id))
+            db.commit()
+            db.expunge(self.user)
+        self.async_engine = create_async_engine('sqlite+aiosqlite:///' + path, poolclass=NullPool)
+        self.SessionLocal = async_sessionmaker(self.async_engine, class_=AsyncSession, expire_on_commit=False)
+        self.statements = []
+        event.listen(self.async_engine.sync_engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+        async def override_get_db():
+            async with self.SessionLocal() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(contacts.router, prefix='/api')
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[auth_service.get_current_user] = lambda: self.user
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def contact_reads(self) -> list:
+        return [statement for statement in self.statements if 'FROM contacts' in statement]
+
+    def test_not_modified_without_contact_reads(self):
+        first = self.client.get('/api/contacts/')
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['etag']
+        self.assertEqual(first.headers['cache-control'], 'private, no-cache')
+        self.statements.clear()
+        second = self.client.get('/api/contacts/', headers={'If-None-Match': etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['etag'], etag)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(self.contact_reads(), [])
+
+    def test_lookup_routes(self):
+        for url in ('/api/contacts/firts_name/Vitaliy', '/api/contacts/email/evciu97@gmail.com', '/api/contacts/search?q=yev'):
+            etag = self.client.get(url).headers['etag']
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304, url)
+
+    def test_writes_change_etag(self):
+        etag = self.client.get('/api/contacts/').headers['etag']
+        body = {'first_name': 'Ann', 'last_name': 'Lee', 'email': 'ann@mail.com', 'birthday': '1990-02-28'}
+        created = self.client.post('/api/contacts/', json=body).json()
+        response = self.client.get('/api/contacts/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertIn('last-modified', response.headers)
+
+        etag = response.headers['etag']
+        self.client.put(f"/api/contacts/{created['id']}", json={**body, 'last_name': 'Leigh'})
+        response = self.client.get('/api/contacts/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response.headers['etag']
+        self.client.delete(f"/api/contacts/{created['id']}")
+        self.assertEqual(self.client.get('/api/contacts/', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_failed_update_keeps_etag(self):
+        etag = self.client.get('/api/contacts/').headers['etag']
+        body = ContactModel(first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28))
+        self.assertEqual(self.client.put('/api/contacts/999', json=body.model_dump(mode='json')).status_code, 404)
+        self.assertEqual(self.client.get('/api/contacts/', headers={'If-None-Match': etag}).status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
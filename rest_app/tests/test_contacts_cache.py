@@ -0,0 +1,175 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import (create_contact, delete_contact, get_contacts, get_contact_by_email, get_contacts_version,
+                                     upcoming_birthday)
+from src.schemas import ContactModel
+from src.services.contacts_cache import ContactsCache, contacts_cache, decode_contacts, encode_contacts
+
+
+class TestCodec(unittest.TestCase):
+
+    contacts = [
+        Contact(id=1, first_name='Віталій', last_name='Yevchu', email='evciu97@gmail.com', birthday=date(1997, 6, 19),
+                description='line\nbreak'),
+        Contact(id=2**40, first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28), description=None),
+    ]
+
+    def test_round_trip(self):
+        decoded = decode_contacts(encode_contacts(self.contacts))
+        for contact, original in zip(decoded, self.contacts):
+            for field in ('id', 'first_name', 'last_name', 'email', 'birthday', 'description'):
+                self.assertEqual(getattr(contact, field), getattr(original, field))
+        self.assertEqual(decoded[0].birthday_md, 619)
+
+    def test_subset_of_fields(self):
+        decoded = decode_contacts(encode_contacts(self.contacts, ('id', 'email')))
+        self.assertEqual([(c.id, c.email, c.first_name) for c in decoded], [(1, 'evciu97@gmail.com', None), (2**40, 'ann@mail.com', None)])
+
+    def test_empty(self):
+        self.assertEqual(decode_contacts(encode_contacts([])), [])
+
+    def test_compact(self):
+        self.assertLess(len(encode_contacts(self.contacts)), 130)
+
+
+class TestContactsCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = FakeAsyncRedis()
+        self.cache = ContactsCache(ttl=60, redis=lambda: self.redis)
+        self.loads = 0
+
+    async def load(self):
+        self.loads += 1
+        return [Contact(id=1, first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28))]
+
+    async def test_read_through(self):
+        first = await self.cache.fetch(1, 0, ('contacts', 0, 10), ('id', 'first_name', 'last_name', 'email', 'birthday', 'description'), self.load)
+        second = await self.cache.fetch(1, 0, ('contacts', 0, 10), ('id', 'first_name', 'last_name', 'email', 'birthday', 'description'), self.load)
+        self.assertEqual(self.loads, 1)
+        self.assertEqual(second[0].email, first[0].email)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 1, 0.5))
+        self.assertEqual(stats['latency_seconds_histogram']['+Inf'], 2)
+        self.assertGreater(await self.redis.ttl(next(iter(await self.redis.keys('contacts:1:0:*')))), 0)
+
+    async def test_version_separates_entries(self):
+        await self.cache.fetch(1, 0, ('contacts',), ('id',), self.load)
+        await self.cache.fetch(2, 0, ('contacts',), ('id',), self.load)
+        await self.cache.fetch(1, 1, ('contacts',), ('id',), self.load)
+        await self.cache.fetch(2, 0, ('contacts',), ('id',), self.load)
+        self.assertEqual(self.loads, 3)
+
+    async def test_redis_unavailable(self):
+        redis = MagicMock()
+        redis.get.side_effect = ConnectionError()
+        cache = ContactsCache(ttl=60, redis=lambda: redis)
+        self.assertEqual(len(await cache.fetch(1, 0, ('contacts',), ('id',), self.load)), 1)
+        self.assertEqual(cache.stats()['errors'], 1)
+
+    async def test_unreadable_entry_is_a_miss(self):
+        fields = ('id', 'first_name', 'last_name', 'email', 'birthday', 'description')
+        await self.cache.fetch(1, 0, ('contacts',), fields, self.load)
+        key = next(iter(await self.redis.keys('contacts:1:0:*')))
+        raw = await self.redis.get(key)
+        for damaged in (raw[:-3], raw[:4], bytes([99]) + raw[1:]):
+            await self.redis.set(key, damaged)
+            with self.assertLogs('src.services.contacts_cache', 'WARNING'):
+                contacts = await self.cache.fetch(1, 0, ('contacts',), fields, self.load)
+            self.assertEqual(contacts[0].email, 'ann@mail.com')
+            self.assertEqual(await self.redis.get(key), raw)
+        self.assertEqual(self.loads, 4)
+        self.assertEqual(self.cache.stats()['errors'], 3)
+
+    async def test_disabled(self):
+        cache = ContactsCache(ttl=60)
+        await cache.fetch(1, 0, ('contacts',), ('id',), self.load)
+        await cache.fetch(1, 0, ('contacts',), ('id',), self.load)
+        self.assertEqual(self.loads, 2)
+        self.assertFalse(cache.stats()['enabled'])
+
+
+class TestRepositoryCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.redis = FakeAsyncRedis()
+        contacts_cache.redis = lambda: self.redis
+        contacts_cache.reset()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'cache.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.user = User(email='owner@mail.com', password='x')
+            db.add(self.user)
+            await db.commit()
+        self.contact_reads = 0
+        event.listen(self.engine.sync_engine, 'before_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, *args):
+        if statement.startswith('SELECT') and 'FROM contacts' in statement:
+            self.contact_reads += 1
+
+    async def asyncTearDown(self):
+        contacts_cache.redis = None
+        contacts_cache.reset()
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_reads_are_cached_until_a_write(self):
+        body = ContactModel(first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28))
+        async with self.SessionLocal() as db:
+            contact = await create_contact(body, self.user, db)
+            reads = self.contact_reads
+            for _ in range(2):
+                self.assertEqual([c.email for c in await get_contacts(0, 10, self.user, db)], ['ann@mail.com'])
+                self.assertEqual((await get_contact_by_email('ann@mail.com', self.user, db)).id, contact.id)
+                self.assertIsNone(await get_contact_by_email('none@mail.com', self.user, db))
+                self.assertEqual(len(await upcoming_birthday(self.user, db, 7, date(2025, 2, 25))), 1)
+            self.assertEqual(self.contact_reads, reads + 4)
+
+            await delete_contact(contact.id, self.user, db)
+            reads = self.contact_reads
+            self.assertEqual(await get_contacts(0, 10, self.user, db), [])
+            self.assertEqual(self.contact_reads, reads + 1)
+        self.assertEqual(contacts_cache.stats()['hits'], 4)
+
+    async def test_projection_keeps_sort_column(self):
+        body = ContactModel(first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28))
+        async with self.SessionLocal() as db:
+            await create_contact(body, self.user, db)
+            await get_contacts(0, 10, self.user, db, 'last_name', ('first_name',))
+            cached = await get_contacts(0, 10, self.user, db, 'last_name', ('first_name',))
+        self.assertEqual((cached[0].first_name, cached[0].last_name, cached[0].email), ('Ann', 'Lee', None))
+
+    async def test_write_without_invalidation(self):
+        # a read between the commit and the post-commit hook, or a failed hook, must not see the old page
+        body = ContactModel(first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28))
+        async with self.SessionLocal() as db:
+            contact = await create_contact(body, self.user, db)
+        async with self.SessionLocal() as db:
+            self.assertEqual(len(await get_contacts(0, 10, self.user, db)), 1)
+        with patch('src.repository.contacts._contacts_changed', AsyncMock(side_effect=ConnectionError())):
+            async with self.SessionLocal() as db:
+                with self.assertRaises(ConnectionError):
+                    await delete_contact(contact.id, self.user, db)
+        async with self.SessionLocal() as db:
+            version, _ = await get_contacts_version(self.user, db)
+            self.assertEqual(await get_contacts(0, 10, self.user, db), [])
+        self.assertTrue(await self.redis.keys(f'contacts:{self.user.id}:{version - 1}:*'))
+        self.assertEqual(len(await self.redis.keys(f'contacts:{self.user.id}:{version}:*')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
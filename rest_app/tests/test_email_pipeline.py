@@ -0,0 +1,199 @@
+import asyncio
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from aiosmtplib import SMTPAuthenticationError
+from pydantic import SecretStr
+
+from src.services.email import MailConfig, MailSender
+
+
+class SMTPStandIn:
+    """
+    Мінімальний SMTP-сервер на asyncio для тестів: приймає листи без TLS та автентифікації.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.fail_data = 0
+        self.rejected = set()
+        self.disconnect_after_data = False
+        self.open_connections = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self.open_connections += 1
+
+        async def reply(line: str):
+            writer.write(line.encode() + b'\r\n')
+            await writer.drain()
+
+        await reply('220 localhost ESMTP')
+        try:
+            while line := await reader.readline():
+                command = line.decode().strip().upper()
+                if command.startswith('EHLO'):
+                    await reply('250-localhost\r\n250-AUTH PLAIN\r\n250 8BITMIME')
+                elif command.startswith('AUTH'):
+                    await reply('535 Authentication credentials invalid')
+                elif command.startswith('RCPT'):
+                    address = line.decode().split('<', 1)[1].split('>', 1)[0]
+                    await reply('550 No such user' if address in self.rejected else '250 OK')
+                elif command == 'DATA':
+                    await reply('354 End data with <CR><LF>.<CR><LF>')
+                    data = await reader.readuntil(b'\r\n.\r\n')
+                    await self.gate.wait()
+                    if self.fail_data:
+                        self.fail_data -= 1
+                        await reply('451 Try again later')
+                        continue
+                    self.messages.append(data.decode())
+                    await reply('250 Queued')
+                    if self.disconnect_after_data:
+                        break
+                elif command == 'QUIT':
+                    await reply('221 Bye')
+                    break
+                else:
+                    await reply('250 OK')
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+
+class TestMailSender(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = SMTPStandIn()
+        port = await self.server.start()
+        self.conf = MailConfig(
+            MAIL_USERNAME='', MAIL_PASSWORD='', MAIL_FROM='noreply@mail.com', MAIL_PORT=port, MAIL_SERVER='127.0.0.1',
+            MAIL_FROM_NAME='Contacts', MAIL_STARTTLS=False, MAIL_SSL_TLS=False, USE_CREDENTIALS=False,
+            VALIDATE_CERTS=False, TEMPLATE_FOLDER=Path(__file__).parent.parent / 'src' / 'services' / 'templates',
+        )
+
+    async def asyncTearDown(self):
+        await self.server.stop()
+
+    def sender(self, **options) -> MailSender:
+        params = {'pool_size': 2, 'max_queue': 100, 'batch_size': 10, 'max_retries': 2, 'retry_backoff': 0.01}
+        return MailSender(self.conf, **{**params, **options})
+
+    async def send(self, sender: MailSender, recipient: str = 'ann@mail.com'):
+        await sender.send(recipient, 'Confirm your email', 'email_template.html',
+                          {'host': 'http://test/', 'username': 'Ann', 'token': 'abc'})
+
+    async def test_connections_are_reused(self):
+        sender = self.sender()
+        for number in range(20):
+            await self.send(sender, f'user{number}@mail.com')
+        await sender.close(5)
+        self.assertEqual(len(self.server.messages), 20)
+        self.assertLessEqual(self.server.connections, 2)
+        stats = sender.stats()
+        self.assertEqual((stats['sent'], stats['failed'], stats['queue_depth']), (20, 0, 0))
+        self.assertEqual(stats['latency_seconds_histogram']['+Inf'], 20)
+
+    async def test_template_is_rendered_and_cached(self):
+        sender = self.sender()
+        self.assertIs(sender.templates.get_template('email_template.html'),
+                      sender.templates.get_template('email_template.html'))
+        await self.send(sender)
+        await sender.close(5)
+        self.assertIn('http://test/api/auth/confirmed_email/abc', self.server.messages[0])
+        self.assertIn('Hi Ann', self.server.messages[0])
+
+    async def test_transient_failure_is_retried(self):
+        self.server.fail_data = 2
+        sender = self.sender(pool_size=1)
+        await self.send(sender)
+        await sender.close(5)
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual((sender.sent, sender.failed, sender.retries), (1, 0, 2))
+
+    async def test_retries_are_limited(self):
+        self.server.fail_data = 10
+        sender = self.sender(pool_size=1)
+        await self.send(sender)
+        await sender.close(5)
+        self.assertEqual((sender.sent, sender.failed, sender.retries), (0, 1, 2))
+
+    async def test_permanent_failure_is_not_retried(self):
+        self.server.rejected.add('gone@mail.com')
+        sender = self.sender(pool_size=1)
+        await self.send(sender, 'gone@mail.com')
+        await self.send(sender)
+        await sender.close(5)
+        self.assertEqual((sender.sent, sender.failed, sender.retries), (1, 1, 0))
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_reconnects_after_disconnect(self):
+        self.server.disconnect_after_data = True
+        sender = self.sender(pool_size=1)
+        for _ in range(3):
+            await self.send(sender)
+        await sender.close(5)
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(sender.failed, 0)
+
+    async def test_backpressure(self):
+        self.server.gate.clear()
+        sender = self.sender(pool_size=1, max_queue=2, batch_size=1)
+        for _ in range(3):
+            await self.send(sender)
+        await asyncio.sleep(0.05)
+        blocked = asyncio.create_task(self.send(sender))
+        await asyncio.sleep(0.05)
+        self.assertFalse(blocked.done())
+        self.assertEqual(sender.stats()['queue_depth'], 2)
+        self.server.gate.set()
+        await blocked
+        await sender.close(5)
+        self.assertEqual(len(self.server.messages), 4)
+        self.assertEqual(sender.stats()['peak_queue_depth'], 2)
+
+    async def test_worker_survives_unexpected_error(self):
+        sender = self.sender(pool_size=1)
+        deliver = sender._deliver
+
+        async def fail_broken(smtp, message):
+            if message['To'] == 'broken@mail.com':
+                raise ValueError('bad header')
+            return await deliver(smtp, message)
+
+        with patch.object(sender, '_deliver', side_effect=fail_broken):
+            with self.assertLogs('src.services.email', 'ERROR'):
+                await self.send(sender, 'broken@mail.com')
+                await asyncio.wait_for(sender._queue.join(), 5)
+            await self.send(sender)
+            await sender.close(5)
+        self.assertEqual((sender.sent, sender.failed), (1, 1))
+        self.assertEqual(len(self.server.messages), 1)
+
+    async def test_failed_login_closes_connection(self):
+        self.conf = self.conf.model_copy(update={'USE_CREDENTIALS': True, 'MAIL_USERNAME': 'u',
+                                                 'MAIL_PASSWORD': SecretStr('p')})
+        sender = self.sender()
+        with self.assertRaises(SMTPAuthenticationError):
+            await sender._connect()
+        for _ in range(100):
+            if not self.server.open_connections:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.server.open_connections, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, User
+from src.repository.contacts import stream_contacts
+from src.services.contacts_io import encode_rows, iter_lines, parse_csv, parse_ndjson, parse_vcard
+
+EXPORT_ROWS = int(os.environ.get('EXPORT_ROWS', 1_000_000))
+MEMORY_CEILING = 32 * 1024 * 1024
+
+
+def resident_memory() -> int:
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+async def rows_of(*rows):
+    for row in rows:
+        yield row
+
+
+async def chunks_of(data: bytes):
+    yield data
+
+
+class TestEncodeRows(unittest.IsolatedAsyncioTestCase):
+
+    rows = (
+        (1, 'Vitaliy', 'Yevchu, Jr;', 'evciu97@gmail.com', date(1997, 6, 19), 'line\nbreak, "quoted"; \\slash'),
+        (2, 'Ann', 'Lee', 'ann@mail.com', date(1990, 2, 28), None),
+    )
+
+    async def test_exports_are_read_back_by_import_parsers(self):
+        for fmt, parser in (('csv', parse_csv), ('ndjson', parse_ndjson), ('vcard', parse_vcard)):
+            data = b''.join([chunk async for chunk in encode_rows(rows_of(self.rows[:1], self.rows[1:]), fmt)])
+            records = [record async for record in parser(iter_lines(chunks_of(data)))]
+            self.assertEqual(len(records), 2, fmt)
+            for (number, record, error), row in zip(records, self.rows):
+                self.assertIsNone(error, fmt)
+                self.assertEqual((record['first_name'], record['last_name'], record['email'], record['birthday']),
+                                 (row[1], row[2], row[3], row[4].isoformat()), fmt)
+                self.assertEqual(record.get('description'), row[5], fmt)
+
+
+class TestStreamContacts(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'export.db')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + self.path)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        with sqlite3.connect(self.path) as conn:
+            if conn.execute('SELECT count(*) FROM contacts').fetchone()[0] == 0:
+                conn.execute("INSERT INTO users (id, email, password) VALUES (1, 'owner@mail.com', 'x'), (2, 'other@mail.com', 'x')")
+                conn.execute(
+                    'WITH RECURSIVE seq(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM seq WHERE i < ?) '
+                    'INSERT INTO contacts (first_name, last_name, email, birthday, birthday_md, description, user_id) '
+                    "SELECT 'n' || i, 's' || i, 'c' || i || '@mail.com', '1990-01-01', 101, "
+                    "CASE WHEN i % 2 THEN 'note' END, CASE WHEN i THEN 1 ELSE 2 END FROM seq",
+                    (EXPORT_ROWS,),
+                )
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    @unittest.skipUnless(os.path.exists('/proc/self/statm'), 'needs /proc to read resident memory')
+    async def test_export_keeps_memory_flat(self):
+        exported, size = 0, 0
+        baseline = peak = resident_memory()
+        async with self.SessionLocal() as db:
+            async for chunk in encode_rows(stream_contacts(User(id=1), db), 'ndjson'):
+                exported += chunk.count(b'\n')
+                size += len(chunk)
+                peak = max(peak, resident_memory())
+        self.assertEqual(exported, EXPORT_ROWS)
+        self.assertLess(peak - baseline, MEMORY_CEILING, f'grew by {peak - baseline} bytes while exporting {size} bytes')
+
+    async def test_export_only_returns_own_contacts(self):
+        async with self.SessionLocal() as db:
+            batches = [batch async for batch in stream_contacts(User(id=2), db)]
+        self.assertEqual([row.email for batch in batches for row in batch], ['c0@mail.com'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, User
+from src.services.avatars import LocalStorage, avatar_uploader
+from src.services.gravatar import GravatarResolver, assign_gravatar, email_key, gravatar_resolver
+
+
+def picture() -> bytes:
+    output = io.BytesIO()
+    Image.new('RGB', (80, 80), (10, 120, 200)).save(output, 'PNG')
+    return output.getvalue()
+
+
+class TestGravatarResolver(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original = avatar_uploader.storage
+        avatar_uploader.storage = LocalStorage(self.tmp.name, '/api/avatars')
+        self.resolver = GravatarResolver(timeout=0.2, maxsize=10, ttl=60, error_ttl=60)
+        self.downloads = []
+
+    def tearDown(self):
+        avatar_uploader.storage = self.original
+        self.tmp.cleanup()
+
+    def download(self, result):
+        def fetch(url):
+            self.downloads.append(url)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fetch
+
+    async def test_found_is_stored_locally_and_cached(self):
+        with patch.object(self.resolver, '_download', self.download(picture())):
+            avatar = await self.resolver.resolve('Ann@Mail.com ')
+            self.assertEqual(await self.resolver.resolve('ann@mail.com'), avatar)
+        self.assertTrue(avatar.startswith('/api/avatars/'))
+        self.assertEqual(len(self.downloads), 1)
+        self.assertIn('default=404', self.downloads[0])
+        self.assertIsNotNone(await avatar_uploader.storage.read(avatar.rsplit('/', 1)[1], None))
+
+    async def test_missing_is_cached(self):
+        with patch.object(self.resolver, '_download', self.download(None)):
+            self.assertIsNone(await self.resolver.resolve('ann@mail.com'))
+            self.assertIsNone(await self.resolver.resolve('ann@mail.com'))
+        self.assertEqual((len(self.downloads), self.resolver.missing), (1, 1))
+
+    async def test_timeout(self):
+        with patch.object(self.resolver, '_download', lambda url: time.sleep(1)):
+            start = time.perf_counter()
+            self.assertIsNone(await self.resolver.resolve('ann@mail.com'))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(self.resolver.errors, 1)
+
+    async def test_errors(self):
+        with patch.object(self.resolver, '_download', self.download(OSError('network is unreachable'))):
+            self.assertIsNone(await self.resolver.resolve('ann@mail.com'))
+        with patch.object(self.resolver, '_download', self.download(b'not an image')):
+            self.assertIsNone(await self.resolver.resolve('lee@mail.com'))
+        self.assertEqual(self.resolver.errors, 2)
+
+    def test_cache_key_is_hashed(self):
+        self.assertEqual(email_key(' Ann@Mail.com'), email_key('ann@mail.com'))
+        self.assertNotIn('ann', email_key('ann@mail.com'))
+
+
+class TestAssignGravatar(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'users.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.new = User(username='new', email='new@mail.com', password='x')
+            self.uploaded = User(username='old', email='old@mail.com', password='x', avatar='/api/avatars/own')
+            db.add_all([self.new, self.uploaded])
+            await db.commit()
+        gravatar_resolver.cache.clear()
+
+    async def asyncTearDown(self):
+        gravatar_resolver.cache.clear()
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_does_not_replace_uploaded_avatar(self):
+        with patch('src.services.gravatar.SessionLocal', self.SessionLocal), \
+                patch.object(gravatar_resolver, 'resolve', return_value='https://gravatar/x'):
+            await assign_gravatar(self.new.id, self.new.email)
+            await assign_gravatar(self.uploaded.id, self.uploaded.email)
+        async with self.SessionLocal() as db:
+            self.assertEqual((await db.get(User, self.new.id)).avatar, 'https://gravatar/x')
+            self.assertEqual((await db.get(User, self.uploaded.id)).avatar, '/api/avatars/own')
+
+
+if __name__ == '__main__':
+    unittest.main()
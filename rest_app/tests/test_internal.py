@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from main import app as main_app
+from src.conf.config import settings
+from src.routes import internal
+
+
+class TestInternalRoutes(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(internal.router)
+        self.client = TestClient(app)
+
+    def test_not_mounted_without_token(self):
+        self.assertEqual(settings.internal_token, '')
+        self.assertEqual(TestClient(main_app).get('/internal/hashing').status_code, 404)
+
+    def test_token_required(self):
+        with patch.object(settings, 'internal_token', 'internal-secret'):
+            self.assertEqual(self.client.get('/internal/hashing').status_code, 403)
+            self.assertEqual(self.client.get('/internal/hashing', headers={'X-Internal-Token': 'wrong'}).status_code,
+                             403)
+            response = self.client.get('/internal/hashing', headers={'X-Internal-Token': 'internal-secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('rounds', response.json())
+
+    def test_forbidden_when_token_empty(self):
+        self.assertEqual(self.client.get('/internal/hashing', headers={'X-Internal-Token': ''}).status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
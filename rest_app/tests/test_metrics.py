@@ -0,0 +1,116 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from main import app as main_app
+from src.database.db import instrument_engine
+from src.services.auth import auth_service
+from src.services.hashing import PasswordHasher
+from src.services.metrics import (Gauge, Histogram, MetricsMiddleware, auth_duration, http_duration, http_in_flight,
+                                  request_db_time, request_queries)
+
+
+def count(histogram: Histogram, *labels) -> int:
+    series = histogram.series.get(labels)
+    return sum(series[:-1]) if series else 0
+
+
+class TestMetricTypes(unittest.TestCase):
+
+    def test_histogram(self):
+        histogram = Histogram('latency_seconds', 'Latency.', ('route',), (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, '/a')
+        self.assertEqual(histogram.render().splitlines(), [
+            '# HELP latency_seconds Latency.',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{route="/a",le="0.1"} 2',
+            'latency_seconds_bucket{route="/a",le="1"} 3',
+            'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+            'latency_seconds_sum{route="/a"} 3.65',
+            'latency_seconds_count{route="/a"} 4',
+        ])
+
+    def test_gauge_escapes_labels(self):
+        gauge = Gauge('in_flight', 'In flight.', ('route',))
+        gauge.inc('/a"b')
+        gauge.inc('/a"b')
+        gauge.dec('/a"b')
+        self.assertIn('in_flight{route="/a\\"b"} 1', gauge.render())
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_async_engine('sqlite+aiosqlite://')
+        instrument_engine(cls.engine.sync_engine)
+        app = FastAPI()
+
+        @app.get('/metrics-test/items/{item_id}')
+        async def read_item(item_id: int):
+            async with cls.engine.connect() as conn:
+                for _ in range(3):
+                    await conn.execute(text('SELECT 1'))
+            return {'id': item_id}
+
+        app.add_middleware(MetricsMiddleware)
+        cls.client = TestClient(app)
+
+    def test_route_template(self):
+        labels = ('GET', '/metrics-test/items/{item_id}')
+        before = count(http_duration, *labels, 200)
+        for item_id in range(3):
+            self.assertEqual(self.client.get(f'/metrics-test/items/{item_id}').status_code, 200)
+        self.assertEqual(count(http_duration, *labels, 200), before + 3)
+        self.assertEqual(http_in_flight.values[labels], 0)
+
+    def test_queries_per_request(self):
+        labels = ('GET', '/metrics-test/items/{item_id}')
+        self.client.get('/metrics-test/items/1')
+        series = request_queries.series[labels]
+        # every request issued exactly 3 queries: the "3" bucket holds them all
+        self.assertEqual(series[request_queries.buckets.index(3)], sum(series[:-1]))
+        self.assertGreater(request_db_time.series[labels][-1], 0)
+
+    def test_unmatched_route(self):
+        before = count(http_duration, 'GET', 'unmatched', 404)
+        self.client.get('/metrics-test/missing/1')
+        self.client.get('/metrics-test/missing/2')
+        self.assertEqual(count(http_duration, 'GET', 'unmatched', 404), before + 2)
+
+
+class TestAuthMetrics(unittest.IsolatedAsyncioTestCase):
+
+    async def test_bcrypt_and_jwt(self):
+        hasher = PasswordHasher(1, 1, 4)
+        before = {operation: count(auth_duration, operation)
+                  for operation in ('bcrypt_hash', 'bcrypt_verify', 'jwt_encode', 'jwt_decode')}
+        hashed = await hasher.hash('secret')
+        await hasher.verify('secret', hashed)
+        hasher.shutdown()
+        token = await auth_service.create_access_token(data={'sub': 'metrics@mail.com'}, expires_delta=60)
+        auth_service.decode_token(token)
+        after = {operation: count(auth_duration, operation) for operation in before}
+        self.assertEqual({operation: after[operation] - before[operation] for operation in before},
+                         {'bcrypt_hash': 1, 'bcrypt_verify': 1, 'jwt_encode': 1, 'jwt_decode': 1})
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def test_exposition(self):
+        client = TestClient(main_app)
+        client.get('/')
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['content-type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('http_request_duration_seconds_count{method="GET",route="/",status="200"}', response.text)
+        self.assertIn('# TYPE mail_queue_depth gauge', response.text)
+        self.assertIn('# TYPE auth_operation_duration_seconds histogram', response.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
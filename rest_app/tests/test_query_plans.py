@@ -0,0 +1,98 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from typing import get_args
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Base, User
+from src.repository import contacts as repository_contacts
+from src.schemas import SortKey
+
+
+SORT_INDEXES = {
+    'id': 'ix_contacts_user_id_id',
+    'first_name': 'ix_contacts_user_id_first_name',
+    'last_name': 'ix_contacts_user_id_last_name',
+    'email': 'ix_contacts_user_id_email_id',
+    'birthday': 'ix_contacts_user_id_birthday',
+}
+SORT_VALUES = {'id': 5, 'first_name': 'Vitaliy', 'last_name': 'Yevchu', 'email': 'evciu97@gmail.com',
+               'birthday': date(1997, 6, 19)}
+
+
+class TestContactQueryPlans(unittest.IsolatedAsyncioTestCase):
+    """
+    Every per-user contact lookup must be answered by an index search, never by a table scan.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine('sqlite://')
+        Base.metadata.create_all(cls.engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def setUp(self):
+        self.session = MagicMock(spec=AsyncSession)
+        self.session.execute.return_value = MagicMock()
+        self.user = User(id=1)
+
+    def plan(self, call: int = -1) -> list:
+        stmt = self.session.execute.call_args_list[call].args[0]
+        sql = str(stmt.compile(self.engine, compile_kwargs={'literal_binds': True}))
+        with self.engine.connect() as conn:
+            return [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+    def assertIndexSearch(self, plan: list, index: str, ordered: bool = False):
+        self.assertTrue(any(step.startswith('SEARCH contacts USING') and index in step for step in plan), plan)
+        self.assertFalse(any(step.startswith('SCAN contacts') for step in plan), plan)
+        if ordered:
+            self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+
+    def test_every_sort_key_has_an_index(self):
+        self.assertEqual(set(SORT_INDEXES), set(get_args(SortKey)))
+
+    async def test_get_contacts(self):
+        for sort, index in SORT_INDEXES.items():
+            with self.subTest(sort=sort):
+                await repository_contacts.get_contacts(100, 10, self.user, self.session, sort)
+                self.assertIndexSearch(self.plan(), index, ordered=True)
+
+    async def test_get_contacts_after(self):
+        for sort, index in SORT_INDEXES.items():
+            with self.subTest(sort=sort):
+                await repository_contacts.get_contacts_after(sort, SORT_VALUES[sort], 5, 10, self.user, self.session)
+                self.assertIndexSearch(self.plan(), index, ordered=True)
+
+    async def test_get_contact_by_first_name(self):
+        await repository_contacts.get_contact_by_first_name('Vitaliy', self.user, self.session)
+        self.assertIndexSearch(self.plan(), 'ix_contacts_user_id_first_name')
+
+    async def test_get_contact_by_last_name(self):
+        await repository_contacts.get_contact_by_last_name('Yevchu', self.user, self.session)
+        self.assertIndexSearch(self.plan(), 'ix_contacts_user_id_last_name')
+
+    async def test_get_contact_by_email(self):
+        await repository_contacts.get_contact_by_email('evciu97@gmail.com', self.user, self.session)
+        self.assertIndexSearch(self.plan(), 'INDEX')
+
+    async def test_upcoming_birthday(self):
+        await repository_contacts.upcoming_birthday(self.user, self.session, 7, date(2025, 6, 12))
+        self.assertIndexSearch(self.plan(), 'ix_contacts_user_id_birthday_md')
+
+    async def test_upcoming_birthday_year_boundary(self):
+        await repository_contacts.upcoming_birthday(self.user, self.session, 7, date(2025, 12, 28))
+        self.assertIndexSearch(self.plan(), 'ix_contacts_user_id_birthday_md')
+
+    async def test_update_and_delete_lookup(self):
+        await repository_contacts.delete_contact(1, self.user, self.session)
+        self.assertIndexSearch(self.plan(0), 'INTEGER PRIMARY KEY')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.db import instrument_engine
+from src.services.query_profiler import (QueryLog, QueryProfilerMiddleware, normalize_sql, query_profiler, redact,
+                                         request_db)
+
+
+class TestNormalizeSql(unittest.TestCase):
+
+    def test_literals_and_placeholders(self):
+        self.assertEqual(normalize_sql("SELECT * FROM users\n  WHERE id = 5 AND email = 'a@b.c'"),
+                         'SELECT * FROM users WHERE id = ? AND email = ?')
+        self.assertEqual(normalize_sql('SELECT * FROM contacts WHERE user_id = $1::INTEGER LIMIT $2::INTEGER'),
+                         'SELECT * FROM contacts WHERE user_id = ? LIMIT ?')
+        self.assertEqual(normalize_sql('SELECT * FROM t WHERE a = %(a_1)s AND b = :b AND c::text = %s'),
+                         'SELECT * FROM t WHERE a = ? AND b = ? AND c::text = ?')
+
+    def test_in_lists_and_rows(self):
+        self.assertEqual(normalize_sql('SELECT * FROM users WHERE id IN (?, ?, ?)'),
+                         normalize_sql('SELECT * FROM users WHERE id IN (?)'))
+        self.assertEqual(normalize_sql('INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)'),
+                         'INSERT INTO t (a, b) VALUES (?, ?), ...')
+
+    def test_identifiers_kept(self):
+        self.assertEqual(normalize_sql('SELECT users_1.id FROM users AS users_1'),
+                         'SELECT users_1.id FROM users AS users_1')
+
+
+class TestRedact(unittest.TestCase):
+
+    def test_values_hidden(self):
+        self.assertEqual(redact(('secret@mail.com', 7)), '(str, int)')
+        self.assertEqual(redact({'password': 'hunter2'}), '{password: str}')
+        self.assertEqual(redact([('a', 1), ('b', 2)], executemany=True), '2 x (str, int)')
+
+
+class TestQueryProfiler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_async_engine('sqlite+aiosqlite://')
+        instrument_engine(cls.engine.sync_engine)
+
+    def build_app(self, **kwargs) -> TestClient:
+        app = FastAPI()
+
+        @app.get('/profiler-test/{queries}')
+        async def run_queries(queries: int):
+            async with self.engine.connect() as conn:
+                await conn.execute(text('SELECT 1'))
+                for i in range(queries):
+                    await conn.execute(text('SELECT :id AS id'), {'id': i})
+            return {}
+
+        app.add_middleware(QueryProfilerMiddleware, **kwargs)
+        return TestClient(app)
+
+    def test_debug_headers(self):
+        response = self.build_app(headers=True).get('/profiler-test/3')
+        self.assertEqual(response.headers['x-db-queries'], '4')
+        self.assertTrue(response.headers['server-timing'].startswith('db;dur='))
+        self.assertNotIn('x-db-queries', self.build_app().get('/profiler-test/3').headers)
+
+    def test_n_plus_one(self):
+        client = self.build_app(n_plus_one=5)
+        with self.assertLogs('src.services.query_profiler', 'WARNING') as logs:
+            client.get('/profiler-test/6')
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('Possible N+1 in GET /profiler-test/6: 6x', logs.output[0])
+        self.assertIn('SELECT ? AS id', logs.output[0])
+        self.assertNotIn('SELECT 1', logs.output[0])
+
+    def test_no_warning_below_threshold(self):
+        client = self.build_app(n_plus_one=5)
+        with self.assertNoLogs('src.services.query_profiler', 'WARNING'):
+            client.get('/profiler-test/4')
+
+    def test_slow_query_redacted(self):
+        slow_seconds = query_profiler.slow_seconds
+        query_profiler.slow_seconds = 1e-9
+        try:
+            with self.assertLogs('src.services.query_profiler', 'WARNING') as logs:
+                self.build_app(n_plus_one=0).get('/profiler-test/1')
+        finally:
+            query_profiler.slow_seconds = slow_seconds
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('Slow query', logs.output[1])
+        self.assertIn('SELECT ? AS id; parameters: (int)', logs.output[1])
+
+    def test_log_reset_after_request(self):
+        self.build_app().get('/profiler-test/1')
+        self.assertIsNone(request_db.get())
+
+
+class TestQueryLog(unittest.TestCase):
+
+    def test_repeated(self):
+        log = QueryLog()
+        for sql, times in (('a', 2), ('b', 5), ('c', 7)):
+            for _ in range(times):
+                log.add(sql, 0.001)
+        self.assertEqual(log.count, 14)
+        self.assertEqual([(sql, count) for sql, count, _ in log.repeated(5)], [('c', 7), ('b', 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
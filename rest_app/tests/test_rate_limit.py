@@ -0,0 +1,169 @@
+import importlib.util
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from fakeredis import FakeAsyncRedis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError
+
+from src.services.rate_limit import RateLimiter, RateLimitMiddleware
+
+lua = unittest.skipUnless(importlib.util.find_spec('lupa'), 'fakeredis needs lupa to run Lua scripts')
+
+
+@lua
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = FakeAsyncRedis()
+
+    def limiter(self, prefilter: float = 0) -> RateLimiter:
+        return RateLimiter(lambda: self.redis, prefilter=prefilter, retry_after=1)
+
+    async def test_limit(self):
+        limiter = self.limiter()
+        results = [(await limiter.hit('GET /a:ip:1', 5, 60))[0] for _ in range(6)]
+        self.assertEqual(results, [True] * 5 + [False])
+        allowed, retry_after = await limiter.hit('GET /a:ip:1', 5, 60)
+        self.assertFalse(allowed)
+        self.assertTrue(0 < retry_after <= 60)
+        self.assertTrue((await limiter.hit('GET /a:ip:2', 5, 60))[0])
+        self.assertEqual(limiter.stats()['limited'], 2)
+
+    async def test_workers_share_the_counter(self):
+        first, second = self.limiter(), self.limiter()
+        for _ in range(5):
+            await first.hit('k', 10, 60)
+            await second.hit('k', 10, 60)
+        self.assertFalse((await first.hit('k', 10, 60))[0])
+
+    async def test_previous_window_is_weighted(self):
+        limiter = self.limiter()
+        now_ms = int(time.time() * 1000)
+        index, elapsed = now_ms // 60000, now_ms % 60000
+        await self.redis.set(f'rl:k:{index - 1}', 100)
+        carried = int(100 * (60000 - elapsed) / 60000)
+        allowed = 0
+        while (await limiter.hit('k', 100, 60))[0]:
+            allowed += 1
+        self.assertIn(allowed, (100 - carried, 100 - carried + 1))
+
+    async def test_prefilter_skips_redis(self):
+        limiter = self.limiter(prefilter=0.1)
+        # the first check grants a tenth of the remaining 99 requests
+        for _ in range(10):
+            self.assertTrue((await limiter.hit('k', 100, 60))[0])
+        key = (await self.redis.keys('rl:*'))[0]
+        self.assertEqual(int(await self.redis.get(key)), 1)
+        await limiter.hit('k', 100, 60)
+        self.assertEqual(int(await self.redis.get(key)), 11)
+        self.assertEqual((limiter.local, limiter.remote), (9, 2))
+
+    async def test_prefilter_keeps_the_limit(self):
+        limiter = self.limiter(prefilter=0.5)
+        allowed = sum([(await limiter.hit('k', 10, 60))[0] for _ in range(30)])
+        self.assertEqual(allowed, 10)
+
+    async def test_denied_client_gets_no_local_admits(self):
+        limiter = self.limiter(prefilter=0.5)
+        other = self.limiter()
+        for _ in range(10):
+            await other.hit('k', 10, 60)
+        self.assertFalse((await limiter.hit('k', 10, 60))[0])
+        await self.redis.flushall()
+        # the window has room again, but until it resets every request is checked in Redis
+        results = [(await limiter.hit('k', 10, 60))[0] for _ in range(5)]
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual((limiter.local, limiter.remote), (0, 6))
+        self.assertEqual(int(await self.redis.get((await self.redis.keys('rl:*'))[0])), 5)
+
+
+class TestFailOpen(unittest.IsolatedAsyncioTestCase):
+
+    async def test_redis_unavailable(self):
+        redis = MagicMock()
+        redis.register_script.return_value = MagicMock(side_effect=ConnectionError())
+        limiter = RateLimiter(lambda: redis, prefilter=0, retry_after=60)
+        self.assertTrue((await limiter.hit('k', 1, 60))[0])
+        self.assertTrue((await limiter.hit('k', 1, 60))[0])
+        self.assertEqual(redis.register_script.return_value.call_count, 1)
+        self.assertEqual((limiter.errors, limiter.failed_open), (1, 2))
+
+
+@lua
+class TestMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+
+        @app.get('/items/{item_id}')
+        async def read_item(item_id: int):
+            return {'id': item_id}
+
+        @app.get('/public')
+        async def public():
+            return {}
+
+        self.redis = FakeAsyncRedis()
+        self.limiter = RateLimiter(lambda: self.redis, prefilter=0, retry_after=1)
+        app.add_middleware(RateLimitMiddleware, limiter=self.limiter, limit=3, window=60,
+                           routes={'GET /public': 0}, identify=lambda token: token if token.startswith('user') else None)
+        self.client = TestClient(app)
+
+    def test_limit_per_route_template(self):
+        statuses = [self.client.get(f'/items/{i}').status_code for i in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        response = self.client.get('/items/9')
+        self.assertEqual(response.headers['x-ratelimit-limit'], '3')
+        self.assertGreater(int(response.headers['retry-after']), 0)
+        self.assertEqual(response.json()['detail'], 'Rate limit exceeded. Try again later.')
+
+    def test_limit_per_user(self):
+        for _ in range(3):
+            self.client.get('/items/1', headers={'Authorization': 'Bearer user-a'})
+        self.assertEqual(self.client.get('/items/1', headers={'Authorization': 'Bearer user-a'}).status_code, 429)
+        self.assertEqual(self.client.get('/items/1', headers={'Authorization': 'Bearer user-b'}).status_code, 200)
+        self.assertEqual(self.client.get('/items/1').status_code, 200)
+
+    def test_unlimited_route(self):
+        self.assertEqual({self.client.get('/public').status_code for _ in range(10)}, {200})
+        self.assertEqual(self.limiter.stats()['remote'], 0)
+
+
+@lua
+class TestPrefilterCounters(unittest.IsolatedAsyncioTestCase):
+    """
+    Розподіл перевірок між локальним pre-filter і Redis під навантаженням багатьох клієнтів.
+    Затримку middleware вимірює ``benchmarks/bench_rate_limit.py``.
+    """
+
+    async def test_requests_are_checked_locally_and_in_redis(self):
+        async def app(scope, receive, send):
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'{}'})
+
+        async def receive():
+            return {'type': 'http.request'}
+
+        async def send(message):
+            pass
+
+        app.router = MagicMock(routes=[])
+        redis = FakeAsyncRedis()
+        limiter = RateLimiter(lambda: redis, prefilter=0.1, retry_after=1)
+        limited = RateLimitMiddleware(app, limiter, limit=100, window=60, routes={}, identify=lambda token: None)
+        for number in range(5000):
+            scope = {'type': 'http', 'method': 'GET', 'path': '/api/contacts/', 'headers': [],
+                     'client': (f'10.0.0.{number % 200}', 1000), 'app': app}
+            await limited(scope, receive, send)
+        stats = limiter.stats()
+        self.assertEqual(stats['local'] + stats['remote'], 5000)
+        self.assertGreater(stats['local'], stats['remote'])
+        self.assertGreater(stats['remote'], 0)
+        self.assertEqual((stats['errors'], stats['limited']), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
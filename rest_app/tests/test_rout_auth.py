@@ -1,10 +1,11 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from src.database.models import User
 
 def test_create_user(client, user, monkeypatch):
     mock_send_email = MagicMock()
     monkeypatch.setattr('src.routes.auth.send_email', mock_send_email)
+    monkeypatch.setattr('src.routes.auth.assign_gravatar', AsyncMock())
     response = client.post(
         '/api/auth/signup',
         json={'email': user.get('email'), 'password': user.get('password'), 'username': user.get('username')}
@@ -0,0 +1,134 @@
+import os
+import random
+import string
+import tempfile
+import time
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import search_contacts, delete_contact
+from src.services.search import ContactIndex, normalize_query, search_indexes, trigrams
+
+
+ROWS = [
+    (1, 'Vitaliy', 'Yevchuk', 'evciu97@gmail.com', None),
+    (2, 'Anna', 'Kovalenko', 'anna@ukr.net', 'colleague from Kyiv'),
+    (3, 'Andriy', 'Shevchenko', 'andriy@mail.com', None),
+    (4, 'Olena', 'Annenko', 'olena@mail.com', 'met Anna at school'),
+]
+
+
+class TestContactIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ContactIndex(ROWS)
+
+    def test_trigrams_match_pg_trgm(self):
+        self.assertEqual(trigrams('cat'), {'  c', ' ca', 'cat', 'at '})
+        self.assertEqual(trigrams('aaa'), {'  a', ' aa', 'aaa', 'aa '})
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Anna   KOVALENKO '), 'anna kovalenko')
+
+    def test_prefix(self):
+        self.assertEqual(self.index.search('yev', 0.3), [1])
+        self.assertEqual(self.index.search('andr', 0.3), [3])
+
+    def test_typo(self):
+        self.assertEqual(self.index.search('yevchyk', 0.3), [1])
+        self.assertEqual(self.index.search('shevcenko', 0.3), [3])
+
+    def test_name_prefix_ranks_first(self):
+        self.assertEqual(self.index.search('anna', 0.3), [2, 4])
+
+    def test_email_and_description(self):
+        self.assertEqual(self.index.search('gmail', 0.3)[0], 1)
+        self.assertEqual(self.index.search('kyiv', 0.3), [2])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.index.search('anna kovalenko', 0.3), [2])
+        self.assertEqual(self.index.search('anna zzzz', 0.3), [])
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search('qwerty', 0.3), [])
+        self.assertEqual(self.index.search('', 0.3), [])
+
+    def test_latency(self):
+        rnd = random.Random(1)
+        word = lambda: ''.join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 9)))
+        index = ContactIndex((i, word(), word(), f'{word()}@mail.com', None) for i in range(50000))
+        started = time.perf_counter()
+        for _ in range(20):
+            index.search(word()[:5], 0.3)
+        self.assertLess((time.perf_counter() - started) / 20, 0.02)
+
+
+class TestSearchContacts(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        search_indexes.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'search.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.user = User(email='owner@mail.com', password='x')
+            other = User(email='other@mail.com', password='x')
+            db.add_all([self.user, other])
+            await db.flush()
+            for _, first_name, last_name, email, description in ROWS:
+                db.add(Contact(first_name=first_name, last_name=last_name, email=email, birthday=date(1997, 6, 19),
+                               description=description, user_id=self.user.id))
+            db.add(Contact(first_name='Anna', last_name='Foreign', email='foreign@mail.com', birthday=date(1990, 1, 1), user_id=other.id))
+            await db.commit()
+
+    async def asyncTearDown(self):
+        search_indexes.clear()
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def names(self, query: str, skip: int = 0, limit: int = 10) -> list:
+        async with self.SessionLocal() as db:
+            return [c.last_name for c in await search_contacts(query, skip, limit, self.user, db)]
+
+    async def test_ranked_and_scoped_to_user(self):
+        self.assertEqual(await self.names('Anna'), ['Kovalenko', 'Annenko'])
+
+    async def test_pagination(self):
+        self.assertEqual(await self.names('anna', 1, 1), ['Annenko'])
+        self.assertEqual(await self.names('anna', 2, 1), [])
+
+    async def test_typo(self):
+        self.assertEqual(await self.names('Yevchyk'), ['Yevchuk'])
+
+    async def test_index_is_dropped_on_write(self):
+        self.assertEqual(await self.names('shev'), ['Shevchenko'])
+        async with self.SessionLocal() as db:
+            contacts = await search_contacts('shev', 0, 1, self.user, db)
+            await delete_contact(contacts[0].id, self.user, db)
+        self.assertEqual(await self.names('shev'), [])
+
+
+class TestSearchPostgresql(unittest.IsolatedAsyncioTestCase):
+
+    async def test_trigram_query(self):
+        session = MagicMock(spec=AsyncSession)
+        session.get_bind.return_value.dialect.name = 'postgresql'
+        session.execute.return_value = MagicMock()
+        await search_contacts('Anna', 0, 10, User(id=1), session)
+        threshold, stmt = (call.args[0] for call in session.execute.call_args_list)
+        self.assertIn('set_config', str(threshold))
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        self.assertIn("lower(contacts.first_name || ' ' || contacts.last_name", sql)
+        self.assertIn('%>', sql)
+        self.assertIn('word_similarity', sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import Session
+
+from src.database.models import Contact, User, month_day
+from src.database.seed import DatasetGenerator, seed_database, user_email
+
+
+class TestDatasetGenerator(unittest.TestCase):
+
+    def test_deterministic(self):
+        first = list(DatasetGenerator(10, 500, seed=7).contact_rows())
+        self.assertEqual(first, list(DatasetGenerator(10, 500, seed=7).contact_rows()))
+        self.assertNotEqual(first, list(DatasetGenerator(10, 500, seed=8).contact_rows()))
+
+    def test_skewed_counts(self):
+        counts = DatasetGenerator(100, 10_000, skew=1.0).contact_counts()
+        self.assertEqual(sum(counts), 10_000)
+        self.assertGreater(max(counts), 20 * sorted(counts)[50])
+        self.assertEqual(set(DatasetGenerator(10, 1000, skew=0).contact_counts()), {100})
+
+    def test_rows(self):
+        rows = list(DatasetGenerator(20, 5000, seed=1).contact_rows(first_user_id=5, first_id=100))
+        self.assertEqual([row[0] for row in rows], list(range(100, 5100)))
+        self.assertLessEqual({row[8] for row in rows}, set(range(5, 25)))
+        self.assertEqual(len({row[3] for row in rows}), 5000)
+        self.assertGreater(len({row[5] // 100 for row in rows}), 11)
+        # duplicate-ish names: few distinct spellings, some of them typos of the same name
+        names = {row[1] for row in rows}
+        self.assertLess(len(names), 500)
+        self.assertTrue({'Olena', 'olena', 'OLENA'} <= names)
+
+
+class TestSeedDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine('sqlite:///' + os.path.join(self.tmp.name, 'seed.db'))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_load(self):
+        result = seed_database(self.engine, DatasetGenerator(10, 2000, password_hash='hash'), reset=True, batch=300)
+        self.assertEqual((result['first_user_id'], result['users'], result['contacts']), (1, 10, 2000))
+        indexes = {index['name'] for index in inspect(self.engine).get_indexes('contacts')}
+        self.assertIn('ix_contacts_user_id_birthday_md', indexes)
+        with Session(self.engine) as db:
+            self.assertEqual(db.scalar(select(func.count()).select_from(Contact)), 2000)
+            contact = db.get(Contact, 1234)
+            self.assertEqual(contact.birthday_md, month_day(contact.birthday))
+            user = db.scalars(select(User).where(User.email == user_email(3))).one()
+            self.assertTrue(user.confirmed)
+
+    def test_append(self):
+        seed_database(self.engine, DatasetGenerator(5, 100), reset=True)
+        result = seed_database(self.engine, DatasetGenerator(5, 100, seed=1))
+        self.assertEqual(result['first_user_id'], 6)
+        with Session(self.engine) as db:
+            self.assertEqual(db.scalar(select(func.count()).select_from(Contact)), 200)
+            self.assertEqual(db.scalar(select(func.max(Contact.user_id))), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
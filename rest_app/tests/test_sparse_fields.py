@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import get_contacts, get_contact_by_email, search_contacts
+from src.routes.contacts import contact_fields
+from src.services.responses import contacts_response
+from src.services.search import search_indexes
+
+
+class TestContactFields(unittest.TestCase):
+
+    def test_canonical_order(self):
+        self.assertEqual(contact_fields('last_name, first_name,last_name'), ('first_name', 'last_name'))
+
+    def test_all_fields_by_default(self):
+        self.assertIsNone(contact_fields(None))
+
+    def test_unknown_field(self):
+        for fields in ('first_name,password', ',', ''):
+            with self.assertRaises(HTTPException) as err:
+                contact_fields(fields)
+            self.assertEqual(err.exception.status_code, 400)
+
+
+class TestSparseReads(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        search_indexes.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'fields.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.user = User(email='owner@mail.com', password='x')
+            db.add(self.user)
+            await db.flush()
+            for number, first_name in enumerate(('Anna', 'Bohdan', 'Olena')):
+                db.add(Contact(first_name=first_name, last_name='Yevchu', email=f'c{number}@mail.com',
+                               birthday=date(1997, 6, 19), description='x' * 1000, user_id=self.user.id))
+            await db.commit()
+        self.statements = []
+        event.listen(self.engine.sync_engine, 'before_cursor_execute', self.capture)
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    async def asyncTearDown(self):
+        search_indexes.clear()
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_projection_is_pushed_into_select(self):
+        async with self.SessionLocal() as db:
+            contacts = await get_contacts(0, 10, self.user, db, 'last_name', ('first_name',))
+            with self.assertRaises(InvalidRequestError):
+                contacts[0].description
+        select_clause = self.statements[-1].split('FROM')[0]
+        self.assertIn('contacts.first_name', select_clause)
+        self.assertIn('contacts.last_name', select_clause)
+        self.assertNotIn('description', select_clause)
+        self.assertNotIn('email', select_clause)
+
+    async def test_list_response(self):
+        async with self.SessionLocal() as db:
+            contacts = await get_contacts(0, 10, self.user, db, fields=('id', 'first_name'))
+        body = json.loads(contacts_response(contacts, ('id', 'first_name')).body)
+        self.assertEqual(body, [{'id': contact.id, 'first_name': contact.first_name} for contact in contacts])
+
+    async def test_lookup_response(self):
+        async with self.SessionLocal() as db:
+            contact = await get_contact_by_email('c1@mail.com', self.user, db, ('email', 'birthday'))
+        self.assertEqual(json.loads(contacts_response(contact, ('email', 'birthday')).body),
+                         {'email': 'c1@mail.com', 'birthday': '1997-06-19'})
+
+    async def test_search(self):
+        async with self.SessionLocal() as db:
+            contacts = await search_contacts('bohd', 0, 10, self.user, db, fields=('first_name',))
+        self.assertEqual(json.loads(contacts_response(contacts, ('first_name',)).body), [{'first_name': 'Bohdan'}])
+        self.assertNotIn('description', self.statements[-1].split('FROM')[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
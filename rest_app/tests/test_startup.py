@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+# integrations that are imported on first use, not together with the app
+DEFERRED = ('cloudinary', 'fastapi_mail', 'PIL', 'libgravatar', 'jinja2', 'aiosmtplib', 'asyncpg', 'redis',
+            'jose.jwt', 'passlib.context')
+# import of main on top of the frameworks it is built on; was ~730 ms before the integrations became lazy.
+# Wall-clock time depends on the machine, so the budget is checked only when set: IMPORT_BUDGET_MS=500
+BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 0))
+
+APP = '''
+import fastapi, fastapi.security, sqlalchemy.orm, sqlalchemy.ext.asyncio, pydantic, pydantic_settings, email_validator
+import sys
+sys.stderr.write('--app--\\n')
+import main
+print(','.join(name for name in sys.argv[1:] if name in sys.modules))
+'''
+
+
+class TestStartup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', APP, *DEFERRED], capture_output=True,
+                                text=True, cwd=Path(__file__).parent.parent, env=os.environ, check=True)
+        cls.loaded = [name for name in result.stdout.strip().split(',') if name]
+        cls.main_us = next(int(line.split('|')[1]) for line in result.stderr.split('--app--\n', 1)[1].splitlines()
+                           if line.startswith('import time:') and line.split('|')[2] == ' main')
+
+    def test_integrations_are_lazy(self):
+        self.assertEqual(self.loaded, [])
+
+    @unittest.skipUnless(BUDGET_MS, 'set IMPORT_BUDGET_MS to check the import time budget')
+    def test_import_budget(self):
+        self.assertLess(self.main_us / 1000, BUDGET_MS, f'import main took {self.main_us / 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from src.conf.config import Settings
+from src.services.hashing import PasswordHasher, bcrypt_rounds
+
+
+class TestPasswordHasher(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.hasher = PasswordHasher(workers=1, max_queue=1, rounds=5)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    async def test_hash_and_verify(self):
+        hashed = await self.hasher.hash('password123')
+        self.assertEqual(bcrypt_rounds(hashed), 5)
+        self.assertEqual(await self.hasher.verify('password123', hashed), (True, None))
+        self.assertEqual(await self.hasher.verify('password', hashed), (False, None))
+
+    async def test_rehash_outdated_cost(self):
+        hashed = CryptContext(schemes=['bcrypt'], bcrypt__rounds=4).hash('password123')
+        valid, new_hash = await self.hasher.verify('password123', hashed)
+        self.assertTrue(valid)
+        self.assertEqual(bcrypt_rounds(new_hash), 5)
+        self.assertEqual(self.hasher.stats()['rehashed'], 1)
+
+    async def test_keep_higher_cost(self):
+        hashed = CryptContext(schemes=['bcrypt'], bcrypt__rounds=6).hash('password123')
+        self.assertEqual(await self.hasher.verify('password123', hashed), (True, None))
+
+    async def test_queue_limit(self):
+        results = await asyncio.gather(*(self.hasher.hash('password123') for _ in range(3)), return_exceptions=True)
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(rejected[0].status_code, 503)
+        self.assertEqual(self.hasher.stats()['rejected'], 1)
+        self.assertEqual(self.hasher.stats()['in_flight'], 0)
+
+    def test_calibrate(self):
+        self.assertEqual(self.hasher.calibrate(target_ms=0, min_rounds=4, max_rounds=8), 4)
+        self.assertEqual(self.hasher.calibrate(target_ms=10_000, min_rounds=4, max_rounds=8), 8)
+        self.assertEqual(self.hasher.rounds, 8)
+
+    def test_calibrate_keeps_the_floor(self):
+        for min_rounds in (4, 5, 6):
+            self.assertEqual(self.hasher.calibrate(target_ms=0, min_rounds=min_rounds, max_rounds=8), min_rounds)
+        self.assertEqual(self.hasher.calibrate(target_ms=0, min_rounds=6, max_rounds=4), 6)
+        self.assertEqual(self.hasher.rounds, 6)
+
+    def test_default_floor_is_the_configured_cost(self):
+        self.assertGreaterEqual(Settings.model_fields['bcrypt_min_rounds'].default,
+                                Settings.model_fields['bcrypt_rounds'].default)
+
+
+if __name__ == '__main__':
+    unittest.main()
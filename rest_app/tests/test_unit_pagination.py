@@ -0,0 +1,24 @@
+import unittest
+from datetime import date
+
+from src.services.pagination import encode_cursor, decode_cursor
+
+
+class TestCursor(unittest.TestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor('last_name', 'Yevchu', 42)
+        self.assertEqual(decode_cursor(cursor), ('last_name', 'Yevchu', 42))
+
+    def test_round_trip_date(self):
+        cursor = encode_cursor('birthday', date(1997, 6, 19), 7)
+        self.assertEqual(decode_cursor(cursor), ('birthday', date(1997, 6, 19), 7))
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', encode_cursor('password', 'x', 1), encode_cursor('birthday', 'x', 1)):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,14 @@
 import unittest
 from unittest.mock import MagicMock
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
 from src.database.models import Contact, User
 from src.schemas import ContactModel
 from src.repository.contacts import (
     get_contacts,
+    get_contacts_after,
     get_contact_by_first_name,
     get_contact_by_last_name,
     get_contact_by_email,
@@ -20,51 +21,62 @@ from src.repository.contacts import (
 class TestContacts(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self) -> None:
-        self.session = MagicMock(spec=Session)
+        self.session = MagicMock(spec=AsyncSession)
+        self.result = MagicMock()
+        self.session.execute.return_value = self.result
         self.user = User(id=1)
 
     async def test_get_contacts(self):
         contacts = [Contact(), Contact()]
-        self.session.query().filter().offset().limit().all.return_value = contacts
+        self.result.scalars().all.return_value = contacts
         result = await get_contacts(skip=0, limit=10, user=self.user, db=self.session)
         self.assertEqual(result, contacts)
 
+    async def test_get_contacts_after(self):
+        contacts = [Contact(), Contact()]
+        self.result.scalars().all.return_value = contacts
+        result = await get_contacts_after(sort='last_name', value='Yevchu', last_id=5, limit=10, user=self.user, db=self.session)
+        self.assertEqual(result, contacts)
+        stmt = str(self.session.execute.call_args.args[0])
+        self.assertIn('(contacts.last_name, contacts.id) >', stmt)
+        self.assertIn('ORDER BY contacts.last_name, contacts.id', stmt)
+
     async def test_get_contacts_by_fn_found(self):
         contact = Contact()
-        self.session.query().filter().first.return_value = contact
+        self.result.scalars().first.return_value = contact
         result = await get_contact_by_first_name(contact_first_name='Vitaliy', user=self.user, db=self.session)
         self.assertEqual(result, contact)
 
     async def test_get_contacts_by_fn_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         result = await get_contact_by_first_name(contact_first_name='Vitaliy', user=self.user, db=self.session)
         self.assertIsNone(result)
 
     async def test_get_contacts_by_ln_found(self):
         contact = Contact()
-        self.session.query().filter().first.return_value = contact
+        self.result.scalars().first.return_value = contact
         result = await get_contact_by_last_name(contact_last_name='Yevchu', user=self.user, db=self.session)
         self.assertEqual(result, contact)
 
     async def test_get_contacts_by_ln_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         result = await get_contact_by_last_name(contact_last_name='Yevchu', user=self.user, db=self.session)
         self.assertIsNone(result)
 
     async def test_get_contacts_by_email_found(self):
         contact = Contact()
-        self.session.query().filter().first.return_value = contact
+        self.result.scalars().first.return_value = contact
         result = await get_contact_by_email(contact_email='evciu97@gmail.com', user=self.user, db=self.session)
         self.assertEqual(result, contact)
 
     async def test_get_contacts_by_email_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         result = await get_contact_by_email(contact_email='evciu97@gmail.com', user=self.user, db=self.session)
         self.assertIsNone(result)
 
     async def test_upcomin_birthday(self):
         contacts = [Contact(), Contact()]
-        self.session.query().filter().all.return_value = contacts
+        self.result.scalars().all.return_value = contacts
         result = await upcoming_birthday(user=self.user, db=self.session)
         self.assertEqual(result, contacts)
 
@@ -91,7 +103,7 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
                     birthday=date(1997,6,19), 
                     description='some text')
         contact = Contact()
-        self.session.query().filter().first.return_value = contact
+        self.result.scalars().first.return_value = contact
         self.session.commit.return_value = None
         result = await update_contact(contact_id=1, body=body, user=self.user, db=self.session)
         self.assertEqual(result, contact)
@@ -102,21 +114,21 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
                     email='evciu97@gmail.com', 
                     birthday=date(1997,6,19), 
                     description='some text')
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         self.session.commit.return_value = None
         result = await update_contact(contact_id=1, body=body, user=self.user, db=self.session)
         self.assertIsNone(result)
 
     async def test_delete_contact_found(self):
         contact = Contact()
-        self.session.query().filter().first.return_value = contact
+        self.result.scalars().first.return_value = contact
         self.session.delete.return_value = None
         self.session.commit.return_value = None
         result = await delete_contact(contact_id=1, user=self.user, db=self.session)
         self.assertEqual(result, contact)
     
     async def test_delete_contact_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         self.session.commit.return_value = None
         result = await delete_contact(contact_id=1, user=self.user, db=self.session)
         self.assertIsNone(result)
@@ -1,7 +1,7 @@
 import unittest
 from unittest.mock import MagicMock
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas import UserModel
@@ -16,18 +16,20 @@ from src.repository.users import (
 class TestContacts(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self) -> None:
-        self.session = MagicMock(spec=Session)
+        self.session = MagicMock(spec=AsyncSession)
+        self.result = MagicMock()
+        self.session.execute.return_value = self.result
         self.user = User(id=1)
         self.mock_user = MagicMock()
 
     async def test_get_user_by_email_found(self):
         user = User()
-        self.session.query().filter().first.return_value = user
+        self.result.scalars().first.return_value = user
         result = await get_user_by_email(email='example@email.com', db=self.session)
         self.assertEqual(result, user)
 
     async def test_get_user_by_email_not_found(self):
-        self.session.query().filter().first.return_value = None
+        self.result.scalars().first.return_value = None
         result = await get_user_by_email(email='example@email.com', db=self.session)
         self.assertIsNone(result)
 
@@ -39,8 +41,7 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
         )
         self.session.add.return_value = None
         self.session.commit.return_value = None
-        with unittest.mock.patch('src.repository.users.Gravatar', return_value=MagicMock(get_image=lambda: None)):
-            result = await create_user(body=body, db=self.session)
+        result = await create_user(body=body, db=self.session)
         self.assertEqual(result.username, body.username)
         self.assertEqual(result.email, body.email)
         self.assertEqual(result.password, body.password)
@@ -0,0 +1,38 @@
+import json
+import unittest
+from datetime import date
+
+from src.database.models import Contact
+from src.schemas import ResponseModel
+from src.services.responses import FastJSONResponse, contact_rows, contacts_response
+
+
+class TestContactsResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.contacts = [
+            Contact(id=1, first_name='Vitaliy', last_name='Yevchu', email='evciu97@gmail.com', birthday=date(1997, 6, 19),
+                    description='"quoted"\nline'),
+            Contact(id=2, first_name='Ann', last_name='Lee', email='ann@mail.com', birthday=date(1990, 2, 28)),
+        ]
+
+    def test_matches_response_model(self):
+        body = json.loads(contacts_response(self.contacts).body)
+        expected = [json.loads(ResponseModel.model_validate(contact).model_dump_json()) for contact in self.contacts]
+        self.assertEqual(body, expected)
+
+    def test_single_contact(self):
+        body = json.loads(contacts_response(self.contacts[1], ('id', 'birthday')).body)
+        self.assertEqual(body, {'id': 2, 'birthday': '1990-02-28'})
+
+    def test_single_field(self):
+        self.assertEqual(contact_rows(self.contacts, ('email',)), [{'email': 'evciu97@gmail.com'}, {'email': 'ann@mail.com'}])
+
+    def test_fast_json_response(self):
+        response = FastJSONResponse({'birthday': date(1997, 6, 19), 'name': 'Віталій'})
+        self.assertEqual(json.loads(response.body), {'birthday': '1997-06-19', 'name': 'Віталій'})
+        self.assertEqual(response.media_type, 'application/json')
+
+
+if __name__ == '__main__':
+    unittest.main()
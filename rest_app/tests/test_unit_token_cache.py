@@ -0,0 +1,60 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import User
+from src.repository.users import update_token
+from src.services.auth import auth_service
+from src.services.token_cache import token_cache, token_digest, store_payload
+
+
+class TestTokenCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        token_cache.clear()
+
+    async def test_signature_checked_once(self):
+        token = await auth_service.create_access_token(data={'sub': 'example@mail.com'})
+        with patch.object(jwt, 'decode', wraps=jwt.decode) as decode:
+            first = auth_service.decode_token(token)
+            second = auth_service.decode_token(token)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+
+    async def test_entry_expires_with_token(self):
+        token = await auth_service.create_access_token(data={'sub': 'example@mail.com'}, expires_delta=60)
+        auth_service.decode_token(token)
+        expires_at, _ = token_cache._data[token_digest(token)]
+        self.assertLessEqual(expires_at, time.monotonic() + 60)
+
+    async def test_expired_payload_not_stored(self):
+        store_payload('token', {'sub': 'example@mail.com', 'exp': time.time() - 1})
+        self.assertEqual(len(token_cache), 0)
+
+    async def test_revoke(self):
+        token = await auth_service.create_refresh_token(data={'sub': 'example@mail.com'})
+        auth_service.decode_token(token)
+        auth_service.revoke_token(token)
+        self.assertEqual(len(token_cache), 0)
+
+    async def test_update_token_revokes_previous(self):
+        old_token = await auth_service.create_refresh_token(data={'sub': 'example@mail.com'})
+        auth_service.decode_token(old_token)
+        user = User(id=1, email='example@mail.com', refresh_token=old_token)
+        await update_token(user=user, token='new_token', db=MagicMock(spec=AsyncSession))
+        self.assertEqual(len(token_cache), 0)
+
+    async def test_invalid_token(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await auth_service.decode_refresh_token('not-a-token')
+        self.assertEqual(ctx.exception.status_code, 401)
+        self.assertEqual(len(token_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
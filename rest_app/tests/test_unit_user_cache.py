@@ -0,0 +1,97 @@
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import User
+from src.repository.users import update_avatar
+from src.services.auth import auth_service
+from src.services.cache import TTLCache
+from src.services.user_cache import UserCache, user_cache
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_expiry(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+class TestUserCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.user = User(id=1, username='Jhon Doe', email='example@mail.com', avatar=None, password='hash',
+                         created_at=datetime(2023, 10, 1), confirmed=True)
+
+    async def test_local(self):
+        cache = UserCache(maxsize=10, ttl=60)
+        self.assertIsNone(await cache.get('example@mail.com'))
+        await cache.set(self.user)
+        cached = await cache.get('example@mail.com')
+        self.assertEqual(cached.id, 1)
+        self.assertIsNone(cached.password)
+        await cache.invalidate('example@mail.com')
+        self.assertIsNone(await cache.get('example@mail.com'))
+
+    async def test_shared_through_redis(self):
+        redis = FakeAsyncRedis()
+        worker_a = UserCache(maxsize=10, ttl=60, redis=lambda: redis, local_ttl=5)
+        worker_b = UserCache(maxsize=10, ttl=60, redis=lambda: redis, local_ttl=5)
+        await worker_a.set(self.user)
+        cached = await worker_b.get('example@mail.com')
+        self.assertEqual(cached.created_at, datetime(2023, 10, 1))
+        self.assertEqual(worker_b.stats()['redis']['hits'], 1)
+        await worker_a.invalidate('example@mail.com')
+        self.assertIsNone(await redis.get('user:example@mail.com'))
+
+    async def test_redis_unavailable(self):
+        redis = MagicMock()
+        redis.get.side_effect = ConnectionError()
+        cache = UserCache(maxsize=10, ttl=60, redis=lambda: redis)
+        self.assertIsNone(await cache.get('example@mail.com'))
+        self.assertEqual(cache.stats()['redis']['errors'], 1)
+
+
+class TestCurrentUserCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        user_cache.local.clear()
+        self.session = MagicMock(spec=AsyncSession)
+        self.result = MagicMock()
+        self.session.execute.return_value = self.result
+        self.user = User(id=1, username='Jhon Doe', email='example@mail.com', created_at=datetime(2023, 10, 1))
+        self.result.scalars().first.return_value = self.user
+
+    async def test_second_request_skips_database(self):
+        token = await auth_service.create_access_token(data={'sub': 'example@mail.com'})
+        await auth_service.get_current_user(token, self.session)
+        await auth_service.get_current_user(token, self.session)
+        self.assertEqual(self.session.execute.await_count, 1)
+
+    async def test_update_avatar_invalidates(self):
+        await user_cache.set(self.user)
+        with patch('src.repository.users.get_user_by_email', return_value=self.user):
+            await update_avatar(email='example@mail.com', url='https://example.com/avatar.jpg', db=self.session)
+        self.assertIsNone(await user_cache.get('example@mail.com'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import upcoming_birthday, birthday_window
+
+
+class TestBirthdayWindow(unittest.TestCase):
+
+    def test_same_year(self):
+        self.assertEqual(birthday_window(date(2025, 6, 12), 7), (612, 619, False))
+
+    def test_year_boundary(self):
+        self.assertEqual(birthday_window(date(2025, 12, 28), 7), (1228, 104, True))
+
+    def test_feb_29_in_common_year(self):
+        self.assertEqual(birthday_window(date(2025, 2, 21), 7), (221, 229, False))
+
+    def test_feb_29_in_leap_year(self):
+        self.assertEqual(birthday_window(date(2024, 2, 21), 7), (221, 228, False))
+
+
+class TestUpcomingBirthday(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine('sqlite+aiosqlite:///' + os.path.join(self.tmp.name, 'birthday.db'))
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.SessionLocal() as db:
+            self.user = User(email='owner@mail.com', password='x')
+            other = User(email='other@mail.com', password='x')
+            db.add_all([self.user, other])
+            await db.flush()
+            birthdays = {
+                'leap': date(1996, 2, 29),
+                'feb28': date(1990, 2, 28),
+                'mar1': date(1985, 3, 1),
+                'dec30': date(1970, 12, 30),
+                'jan2': date(2001, 1, 2),
+                'june': date(1997, 6, 19),
+            }
+            for name, birthday in birthdays.items():
+                db.add(Contact(first_name=name, last_name='x', email=f'{name}@mail.com', birthday=birthday, user_id=self.user.id))
+            db.add(Contact(first_name='foreign', last_name='x', email='foreign@mail.com', birthday=date(1970, 12, 31), user_id=other.id))
+            await db.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def names(self, today: date, days: int = 7) -> list:
+        async with self.SessionLocal() as db:
+            return [c.first_name for c in await upcoming_birthday(self.user, db, days, today)]
+
+    async def test_any_birth_year(self):
+        self.assertEqual(await self.names(date(2025, 6, 15)), ['june'])
+
+    async def test_year_boundary_is_ordered_by_next_birthday(self):
+        self.assertEqual(await self.names(date(2025, 12, 28)), ['dec30', 'jan2'])
+
+    async def test_feb_29_in_common_year(self):
+        self.assertEqual(await self.names(date(2025, 2, 21)), ['feb28', 'leap'])
+        self.assertEqual(await self.names(date(2025, 3, 1)), ['mar1'])
+
+    async def test_feb_29_in_leap_year(self):
+        self.assertEqual(await self.names(date(2024, 2, 21)), ['feb28'])
+        self.assertEqual(await self.names(date(2024, 2, 29), 0), ['leap'])
+
+    async def test_whole_year(self):
+        self.assertEqual(len(await self.names(date(2025, 6, 15), 365)), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()